@@ -0,0 +1,244 @@
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import csv
+import os
+import re
+import subprocess
+import sys
+
+# Heavy libraries (pandas, sklearn, requests, scipy) are only imported inside
+# the subcommand that needs them, so `--help` and `rank` start quickly.
+
+SEASONS = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
+CURRENT_YEAR = "2025-26"
+PREV_YEAR = "2024-25"
+MODEL_PATH = "models/random_forest_model.pkl"
+PREDICTIONS_DIR = "outputs/predictions"
+PREDICTIONS_PATTERN = re.compile(r"^(\d+)_(\d{4}-\d{2})_v1b_predictions\.csv$")
+POSITIONS = {"GK": 0, "DEF": 1, "MID": 2, "FWD": 3}
+STARTUP_TARGET_MS = 200
+
+
+def latest_gameweek(year: str, predictions_dir: str = PREDICTIONS_DIR) -> int:
+    """
+    Return the latest gameweek with stored predictions for a season.
+
+    Raises:
+        FileNotFoundError: If there are no predictions for the season.
+    """
+    gws = [
+        int(match.group(1))
+        for match in map(PREDICTIONS_PATTERN.match, os.listdir(predictions_dir))
+        if match is not None and match.group(2) == year
+    ]
+    if not gws:
+        raise FileNotFoundError(f"No predictions found for {year} in {predictions_dir}")
+    return max(gws)
+
+
+def read_rankings(gw: int, year: str, predictions_dir: str = PREDICTIONS_DIR) -> dict:
+    """
+    Read stored predictions and rank them within each position.
+
+    Uses only the standard library, so ranking a cached predictions file
+    does not pay for importing pandas. Ties keep file order, as in
+    `get_top_n`.
+
+    Args:
+        gw (int): The gameweek number.
+        year (str): The season string (e.g., "2025-26").
+        predictions_dir (str): Directory containing the predictions files.
+
+    Returns:
+        dict: Maps element_type to a list of (name, predicted points)
+        tuples, highest first.
+    """
+    path = os.path.join(predictions_dir, f"{gw}_{year}_v1b_predictions.csv")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Predictions file not found: {path}")
+
+    rankings = {element_type: [] for element_type in POSITIONS.values()}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            name = f"{row['first_name']} {row['second_name']}"
+            rankings[int(row["element_type"])].append((name, float(row["total_points_predictions"])))
+    for players in rankings.values():
+        players.sort(key=lambda player: -player[1])
+    return rankings
+
+
+def cmd_train(args) -> None:
+    from scripts.train_pipeline import run_training_pipeline
+
+    if (args.fixtures or args.form or args.lags) and not args.feature_store:
+        raise SystemExit("--fixtures, --form and --lags cannot be used with --legacy-csv")
+    run_training_pipeline(args.years, use_feature_store=args.feature_store, compress=args.compress,
+                          fixtures=args.fixtures, form=args.form, oob=args.oob, lags=args.lags)
+
+
+def cmd_fetch(args) -> None:
+    from src.data.pull_current_fpl_api import save_model_ready_api_data
+    from src.model.feature_spec import load_feature_spec
+
+    spec = load_feature_spec(args.model)
+    fill_values = spec.prev_fill_values() if spec is not None else None
+    save_model_ready_api_data(args.gw, args.year, args.prev_year, args.fixtures, args.form, args.lags, fill_values)
+
+
+def cmd_predict(args) -> None:
+    from scripts.predict_pipeline import run_current_predictions
+
+    run_current_predictions(args.gw, args.year, args.prev_year, args.model, args.uncertainty, args.explain,
+                            args.fixtures, args.form, args.lags)
+
+
+def cmd_rank(args) -> None:
+    gw = args.gw if args.gw is not None else latest_gameweek(args.year)
+    rankings = read_rankings(gw, args.year)
+    positions = [args.position] if args.position else list(POSITIONS)
+    for position in positions:
+        print(f"\n=== Top {args.n} {position} (GW{gw} {args.year}) ===")
+        for rank, (name, points) in enumerate(rankings[POSITIONS[position]][:args.n], start=1):
+            print(f"{rank}. {name:<25} {points:.2f} pts")
+
+
+def cmd_watch(args) -> None:
+    from src.analysis.live_watch import ReplaySource, watch
+
+    source = ReplaySource(args.replay) if args.replay else None
+    watch(args.gw, args.year, args.prev_year, args.model, args.interval, source, args.ticks)
+
+
+def cmd_sweep(args) -> None:
+    import json
+    from src.model.sweep_queue import JobQueue, run_worker, sweep_specs
+
+    if args.action == "work":
+        run_worker(args.queue, args.worker, args.lease, max_jobs=args.max_jobs, wait=args.wait)
+        return
+    queue = JobQueue(args.queue)
+    sweep = args.sweep or "default"
+    if args.action == "submit":
+        specs = sweep_specs(json.loads(args.grid), args.seasons, args.feature_sets)
+        print(f"Submitted {queue.submit(sweep, specs)} new jobs to sweep {sweep!r}")
+    elif args.action == "status":
+        print(queue.status(args.sweep).to_string(index=False))
+    else:
+        results = queue.results(sweep)
+        print(results.sort_values("mse").to_string(index=False) if len(results) else "No finished jobs.")
+    queue.close()
+
+
+def time_command(command: list, repeats: int) -> float:
+    """Return the median wall time in milliseconds of running the CLI with `command`."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "scripts.fpl", *command], stdout=subprocess.DEVNULL, check=True)
+        timings.append(1000 * (time.perf_counter() - start))
+    return sorted(timings)[len(timings) // 2]
+
+
+def cmd_bench(args) -> None:
+    print(f"Median wall time over {args.repeats} runs (target {STARTUP_TARGET_MS} ms):")
+    for command in (["--help"], ["rank", "--year", args.year]):
+        elapsed = time_command(command, args.repeats)
+        status = "ok" if elapsed < STARTUP_TARGET_MS else "SLOW"
+        print(f"  fpl {' '.join(command):<22} {elapsed:7.1f} ms  {status}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="fpl", description="FPL AI V1B command line interface.")
+    parser.add_argument("--timing", action="store_true", help="Print startup and command time to stderr.")
+    parser.add_argument("--http", choices=["live", "record", "replay"],
+                        help="Fetch remote data live, record it to data/cassettes, or replay recordings offline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train = subparsers.add_parser("train", help="Run the training pipeline.")
+    train.add_argument("--years", nargs="+", default=SEASONS, help="Seasons to train on.")
+    train.add_argument("--legacy-csv", dest="feature_store", action="store_false",
+                       help="Train from the legacy data/model_ready CSVs instead of the feature store.")
+    train.add_argument("--fixtures", action="store_true", help="Add next-fixture features.")
+    train.add_argument("--form", action="store_true", help="Add last-N-gameweek form features.")
+    train.add_argument("--lags", action="store_true", help="Add multi-season lag features.")
+    train.add_argument("--oob", action="store_true", help="Single fit with out-of-bag evaluation and early stopping.")
+    train.add_argument("--compress", action="store_true", help="Compare pruned, depth-capped and distilled models.")
+    train.set_defaults(func=cmd_train)
+
+    for name, func, help_text in (
+        ("fetch", cmd_fetch, "Pull the FPL API and save model-ready data."),
+        ("predict", cmd_predict, "Fetch data, predict and show the best squad."),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("gw", type=int, help="Gameweek number.")
+        sub.add_argument("--year", default=CURRENT_YEAR)
+        sub.add_argument("--prev-year", default=PREV_YEAR)
+        sub.add_argument("--fixtures", action="store_true", help="Add next-fixture features.")
+        sub.add_argument("--form", action="store_true", help="Add last-N-gameweek form features.")
+        sub.add_argument("--lags", action="store_true", help="Add multi-season lag features.")
+        sub.add_argument("--model", default=MODEL_PATH, help="Path to the trained model.")
+        sub.set_defaults(func=func)
+        if name == "predict":
+            sub.add_argument("--uncertainty", action="store_true", help="Save P10/P50/P90 and std.")
+            sub.add_argument("--explain", action="store_true", help="Show SHAP feature contributions.")
+
+    rank = subparsers.add_parser("rank", help="Show top players by position from stored predictions.")
+    rank.add_argument("--gw", type=int, help="Gameweek number. Defaults to the latest stored.")
+    rank.add_argument("--year", default=CURRENT_YEAR)
+    rank.add_argument("--position", choices=list(POSITIONS), help="Only show one position.")
+    rank.add_argument("-n", type=int, default=10, help="Number of players per position.")
+    rank.set_defaults(func=cmd_rank)
+
+    watch = subparsers.add_parser("watch", help="Track rank changes during a live gameweek.")
+    watch.add_argument("gw", type=int, help="Gameweek being played.")
+    watch.add_argument("--year", default=CURRENT_YEAR)
+    watch.add_argument("--prev-year", default=PREV_YEAR)
+    watch.add_argument("--model", default=MODEL_PATH, help="Path to the trained model.")
+    watch.add_argument("--interval", type=float, default=60.0, help="Seconds between API polls.")
+    watch.add_argument("--ticks", type=int, help="Stop after this many updates.")
+    watch.add_argument("--replay", nargs="+", help="Replay recorded API snapshot CSVs instead of polling.")
+    watch.set_defaults(func=cmd_watch)
+
+    sweep = subparsers.add_parser("sweep", help="Hyperparameter sweeps through a shared job queue.")
+    sweep.add_argument("action", choices=["submit", "work", "status", "results"])
+    sweep.add_argument("--queue", default="outputs/sweeps/sweep_queue.sqlite",
+                       help="Queue file, on a directory shared by all workers.")
+    sweep.add_argument("--sweep", help='Sweep name (default "default"; status shows every sweep).')
+    sweep.add_argument("--grid", default='{"max_features": ["log2", "sqrt"], "min_samples_leaf": [1, 5]}',
+                       help="JSON mapping hyperparameters to lists of values (submit).")
+    sweep.add_argument("--seasons", nargs="+", default=["2023-24", "2024-25"], help="Seasons to evaluate on (submit).")
+    sweep.add_argument("--feature-sets", nargs="+", default=["all"], help="Feature sets to compare (submit).")
+    sweep.add_argument("--worker", help="Worker name (work). Defaults to host and process id.")
+    sweep.add_argument("--lease", type=float, default=120.0, help="Lease length in seconds (work).")
+    sweep.add_argument("--max-jobs", type=int, help="Stop after this many jobs (work).")
+    sweep.add_argument("--wait", action="store_true", help="Keep polling when the queue is empty (work).")
+    sweep.set_defaults(func=cmd_sweep)
+
+    bench = subparsers.add_parser("bench", help="Time CLI startup for --help and rank.")
+    bench.add_argument("--year", default=CURRENT_YEAR)
+    bench.add_argument("--repeats", type=int, default=5)
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.http:
+        # Read by src.utils.cassette on every remote fetch.
+        os.environ["FPL_HTTP_MODE"] = args.http
+    ready = time.perf_counter()
+    args.func(args)
+    if args.timing:
+        done = time.perf_counter()
+        print(
+            f"[fpl] startup {1000 * (ready - _START):.1f} ms, "
+            f"{args.command} {1000 * (done - ready):.1f} ms",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,126 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
 from src.data.pull_current_fpl_api import save_model_ready_api_data
-from src.model.make_predictions import run_prediction_pipeline
+from src.model.make_predictions import (
+    load_model, model_version, predict_dataframe, prepare_features, save_predictions
+)
+from src.model.feature_spec import check_model_columns, load_feature_spec
+from src.model.drift_monitor import DriftMonitor, show_drift, stats_path
 from src.analysis.get_positional_predictions import show_top_players_by_position
+from src.analysis.squad_optimizer import optimize_squad, show_squad
+from src.analysis.explanations import explain_gameweek, show_top_contributions
+
+
+def _timed(func, *args):
+    """Call `func(*args)` and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def show_latency(timings: dict) -> None:
+    """Print the wall time of each phase of a run in milliseconds."""
+    print("\n=== Latency breakdown ===")
+    for phase, seconds in timings.items():
+        print(f"{phase:<28} {1000 * seconds:9.1f} ms")
+
+
+def check_drift(model_ready_df: pd.DataFrame, model_path: str, gw: int, year: str) -> None:
+    """
+    Compare a gameweek's features with the model's training statistics.
+
+    The gameweek's summary is added to the statistics file next to the
+    model, so later checks can look back over the season. Models trained
+    before the statistics existed are skipped.
+    """
+    path = stats_path(model_path)
+    if not os.path.exists(path):
+        print(f"No feature statistics at {path}, skipping the drift check.")
+        return
+    monitor = DriftMonitor.load(path)
+    monitor.record_live(prepare_features(model_ready_df)[0], year, gw)
+    show_drift(monitor.check(year, gw), year, gw)
+    monitor.save(path)
 
 
 def run_current_predictions(
-    gw, year, prev_year, model_path="models/random_forest_model.pkl"
+    gw, year, prev_year, model_path="models/random_forest_model.pkl",
+    uncertainty=False, explain=False, fixtures=False, form=False, lags=False
 ):
     """
     Run the current season prediction pipeline:
-      1. Collect current API data and prepare it.
-      2. Run the prediction model.
+      1. Collect current API data and prepare it, while the model is
+         loaded on a background thread.
+      2. Run the prediction model on the prepared rows in memory, and
+         flag features that drifted from the training data.
       3. Show top players by position.
+      4. Show the best legal squad, starting XI and captain.
+      5. Optionally explain the predictions with SHAP values, cached per
+         model version and gameweek inputs in `outputs/explanations`.
+
+    The API requests mostly wait on the network and unpickling the forest
+    mostly reads from disk, so the two overlap and the run takes about as
+    long as the slower of them. The model-ready CSV is still saved for
+    later use, but is not read back. The small feature spec saved with the
+    model is read first, so missing previous season values are filled
+    with its training imputation values. The wall time of every phase is
+    printed at the end; "model load (background)" overlaps the fetch and
+    "wait for model" is the part of it that was not hidden.
 
     Args:
         gw (int): Gameweek number.
         year (str): Current season, e.g. "2025-26".
         prev_year (str): Previous season, e.g. "2024-25".
         model_path (str): Path to the trained model pickle file.
+        uncertainty (bool): Also save per-tree P10/P50/P90 and standard
+            deviation for each player.
+        explain (bool): Compute SHAP values and show the top feature
+            contributions of the best players.
+        fixtures (bool): Add next-fixture features, for models trained
+            with them.
+        form (bool): Add last-N-gameweek form features, for models trained
+            with them.
+        lags (bool): Add multi-season lag features, for models trained
+            with them.
+
+    Returns:
+        dict: Seconds spent in each phase.
     """
-    input_data_path = f"data/pre-predictions/processed_data/{gw}_{year}_model_ready.csv"
     output_path = f"outputs/predictions/{gw}_{year}_v1b_predictions.csv"
+    timings = {}
+    start = time.perf_counter()
+
+    spec = load_feature_spec(model_path)
+    fill_values = spec.prev_fill_values() if spec is not None else None
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        print(f"Loading model from {model_path} in the background...")
+        model_future = executor.submit(_timed, load_model, model_path)
+        model_ready_df, timings["fetch and features"] = _timed(
+            save_model_ready_api_data, gw, year, prev_year, fixtures, form, lags, fill_values
+        )
+        (model, timings["model load (background)"]), timings["wait for model"] = _timed(model_future.result)
+    if spec is not None:
+        check_model_columns(model, spec)
+
+    print("Making predictions...")
+    final_df, timings["predict"] = _timed(predict_dataframe, model, model_ready_df, uncertainty, spec)
+    _, timings["drift check"] = _timed(check_drift, model_ready_df, model_path, gw, year)
+    print(f"Saving predictions to {output_path}...")
+    _, timings["save"] = _timed(save_predictions, final_df, output_path, model_version(model_path))
+
+    _, timings["show players and squad"] = _timed(
+        lambda: (show_top_players_by_position(final_df), show_squad(optimize_squad(final_df)))
+    )
+    if explain:
+        (_, top_df), timings["explain"] = _timed(explain_gameweek, model_path, model_ready_df, gw, year, model, spec)
+        show_top_contributions(top_df, final_df)
 
-    save_model_ready_api_data(gw, year, prev_year)
-    final_df = run_prediction_pipeline(model_path, input_data_path, output_path)
-    show_top_players_by_position(final_df)
+    timings["total"] = time.perf_counter() - start
+    show_latency(timings)
+    return timings
 
 
 if __name__ == "__main__":
@@ -1,28 +1,53 @@
+from src.data.feature_store import materialize_history
 from src.data.get_prev_years import fetch_all_seasons
 from src.data.predownload_seasons import predownload_all
 from src.data.prepare_training_data import prepare_training_data
 from src.data.preprocess_training import preprocess_training_data
 from src.model.train_random_forest import train_random_forest
 
-def run_training_pipeline(years):
+def run_training_pipeline(years, use_feature_store=True, compress=False, fixtures=False, form=False,
+                          oob=False, lags=False):
     """Run the complete training pipeline for the FPL model.
 
     The pipeline consists of the following steps:
         1. Fetch historical season data from external sources.
         2. Pre-download all required datasets.
-        3. Prepare training datasets for the specified seasons.
-        4. Preprocess the datasets into model-ready format.
-        5. Train a Random Forest model on the processed data.
+        3. Materialize the seasons into the shared feature store.
+        4. Train a Random Forest model on the stored features.
+
+    Training and live predictions then read features computed by the same
+    `feature_store.compute_features`. With `use_feature_store=False`, step
+    3 is replaced by the legacy `prepare_training_data` and
+    `preprocess_training_data` steps, which compute the features
+    separately into `data/model_ready`; models trained that way are not
+    guaranteed to see the same inputs as the live pipeline.
 
     Args:
         years (list of str): List of seasons (e.g., ["2020-21", "2021-22"]) 
-            to include in the training pipeline."""
+            to include in the training pipeline.
+        use_feature_store (bool): Train from the feature store (default)
+            instead of the legacy model-ready CSVs.
+        compress (bool): Also build and compare smaller candidate models
+            in `models/compressed`.
+        fixtures (bool): Add next-fixture features from each season's
+            fixture calendar (feature store only).
+        form (bool): Add last-N-gameweek form features (feature store
+            only).
+        oob (bool): Train once on all data with out-of-bag evaluation and
+            stop adding trees when the OOB error plateaus.
+        lags (bool): Add multi-season lag features from the player-season
+            panel (feature store only)."""
     print("=== Training pipeline started. ===")
     fetch_all_seasons(years)
     predownload_all()
-    prepare_training_data(years)
-    preprocess_training_data()
-    train_random_forest()
+    if use_feature_store:
+        store = materialize_history(years)
+        df = store.read_training(store.historical_seasons(), fixtures=fixtures, form=form, lags=lags)
+        train_random_forest(df, compress=compress, oob=oob)
+    else:
+        prepare_training_data(years)
+        preprocess_training_data()
+        train_random_forest(compress=compress, oob=oob)
     print("=== Training pipeline finished! ===")
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import time
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Parallel, delayed
+
+from src.model.feature_spec import check_model_columns, load_feature_spec
+from src.model.make_predictions import load_model, model_version, prepare_features
+
+EXPLANATIONS_DIR = "outputs/explanations"
+TOP_K = 5
+
+
+def input_hash(X: pd.DataFrame) -> str:
+    """Return a short hash of a feature matrix's columns and values."""
+    digest = hashlib.sha256(",".join(X.columns).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+
+def explanation_path(gw: int, year: str, version: str, inputs: str,
+                     output_dir: str = EXPLANATIONS_DIR) -> str:
+    """Return the cache file for one gameweek's explanations under a model version and input hash."""
+    return os.path.join(output_dir, f"{gw}_{year}_v1b_shap_{version}_{inputs}.csv")
+
+
+def _shap_chunk(model, X: pd.DataFrame, approximate: bool) -> np.ndarray:
+    import shap
+
+    explainer = shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+    return explainer.shap_values(X, approximate=approximate, check_additivity=False)
+
+
+def compute_shap_values(model, X: pd.DataFrame, n_jobs: int = -1, approximate: bool = True) -> pd.DataFrame:
+    """
+    Compute SHAP values for every row of `X` in parallel chunks.
+
+    Rows are split into one chunk per worker and each worker builds its own
+    `TreeExplainer`, so the forest is sent to every worker once.
+
+    Args:
+        model: A fitted tree ensemble.
+        X (pd.DataFrame): Feature matrix in training column order.
+        n_jobs (int): Number of parallel workers.
+        approximate (bool): Use the Saabas approximation, as in
+            `notebooks/feature_importance.ipynb`. Exact Tree SHAP scales
+            with the square of tree depth and is impractical on the fully
+            grown production forest.
+
+    Returns:
+        pd.DataFrame: One SHAP value per feature per row, indexed like `X`,
+        plus a "base_value" column (the forest's expected prediction).
+    """
+    n_workers = joblib.effective_n_jobs(n_jobs)
+    chunks = [chunk for chunk in np.array_split(np.arange(len(X)), n_workers) if len(chunk)]
+    values = Parallel(n_jobs=n_workers)(
+        delayed(_shap_chunk)(model, X.iloc[chunk], approximate) for chunk in chunks
+    )
+    shap_df = pd.DataFrame(np.vstack(values), columns=X.columns, index=X.index)
+
+    # The forest's expected value is the mean of its trees' root values.
+    shap_df["base_value"] = np.mean([est.tree_.value[0, 0, 0] for est in model.estimators_])
+    return shap_df
+
+
+def top_contributions(shap_df: pd.DataFrame, X: pd.DataFrame, codes, k: int = TOP_K) -> pd.DataFrame:
+    """
+    Return each player's `k` features with the largest absolute SHAP values.
+
+    Args:
+        shap_df (pd.DataFrame): Output of `compute_shap_values`.
+        X (pd.DataFrame): The explained feature matrix.
+        codes (array-like): Player codes aligned with the rows of `X`.
+        k (int): Number of contributions per player.
+
+    Returns:
+        pd.DataFrame: Columns "code", "rank", "feature", "feature_value"
+        and "shap_value", `k` rows per player, largest contribution first.
+    """
+    values = shap_df[X.columns].to_numpy()
+    order = np.argsort(-np.abs(values), axis=1)[:, :k]
+    rows = np.repeat(np.arange(len(values)), order.shape[1])
+    cols = order.ravel()
+    return pd.DataFrame({
+        "code": np.asarray(codes)[rows],
+        "rank": np.tile(np.arange(1, order.shape[1] + 1), len(values)),
+        "feature": X.columns.to_numpy()[cols],
+        "feature_value": X.to_numpy()[rows, cols],
+        "shap_value": values[rows, cols].round(2),
+    })
+
+
+def explain_gameweek(model_path: str, current_df: pd.DataFrame, gw: int, year: str, model=None,
+                     spec=None, output_dir: str = EXPLANATIONS_DIR, n_jobs: int = -1,
+                     approximate: bool = True, k: int = TOP_K) -> tuple:
+    """
+    Explain one gameweek's predictions, reusing cached results when possible.
+
+    Explanations are cached on disk per (model version, input hash), so a
+    repeat request for the same model and gameweek data is a file read.
+    Changing the model or the gameweek's inputs produces a new cache entry.
+    Rows are checked and ordered by the model's feature spec, when it has
+    one, so SHAP values are computed on the same inputs the forest scored.
+
+    Pass the `model` and `spec` a caller already holds (as
+    `run_current_predictions` does) to avoid unpickling the forest again;
+    otherwise it is loaded from `model_path` on a cache miss only.
+
+    Args:
+        model_path (str): Path to the trained model pickle file, which
+            also identifies the model version in the cache.
+        current_df (pd.DataFrame): The model-ready rows that were scored,
+            e.g. `load_current_data(path)`.
+        gw (int): Gameweek number.
+        year (str): Season string (e.g. "2025-26").
+        model (optional): The model loaded from `model_path`.
+        spec (FeatureSpec, optional): Its feature spec. Read from next to
+            `model_path` if not given.
+        output_dir (str): Directory for the cached explanations.
+        n_jobs (int): Number of parallel workers.
+        approximate (bool): Use the Saabas approximation (see
+            `compute_shap_values`). Exact and approximate values are cached
+            separately.
+        k (int): Number of top contributions per player.
+
+    Returns:
+        tuple: (shap_df, top_df) where `shap_df` has "code", "base_value"
+        and a SHAP value per feature for every player, and `top_df` is the
+        `top_contributions` view.
+
+    Raises:
+        ValueError: If the rows do not match the model's feature spec or
+            the columns the model was fitted on.
+    """
+    X, meta_df = prepare_features(current_df)
+    spec = load_feature_spec(model_path) if spec is None else spec
+    if spec is not None:
+        X = spec.to_frame(X)
+    version = model_version(model_path) + ("" if approximate else "-exact")
+    path = explanation_path(gw, year, version, input_hash(X), output_dir)
+
+    if os.path.exists(path):
+        shap_df = pd.read_csv(path)
+    else:
+        start = time.time()
+        model = load_model(model_path) if model is None else model
+        check_model_columns(model, list(X.columns))
+        shap_df = compute_shap_values(model, X, n_jobs, approximate)
+        shap_df.insert(0, "code", meta_df["code"].to_numpy())
+        os.makedirs(output_dir, exist_ok=True)
+        shap_df.to_csv(path, index=False)
+        print(f"Computed SHAP values for {len(X)} players in {time.time() - start:.1f} seconds")
+
+    return shap_df, top_contributions(shap_df, X, meta_df["code"], k)
+
+
+def show_top_contributions(top_df: pd.DataFrame, predictions: pd.DataFrame, n: int = 5) -> None:
+    """
+    Print the top contributions for the `n` players with the highest predictions.
+
+    Args:
+        top_df (pd.DataFrame): Output of `top_contributions`.
+        predictions (pd.DataFrame): Predictions with "code", "first_name",
+            "second_name" and "total_points_predictions".
+        n (int): Number of players to show.
+    """
+    for row in predictions.nlargest(n, "total_points_predictions").itertuples():
+        print(f"\n{row.first_name} {row.second_name} ({row.total_points_predictions:.2f} pts)")
+        for contribution in top_df[top_df["code"] == row.code].itertuples():
+            print(f"  {contribution.feature:<28} {contribution.feature_value:>8.2f}  {contribution.shap_value:+.2f}")
@@ -1,5 +1,6 @@
 import pandas as pd
-import os
+
+from src.data.repository import read_predictions
 
 ELEMENT_TYPE_MAP = {0: "Goalkeepers", 1: "Defenders", 2: "Midfielders", 3: "Forwards"}
 
@@ -10,8 +11,11 @@ def get_top_n(df: pd.DataFrame, element_type: int, n: int) -> pd.DataFrame:
 
     This function filters the prediction DataFrame by the specified
     `element_type` (e.g., 0 = GK, 1 = DEF, 2 = MID, 3 = FWD depending on
-    your encoding), sorts the players in descending order of their
-    predicted total points, and returns the top N players.
+    your encoding) and selects the N players with the highest predicted
+    total points without sorting the whole position.
+
+    For repeated queries across positions or gameweeks, build a
+    `RankingIndex` (see `src.analysis.ranking_index`) instead.
 
     Args:
         df (pd.DataFrame): DataFrame containing player predictions.
@@ -27,7 +31,7 @@ def get_top_n(df: pd.DataFrame, element_type: int, n: int) -> pd.DataFrame:
         (highest first).
     """
     filtered = df[df["element_type"] == element_type]
-    top_n = filtered.sort_values(by="total_points_predictions", ascending=False).head(n)
+    top_n = filtered.nlargest(n, "total_points_predictions", keep="first")
     return top_n.reset_index(drop=True)
 
 
@@ -59,6 +63,9 @@ def load_final_predictions(gw: int, year: str) -> pd.DataFrame:
     """
     Load the final predictions DataFrame for a given gameweek and season.
 
+    Files are served from the shared data repository, so repeated loads
+    of an unchanged file do not re-read it.
+
     Args:
         gw (int): The gameweek number.
         year (str): The season string (e.g., "2025-26").
@@ -69,14 +76,7 @@ def load_final_predictions(gw: int, year: str) -> pd.DataFrame:
     Raises:
         FileNotFoundError: If the predictions file does not exist.
     """
-    file_path = os.path.join(
-        "outputs", "predictions", f"{gw}_{year}_v1b_predictions.csv"
-    )
-
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Predictions file not found: {file_path}")
-
-    return pd.read_csv(file_path)
+    return read_predictions(gw, year)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,425 @@
+import bisect
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import (
+    CUMULATIVE_STATS, CURRENT_COLUMNS, EXPECTED_STATS, FEATURE_COLUMNS, FeatureStore, compute_features,
+    current_features, feature_flags, impute_prev_features, index_prev_season
+)
+from src.data.fixture_calendar import FixtureCalendar, add_fixture_features
+from src.data.player_panel import add_lag_features, panel_lag_features
+from src.data.repository import read_season_data
+from src.data.rolling_form import FORM_COLUMNS, FORM_STATS, rolling_form
+from src.model.feature_spec import check_model_columns, predict_array
+from src.model.make_predictions import flatten_forest, load_model_and_spec, predict_flat
+
+API_SNAPSHOT_DIR = "data/raw/official_fpl_api"
+WATCH_COLUMNS = ["code", "first_name", "second_name", "element_type", "now_cost", "team"] + CUMULATIVE_STATS
+# Up to this many changed players are scored with `predict_flat`, above it
+# `model.predict` is faster.
+FLAT_PREDICT_MAX_ROWS = 64
+
+
+class ReplaySource:
+    """
+    Stand-in for the FPL API that replays recorded `bootstrap-static` snapshots.
+
+    Each call returns the next recorded snapshot; the last one is repeated
+    once the recording is exhausted.
+    """
+
+    def __init__(self, paths):
+        """
+        Args:
+            paths (list of str): Recorded snapshot CSVs, oldest first.
+        """
+        self.paths = list(paths)
+        self.position = 0
+
+    def __call__(self) -> pd.DataFrame:
+        path = self.paths[min(self.position, len(self.paths) - 1)]
+        self.position += 1
+        return pd.read_csv(path)
+
+    def exhausted(self) -> bool:
+        return self.position >= len(self.paths)
+
+
+def api_source() -> pd.DataFrame:
+    """Pull the live player table from the FPL API without saving it."""
+    from src.data.pull_current_fpl_api import pull_api_data
+
+    return pull_api_data(save=False)
+
+
+class LiveRankings:
+    """
+    Positional rankings kept up to date from successive API snapshots.
+
+    Snapshots are diffed against the previous one by player `code`. Only
+    players whose stats changed (the dirty set) are updated: their
+    `current_` features are recomputed in the cached feature matrix (the
+    previous season features cannot change mid-season), they are re-scored
+    by walking the flattened forest, and each is moved within its
+    position's sorted ranking by binary search. Apart from the snapshot
+    diff itself, a tick costs time in the number of changed players rather
+    than the size of the pool. Ties in predicted points are broken by `code`.
+
+    Each tick returns a change feed: one row per player whose rank moved,
+    including players displaced by the changed ones and players who move
+    up when a changed player leaves their position. Players pushed down
+    only by newly listed players are not reported.
+
+    For models trained with fixture, form or lag features, those columns
+    are built as `FeatureStore.read_latest` builds them: fixtures from the
+    season's calendar, lags from the `data/prev_years` panel, and form
+    against the gameweeks stored for the season before `gw`. Form changes
+    with the live totals, so it is recomputed for changed players.
+    """
+
+    def __init__(self, model, year: str, prev_year: str, gw: int, matches,
+                 fill_values: pd.Series = None, spec=None, calendar: FixtureCalendar = None,
+                 store: FeatureStore = None):
+        """
+        Args:
+            model: Fitted model with a `predict` method.
+            year (str): Current season (e.g. "2025-26").
+            prev_year (str): Previous season (e.g. "2024-25").
+            gw (int): The gameweek being played.
+            matches (int or pd.Series): Fixtures each team plays in `gw`, as
+                a scalar or a Series indexed by team id (e.g.
+                `pull_fixture_counts(gw)`); teams missing from it blank.
+            fill_values (pd.Series, optional): Imputation values for the
+                `prev_` columns, normally `FeatureStore.imputation_values()`.
+                Defaults to the spec's training values; without a spec,
+                missing values are left as NaN.
+            spec (FeatureSpec, optional): The model's feature spec. Feature
+                rows are then checked and assembled by `spec.to_array`, in
+                the spec's column order.
+            calendar (FixtureCalendar, optional): The season's fixtures,
+                needed if the spec has next-fixture features.
+            store (FeatureStore, optional): Store holding the season's
+                earlier gameweeks, for form features. Defaults to
+                `FeatureStore()`.
+
+        Raises:
+            ValueError: If the model was fitted on other columns than the
+                ones built here, or uses fixture features without a
+                `calendar`.
+        """
+        self.columns = spec.columns if spec is not None else FEATURE_COLUMNS
+        check_model_columns(model, self.columns)
+        flags = feature_flags(self.columns)
+        if flags["fixtures"] and calendar is None:
+            raise ValueError("The model uses next-fixture features; pass the season's FixtureCalendar")
+        self.model = model
+        self.spec = spec
+        self.forest = flatten_forest(model) if hasattr(model, "estimators_") else None
+        self.year = year
+        self.gw = gw
+        self.matches = matches
+        self.fill_values = fill_values
+        self.prev_index = index_prev_season(read_season_data(prev_year))
+        self.calendar = calendar if flags["fixtures"] else None
+        self.lag_features = panel_lag_features() if flags["lags"] else None
+        self.form_history = None
+        if flags["form"]:
+            store = FeatureStore() if store is None else store
+            totals = ["code", "gw"] + [f"current_{stat}" for stat in FORM_STATS]
+            stored = store.read(year) if store.has(year) else pd.DataFrame(columns=totals)
+            stored = stored[stored["gw"] < gw]
+            self.form_history = stored.reindex(columns=totals).reset_index(drop=True)
+            self.form_gameweeks = self.form_history["gw"].unique()
+
+        self.snapshot = None
+        self.X = None
+        self.row_of = {}
+        self.names = {}
+        self.positions = {}
+        self.predictions = {}
+        self._keys = {}
+        self._codes = {}
+        self.stats = {"ticks": 0, "players_rescored": 0, "last_tick_ms": 0.0}
+
+    def _add_rows(self, rows: pd.DataFrame) -> None:
+        """Compute full feature rows, overwriting known players' rows in `self.X` and appending new ones."""
+        matches = self.matches
+        if isinstance(matches, pd.Series):
+            matches = rows["team"].map(matches).fillna(0).astype(int)
+        features = compute_features(rows.assign(gw=self.gw, matches=matches), self.prev_index, self.year)
+        if self.calendar is not None:
+            features = add_fixture_features(features, self.calendar)
+        if self.form_history is not None:
+            features = pd.concat([features, self._form(features)], axis=1)
+        if self.lag_features is not None:
+            features = add_lag_features(features, self.lag_features)
+        # Gaps left by `fill_values` get the spec's training values.
+        if self.fill_values is not None:
+            features = impute_prev_features(features, self.fill_values)
+        if self.spec is not None:
+            features = self.spec.to_array(features)
+        else:
+            features = features[FEATURE_COLUMNS].to_numpy(dtype=float)
+        known = rows.index.isin(list(self.row_of))
+        if known.any():
+            self.X[[self.row_of[code] for code in rows.index[known]]] = features[known]
+        start = 0 if self.X is None else len(self.X)
+        added = features[~known]
+        self.X = added if self.X is None else np.vstack([self.X, added])
+        self.row_of.update(zip(rows.index[~known], range(start, start + len(added))))
+
+    def _form(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Rolling form of rows at `self.gw` against the season's stored earlier gameweeks."""
+        history = self.form_history[self.form_history["code"].isin(features["code"])]
+        rows = pd.concat([history, features.reindex(columns=history.columns)], ignore_index=True)
+        form = rolling_form(rows, gameweeks=self.form_gameweeks)
+        return form.iloc[len(history):].set_axis(features.index)
+
+    def _predict(self, codes) -> dict:
+        X = self.X[[self.row_of[code] for code in codes]]
+        if self.forest is not None and len(X) <= FLAT_PREDICT_MAX_ROWS:
+            predictions = predict_flat(self.forest, X)
+        else:
+            predictions = predict_array(self.model, X)
+        return dict(zip(codes, predictions.tolist()))
+
+    def start(self, snapshot: pd.DataFrame) -> None:
+        """
+        Score and rank every player of the first snapshot.
+
+        Args:
+            snapshot (pd.DataFrame): FPL API player table.
+        """
+        self.snapshot = _watch_rows(snapshot)
+        self._add_rows(self.snapshot)
+        self.names = (self.snapshot["first_name"] + " " + self.snapshot["second_name"]).to_dict()
+        self.positions = (self.snapshot["element_type"] - 1).to_dict()
+        self.predictions = self._predict(list(self.snapshot.index))
+
+        for position in set(self.positions.values()):
+            codes = [code for code, p in self.positions.items() if p == position]
+            keys = sorted((-self.predictions[code], code) for code in codes)
+            self._keys[position] = keys
+            self._codes[position] = [code for _, code in keys]
+
+    def rank_of(self, code: int) -> int:
+        """Return a player's 1-based rank within their position."""
+        position = self.positions[code]
+        return bisect.bisect_left(self._keys[position], (-self.predictions[code], code)) + 1
+
+    def top_n(self, element_type: int, n: int) -> pd.DataFrame:
+        """Return the current top N of a position with names and predicted points."""
+        codes = self._codes[element_type][:n]
+        return pd.DataFrame({
+            "rank": range(1, len(codes) + 1),
+            "code": codes,
+            "name": [self.names[code] for code in codes],
+            "total_points_predictions": [self.predictions[code] for code in codes],
+        })
+
+    def tick(self, snapshot: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply a new snapshot and return the rank movements it caused.
+
+        Args:
+            snapshot (pd.DataFrame): FPL API player table.
+
+        Returns:
+            pd.DataFrame: Change feed with columns "code", "name",
+            "element_type", "old_rank", "new_rank", "movement" (positive
+            means the player climbed) and "total_points_predictions".
+        """
+        start = time.perf_counter()
+        current = _watch_rows(snapshot)
+        known = current.index.isin(self.snapshot.index)
+        previous = self.snapshot.reindex(current.index[known])
+        moved = current[known][["team", "element_type"]].ne(previous[["team", "element_type"]]).any(axis=1)
+        changed = current[known][CUMULATIVE_STATS].ne(previous[CUMULATIVE_STATS]).any(axis=1) | moved
+        dirty = current.loc[changed.index[changed.to_numpy()].append(current.index[~known])]
+        self.snapshot = current
+
+        # Players who are new, changed position or changed club (and so
+        # fixture count) need full feature rows.
+        new = ~dirty.index.isin(list(self.row_of)) | dirty.index.isin(moved.index[moved.to_numpy()])
+        if new.any():
+            self._add_rows(dirty[new])
+        if (~new).any():
+            rows = [self.row_of[code] for code in dirty.index[~new]]
+            current = current_features(dirty[~new][CUMULATIVE_STATS]).round(2)
+            self.X[np.ix_(rows, [self.columns.index(col) for col in CURRENT_COLUMNS])] = current.to_numpy()
+            if self.form_history is not None:
+                for stat in EXPECTED_STATS:
+                    if stat in dirty:
+                        current[f"current_{stat}"] = dirty[~new][stat]
+                form = self._form(current.assign(code=current.index, gw=self.gw))
+                form_cols = [col for col in FORM_COLUMNS if col in self.columns]
+                self.X[np.ix_(rows, [self.columns.index(col) for col in form_cols])] = form[form_cols].to_numpy()
+
+        feed = []
+        if len(dirty):
+            new_predictions = self._predict(list(dirty.index))
+            element_types = (dirty["element_type"] - 1).to_dict()
+            for position in set(element_types.values()):
+                group = {code: points for code, points in new_predictions.items() if element_types[code] == position}
+                feed.extend(self._patch(int(position), group, dirty))
+
+        self.stats["ticks"] += 1
+        self.stats["players_rescored"] += len(dirty)
+        self.stats["last_tick_ms"] = 1000 * (time.perf_counter() - start)
+        return pd.DataFrame(feed, columns=[
+            "code", "name", "element_type", "old_rank", "new_rank", "movement", "total_points_predictions"
+        ])
+
+    def _patch(self, position: int, new_predictions: dict, dirty: pd.DataFrame) -> list:
+        """Move re-scored players within one position's ranking and list who moved."""
+        keys = self._keys.setdefault(position, [])
+        codes = self._codes.setdefault(position, [])
+
+        old_keys = {}
+        left = {}
+        for code in new_predictions:
+            if code not in self.predictions:
+                continue
+            old_position = self.positions[code]
+            old_key = (-self.predictions[code], code)
+            index = bisect.bisect_left(self._keys[old_position], old_key)
+            del self._keys[old_position][index], self._codes[old_position][index]
+            if old_position == position:
+                old_keys[code] = old_key
+            else:
+                left.setdefault(old_position, []).append(old_key)
+        for code, points in new_predictions.items():
+            key = (-points, code)
+            index = bisect.bisect_left(keys, key)
+            keys.insert(index, key)
+            codes.insert(index, code)
+            self.predictions[code] = points
+            self.positions[code] = position
+            self.names[code] = f"{dirty.at[code, 'first_name']} {dirty.at[code, 'second_name']}"
+
+        # A player's old rank counts the keys ahead of them before the patch:
+        # the current keys, minus the re-scored players' new keys, plus
+        # their old keys. Only ranks between the highest and lowest old or
+        # new key of a re-scored player can have changed.
+        new_keys = sorted((-points, code) for code, points in new_predictions.items())
+        old_sorted = sorted(old_keys.values())
+        bounds = [bisect.bisect_left(keys, key) for key in new_keys + old_sorted]
+
+        feed = []
+        for index in range(min(bounds), min(max(bounds) + 1, len(keys))):
+            code = codes[index]
+            if code in new_predictions and code not in old_keys:
+                old_rank = None
+            else:
+                key = old_keys.get(code, keys[index])
+                old_rank = (bisect.bisect_left(keys, key) - bisect.bisect_left(new_keys, key)
+                            + bisect.bisect_left(old_sorted, key) + 1)
+            new_rank = index + 1
+            if old_rank != new_rank:
+                feed.append(self._feed_row(code, position, old_rank, new_rank))
+
+        # Everyone below a player who left their old position moves up.
+        for old_position, gone in left.items():
+            gone.sort()
+            remaining_keys, remaining_codes = self._keys[old_position], self._codes[old_position]
+            for index in range(bisect.bisect_left(remaining_keys, gone[0]), len(remaining_keys)):
+                old_rank = index + bisect.bisect_left(gone, remaining_keys[index]) + 1
+                feed.append(self._feed_row(remaining_codes[index], old_position, old_rank, index + 1))
+        return feed
+
+    def _feed_row(self, code: int, position: int, old_rank, new_rank: int) -> dict:
+        return {
+            "code": code,
+            "name": self.names[code],
+            "element_type": position,
+            "old_rank": old_rank,
+            "new_rank": new_rank,
+            "movement": None if old_rank is None else old_rank - new_rank,
+            "total_points_predictions": self.predictions[code],
+        }
+
+
+def _watch_rows(snapshot: pd.DataFrame) -> pd.DataFrame:
+    # The API sends expected stats as strings; they are kept for form features.
+    expected = [stat for stat in EXPECTED_STATS if stat in snapshot]
+    rows = snapshot.set_index("code", drop=False)[WATCH_COLUMNS + expected]
+    return rows.astype({stat: float for stat in expected})
+
+
+def print_feed(feed: pd.DataFrame, tick_ms: float, limit: int = 20) -> None:
+    """Print up to `limit` rows of a tick's change feed, new players and biggest movements first."""
+    if feed.empty:
+        print(f"No rank changes ({tick_ms:.1f} ms)")
+        return
+    print(f"{len(feed)} rank changes ({tick_ms:.1f} ms)")
+    ordered = feed.sort_values("movement", key=abs, ascending=False, na_position="first")
+    for row in ordered.head(limit).itertuples():
+        movement = "new" if pd.isna(row.movement) else f"{int(row.movement):+d}"
+        print(f"  {row.name:<25} {row.old_rank if row.old_rank else '-':>4} -> {row.new_rank:<4} "
+              f"({movement}) {row.total_points_predictions:.2f} pts")
+
+
+def watch(gw: int, year: str = "2025-26", prev_year: str = "2024-25",
+          model_path: str = "models/random_forest_model.pkl", interval: float = 60.0,
+          source=None, max_ticks: int = None, fill_values: pd.Series = None,
+          on_change=print_feed, matches=None) -> LiveRankings:
+    """
+    Poll the FPL API during a live gameweek and keep rankings up to date.
+
+    Args:
+        gw (int): The gameweek being played.
+        year (str): Current season (e.g. "2025-26").
+        prev_year (str): Previous season (e.g. "2024-25").
+        model_path (str): Path to the trained model pickle file.
+        interval (float): Seconds between polls.
+        source (callable, optional): Returns the next player table. Defaults
+            to the live API; pass a `ReplaySource` to replay recordings.
+        max_ticks (int, optional): Stop after this many updates. A
+            `ReplaySource` also stops when its recording runs out.
+        fill_values (pd.Series, optional): Imputation values for the
+            `prev_` columns. Defaults to the model's feature spec values,
+            or for models without a spec to the feature store's training
+            means.
+        on_change (callable): Called with each tick's change feed and time in ms.
+        matches (int or pd.Series, optional): Fixtures each team plays in
+            `gw`, indexed by team id. Defaults to `pull_fixture_counts(gw)`,
+            so double and blank gameweeks are scored correctly.
+
+    Returns:
+        LiveRankings: The rankings after the last tick.
+    """
+    from src.data.pull_current_fpl_api import pull_fixture_counts, pull_fixtures
+
+    source = api_source if source is None else source
+    model, spec = load_model_and_spec(model_path)
+    if fill_values is None and spec is None:
+        store = FeatureStore()
+        if store.historical_seasons():
+            fill_values = store.imputation_values()
+    matches = pull_fixture_counts(gw) if matches is None else matches
+    calendar = None
+    if spec is not None and feature_flags(spec.columns)["fixtures"]:
+        calendar = FixtureCalendar.from_api(pull_fixtures())
+    rankings = LiveRankings(model, year, prev_year, gw, matches, fill_values, spec, calendar)
+    rankings.start(source())
+    print(f"Watching GW{gw} {year} with {len(rankings.predictions)} players")
+
+    ticks = 0
+    while max_ticks is None or ticks < max_ticks:
+        if isinstance(source, ReplaySource) and source.exhausted():
+            break
+        if not isinstance(source, ReplaySource):
+            time.sleep(interval)
+        feed = rankings.tick(source())
+        on_change(feed, rankings.stats["last_tick_ms"])
+        ticks += 1
+    return rankings
+
+
+if __name__ == "__main__":
+    # Replay the Monday night game and overnight bonus of GW1 2025-26, in
+    # which every team played once.
+    recorded = sorted(f for f in os.listdir(API_SNAPSHOT_DIR) if "2025_08_18_16" < f < "2025_08_20")
+    watch(1, source=ReplaySource([os.path.join(API_SNAPSHOT_DIR, f) for f in recorded]), matches=1)
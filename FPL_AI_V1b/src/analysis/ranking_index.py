@@ -0,0 +1,195 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+from src.data.repository import read_predictions
+
+PREDICTIONS_DIR = "outputs/predictions"
+PREDICTIONS_PATTERN = re.compile(r"^(\d+)_(\d{4}-\d{2})_v1b_predictions\.csv$")
+
+
+class RankingIndex:
+    """
+    Per-position ranking index over one or more gameweeks of predictions.
+
+    Each gameweek's predictions are sorted once by (element_type,
+    predicted points) so that every position occupies a contiguous,
+    already ranked block. Top-N queries are then a slice, and a player's
+    rank is a dictionary lookup, so no query re-filters or re-sorts the
+    predictions.
+
+    Ranks are 1-based and computed within the player's position.
+    """
+
+    def __init__(self):
+        self._frames = {}
+        self._bounds = {}
+        self._ranks = {}
+
+    def add_gameweek(self, df: pd.DataFrame, gw: int, year: str) -> None:
+        """
+        Index the predictions for a single gameweek.
+
+        Args:
+            df (pd.DataFrame): DataFrame containing player predictions.
+                Must include columns:
+                    - "code"
+                    - "element_type"
+                    - "total_points_predictions"
+            gw (int): The gameweek number.
+            year (str): The season string (e.g., "2025-26").
+        """
+        element_types = df["element_type"].to_numpy()
+        predictions = df["total_points_predictions"].to_numpy()
+
+        # Stable sort keeps file order for tied predictions, matching get_top_n.
+        order = np.lexsort((-predictions, element_types))
+        sorted_df = df.iloc[order].reset_index(drop=True)
+        sorted_types = element_types[order]
+
+        positions = np.unique(sorted_types)
+        starts = np.searchsorted(sorted_types, positions, side="left")
+        ends = np.searchsorted(sorted_types, positions, side="right")
+        bounds = {int(p): (int(s), int(e)) for p, s, e in zip(positions, starts, ends)}
+
+        ranks = np.empty(len(sorted_df), dtype=np.int64)
+        for start, end in bounds.values():
+            ranks[start:end] = np.arange(1, end - start + 1)
+
+        codes = sorted_df["code"].to_numpy()
+        self._frames[(gw, year)] = sorted_df
+        self._bounds[(gw, year)] = bounds
+        self._ranks[(gw, year)] = dict(zip(codes.tolist(), zip(sorted_types.tolist(), ranks.tolist())))
+
+    def gameweeks(self, year: str | None = None) -> list:
+        """Return the indexed (gw, year) keys in chronological order."""
+        keys = [key for key in self._frames if year is None or key[1] == year]
+        return sorted(keys, key=lambda key: (key[1], key[0]))
+
+    def top_n(self, gw: int, year: str, element_type: int, n: int) -> pd.DataFrame:
+        """
+        Get the top N players by predicted total points for a position.
+
+        Args:
+            gw (int): The gameweek number.
+            year (str): The season string (e.g., "2025-26").
+            element_type (int): The player element type to filter on.
+            n (int): The number of top players to return.
+
+        Returns:
+            pd.DataFrame: The top N players of the position, highest first.
+        """
+        start, end = self._bounds[(gw, year)].get(element_type, (0, 0))
+        top = self._frames[(gw, year)].iloc[start:min(start + n, end)]
+        return top.reset_index(drop=True)
+
+    def rank_of(self, code: int, gw: int, year: str) -> int | None:
+        """
+        Return a player's rank within their position for a gameweek.
+
+        Args:
+            code (int): The player's FPL `code`.
+            gw (int): The gameweek number.
+            year (str): The season string (e.g., "2025-26").
+
+        Returns:
+            int | None: The 1-based positional rank, or None if the player
+            has no prediction for that gameweek.
+        """
+        entry = self._ranks[(gw, year)].get(code)
+        return None if entry is None else entry[1]
+
+    def rank_movement(self, code: int, from_gw: int, to_gw: int, year: str) -> int | None:
+        """
+        Return how many places a player moved between two gameweeks.
+
+        Positive values mean the player climbed the rankings.
+
+        Returns:
+            int | None: The movement, or None if the player is missing
+            from either gameweek.
+        """
+        before = self.rank_of(code, from_gw, year)
+        after = self.rank_of(code, to_gw, year)
+        if before is None or after is None:
+            return None
+        return before - after
+
+    def rank_history(self, code: int, year: str) -> pd.DataFrame:
+        """
+        Return a player's positional rank for every indexed gameweek of a season.
+
+        Returns:
+            pd.DataFrame: One row per gameweek with columns "gw", "rank"
+            and "total_points_predictions".
+        """
+        rows = []
+        for gw, season in self.gameweeks(year):
+            entry = self._ranks[(gw, season)].get(code)
+            if entry is None:
+                continue
+            element_type, rank = entry
+            start, _ = self._bounds[(gw, season)][element_type]
+            points = self._frames[(gw, season)]["total_points_predictions"].iat[start + rank - 1]
+            rows.append({"gw": gw, "rank": rank, "total_points_predictions": points})
+        return pd.DataFrame(rows, columns=["gw", "rank", "total_points_predictions"])
+
+    def movements(self, from_gw: int, to_gw: int, year: str, element_type: int | None = None) -> pd.DataFrame:
+        """
+        Return rank movements for every player present in both gameweeks.
+
+        Args:
+            from_gw (int): The earlier gameweek.
+            to_gw (int): The later gameweek.
+            year (str): The season string (e.g., "2025-26").
+            element_type (int, optional): Restrict to a single position.
+
+        Returns:
+            pd.DataFrame: Columns "code", "element_type", "rank_before",
+            "rank_after" and "movement", biggest climbers first.
+        """
+        before = self._ranks[(from_gw, year)]
+        after = self._ranks[(to_gw, year)]
+        rows = [
+            (code, position, rank, after[code][1])
+            for code, (position, rank) in before.items()
+            if code in after and (element_type is None or position == element_type)
+        ]
+        df = pd.DataFrame(rows, columns=["code", "element_type", "rank_before", "rank_after"])
+        df["movement"] = df["rank_before"] - df["rank_after"]
+        return df.sort_values(by="movement", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def load_ranking_index(year: str | None = None, predictions_dir: str = PREDICTIONS_DIR) -> RankingIndex:
+    """
+    Build a ranking index from every stored predictions file.
+
+    Each predictions CSV is read exactly once; all later queries are
+    answered from memory.
+
+    Args:
+        year (str, optional): Only index files for this season.
+        predictions_dir (str): Directory containing
+            `{gw}_{year}_v1b_predictions.csv` files.
+
+    Returns:
+        RankingIndex: The populated index.
+    """
+    index = RankingIndex()
+    for file in sorted(os.listdir(predictions_dir)):
+        match = PREDICTIONS_PATTERN.match(file)
+        if match is None:
+            continue
+        gw, season = int(match.group(1)), match.group(2)
+        if year is not None and season != year:
+            continue
+        index.add_gameweek(read_predictions(gw, season, predictions_dir), gw, season)
+    return index
+
+
+if __name__ == "__main__":
+    index = load_ranking_index("2025-26")
+    for gw, year in index.gameweeks():
+        print(f"Indexed GW{gw} {year}")
+    print(index.movements(1, 4, "2025-26").head(10))
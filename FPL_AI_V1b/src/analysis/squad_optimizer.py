@@ -0,0 +1,312 @@
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+ELEMENT_TYPE_MAP = {0: "GK", 1: "DEF", 2: "MID", 3: "FWD"}
+
+# FPL squad rules. Costs use the API's `now_cost` units (tenths of £1m).
+BUDGET = 1000
+MAX_PER_CLUB = 3
+SQUAD_QUOTAS = {0: 2, 1: 5, 2: 5, 3: 3}
+STARTING_XI_SIZE = 11
+STARTING_XI_LIMITS = {0: (1, 1), 1: (3, 5), 2: (2, 5), 3: (1, 3)}
+
+# Weight given to bench players' points so that, among squads with the same
+# starting XI, the one with the stronger bench is preferred.
+BENCH_WEIGHT = 0.1
+
+
+def prune_dominated_players(df: pd.DataFrame, points_col: str = "total_points_predictions",
+                            keep_codes=None) -> pd.DataFrame:
+    """
+    Remove players that can never be needed in an optimal squad.
+
+    A player is dominated by another player of the same position who costs
+    no more and is predicted no fewer points. If a player's dominators come
+    from at least `quota + 4` different clubs, then in any squad containing
+    the player at least one dominator is both unpicked and from a club with
+    a free slot, so swapping them in is always legal and never worse.
+    Such players are dropped, which typically shrinks the pool several-fold
+    without changing the optimum.
+
+    Args:
+        df (pd.DataFrame): Candidate players. Must include columns
+            "element_type", "now_cost", "team" and `points_col`.
+        points_col (str): Column holding the points to maximise.
+        keep_codes (iterable, optional): Player codes that must never be
+            pruned (e.g. players forced into the squad).
+
+    Returns:
+        pd.DataFrame: The non-dominated players.
+    """
+    keep_codes = set() if keep_codes is None else set(keep_codes)
+    clubs = pd.factorize(df["team"])[0]
+    club_onehot = np.eye(clubs.max() + 1, dtype=np.float32)[clubs]
+
+    keep = np.ones(len(df), dtype=bool)
+    element_types = df["element_type"].to_numpy()
+    costs = df["now_cost"].to_numpy()
+    points = df[points_col].to_numpy()
+    codes = df["code"].to_numpy()
+    order = np.arange(len(df))
+
+    for element_type, quota in SQUAD_QUOTAS.items():
+        rows = np.flatnonzero(element_types == element_type)
+        cost, pts, idx = costs[rows], points[rows], order[rows]
+
+        # dominated[i, j] is True when player j dominates player i. Ties are
+        # broken by row order so two identical players never remove each other.
+        cheaper = cost[None, :] <= cost[:, None]
+        better = pts[None, :] >= pts[:, None]
+        strict = (cost[None, :] < cost[:, None]) | (pts[None, :] > pts[:, None]) | (idx[None, :] < idx[:, None])
+        dominated = cheaper & better & strict
+
+        dominating_clubs = ((dominated.astype(np.float32) @ club_onehot[rows]) > 0).sum(axis=1)
+        keep[rows] = dominating_clubs < quota + 4
+
+    keep |= np.isin(codes, list(keep_codes))
+    return df[keep]
+
+
+def optimize_squad(
+    df: pd.DataFrame,
+    budget: int = BUDGET,
+    points_col: str = "total_points_predictions",
+    bench_weight: float = BENCH_WEIGHT,
+    include=None,
+    exclude=None,
+    max_per_club: int = MAX_PER_CLUB,
+) -> pd.DataFrame:
+    """
+    Select the best legal 15-player FPL squad, starting XI and captain.
+
+    The selection is solved exactly as a mixed-integer linear programme.
+    Squad, starting XI and captain are decided jointly, maximising
+
+        starting XI points + captain points + bench_weight * bench points
+
+    subject to the budget, the 2/5/5/3 positional quotas, at most
+    `max_per_club` players per club, a valid formation (1 GK, 3-5 DEF,
+    2-5 MID, 1-3 FWD) and one captain from the starting XI.
+
+    Args:
+        df (pd.DataFrame): Player predictions. Must include columns
+            "code", "element_type", "now_cost", "team" and `points_col`.
+        budget (int): Squad budget in `now_cost` units (1000 = £100.0m).
+        points_col (str): Column holding the points to maximise.
+        bench_weight (float): Weight of bench players' points.
+        include (iterable, optional): Player codes that must be picked.
+        exclude (iterable, optional): Player codes that must not be picked.
+        max_per_club (int): Maximum players from a single club.
+
+    Returns:
+        pd.DataFrame: The 15 selected players with added boolean columns
+        "in_starting_xi" and "is_captain", ordered by position with the
+        starting XI first.
+
+    Raises:
+        KeyError: If a required column is missing.
+        ValueError: If no legal squad exists under the constraints.
+    """
+    required = ["code", "element_type", "now_cost", "team", points_col]
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise KeyError(f"Predictions are missing columns required for squad selection: {missing}")
+
+    include = set() if include is None else set(include)
+    exclude = set() if exclude is None else set(exclude)
+
+    pool = df.dropna(subset=required)
+    pool = pool[~pool["code"].isin(exclude)]
+    pool = prune_dominated_players(pool, points_col, keep_codes=include).reset_index(drop=True)
+
+    n = len(pool)
+    points = pool[points_col].to_numpy(dtype=float)
+    costs = pool["now_cost"].to_numpy(dtype=float)
+    element_types = pool["element_type"].to_numpy()
+    clubs = pd.factorize(pool["team"])[0]
+    zeros = np.zeros(n)
+
+    # Variables: s (starter), b (bench), c (captain), each of length n.
+    objective = -np.concatenate([points, bench_weight * points, points])
+
+    rows, lower, upper = [], [], []
+
+    def add(starter, bench, captain, lo, hi):
+        rows.append(np.concatenate([starter, bench, captain]))
+        lower.append(lo)
+        upper.append(hi)
+
+    add(costs, costs, zeros, 0, budget)
+    for element_type, quota in SQUAD_QUOTAS.items():
+        mask = (element_types == element_type).astype(float)
+        add(mask, mask, zeros, quota, quota)
+        lo, hi = STARTING_XI_LIMITS[element_type]
+        add(mask, zeros, zeros, lo, hi)
+    for club in np.unique(clubs):
+        mask = (clubs == club).astype(float)
+        add(mask, mask, zeros, 0, max_per_club)
+    add(np.ones(n), zeros, zeros, STARTING_XI_SIZE, STARTING_XI_SIZE)
+    add(zeros, zeros, np.ones(n), 1, 1)
+
+    eye = sparse.identity(n, format="csr")
+    empty = sparse.csr_matrix((n, n))
+    linking = sparse.vstack([
+        sparse.hstack([eye, eye, empty]),   # s + b <= 1
+        sparse.hstack([-eye, empty, eye]),  # c <= s
+    ])
+    constraints = [
+        LinearConstraint(np.vstack(rows), lower, upper),
+        LinearConstraint(linking, -np.inf, np.concatenate([np.ones(n), zeros])),
+    ]
+
+    # Forced players must be picked either as a starter or on the bench.
+    forced = pool["code"].isin(include).to_numpy(dtype=float)
+    if forced.any():
+        constraints.append(LinearConstraint(sparse.hstack([eye, eye, empty]), forced, 1))
+
+    result = milp(
+        objective,
+        constraints=constraints,
+        integrality=np.ones(3 * n),
+        bounds=Bounds(0, 1),
+        options={"mip_rel_gap": 0},
+    )
+    if not result.success:
+        raise ValueError(f"No legal squad found: {result.message}")
+
+    solution = np.round(result.x).astype(bool)
+    starters, bench, captain = solution[:n], solution[n:2 * n], solution[2 * n:]
+    picked = starters | bench
+    squad = pool[picked].copy()
+    squad["in_starting_xi"] = starters[picked]
+    squad["is_captain"] = captain[picked]
+    squad = squad.sort_values(
+        by=["in_starting_xi", "element_type", points_col],
+        ascending=[False, True, False],
+    )
+    return squad.reset_index(drop=True)
+
+
+def squad_points(squad: pd.DataFrame, points_col: str = "total_points_predictions") -> float:
+    """Return the starting XI's predicted points with the captain counted twice."""
+    starters = squad[squad["in_starting_xi"]]
+    return float(starters[points_col].sum() + starters.loc[starters["is_captain"], points_col].sum())
+
+
+def show_squad(squad: pd.DataFrame, points_col: str = "total_points_predictions") -> None:
+    """
+    Print a squad returned by `optimize_squad`.
+
+    Args:
+        squad (pd.DataFrame): The selected squad.
+        points_col (str): Column holding the predicted points.
+    """
+    for starting, title in ((True, "Starting XI"), (False, "Bench")):
+        print(f"\n=== {title} ===")
+        for _, row in squad[squad["in_starting_xi"] == starting].iterrows():
+            full_name = f"{row['first_name']} {row['second_name']}"
+            captain = " (C)" if row["is_captain"] else ""
+            position = ELEMENT_TYPE_MAP[row["element_type"]]
+            print(f"{position:<4} {full_name + captain:<30} £{row['now_cost'] / 10:.1f}m {row[points_col]:.2f} pts")
+
+    print(f"\nSquad cost: £{squad['now_cost'].sum() / 10:.1f}m")
+    print(f"Predicted points (XI + captain): {squad_points(squad, points_col):.2f}")
+
+
+def optimize_variants(df: pd.DataFrame, variants, points_col: str = "total_points_predictions",
+                      n_jobs: int = -1, **kwargs) -> list:
+    """
+    Solve `optimize_squad` for many what-if variants of the predictions.
+
+    Variants are solved independently across `n_jobs` worker processes.
+
+    Args:
+        df (pd.DataFrame): Player predictions, as for `optimize_squad`.
+        variants (iterable): One array of predicted points per variant,
+            aligned with the rows of `df`.
+        points_col (str): Column holding the points to maximise.
+        n_jobs (int): Number of parallel workers (-1 uses all cores).
+        **kwargs: Passed through to `optimize_squad`.
+
+    Returns:
+        list of pd.DataFrame: The selected squad for each variant.
+    """
+    def solve(points):
+        variant = df.copy()
+        variant[points_col] = points
+        return optimize_squad(variant, points_col=points_col, **kwargs)
+
+    return Parallel(n_jobs=n_jobs)(delayed(solve)(points) for points in variants)
+
+
+def benchmark_optimizer(df: pd.DataFrame, n_variants: int = 1000, noise: float = 0.05,
+                        points_col: str = "total_points_predictions", n_jobs: int = 1,
+                        seed: int = 42) -> dict:
+    """
+    Time `optimize_squad` over many what-if variants of the predictions.
+
+    Each variant rescales every player's predicted points by an independent
+    random factor of `1 ± noise`, mimicking a what-if scenario. With
+    `n_jobs=1` individual solve times are recorded; otherwise variants are
+    solved through `optimize_variants` and only throughput is reported.
+
+    Args:
+        df (pd.DataFrame): Player predictions, as for `optimize_squad`.
+        n_variants (int): Number of variants to solve.
+        noise (float): Relative standard deviation of the perturbation.
+        points_col (str): Column holding the points to maximise.
+        n_jobs (int): Number of parallel workers.
+        seed (int): Random seed.
+
+    Returns:
+        dict: Solve-time statistics in milliseconds and solves per minute.
+    """
+    rng = np.random.default_rng(seed)
+    base_points = df[points_col].to_numpy(dtype=float)
+    variants = [base_points * rng.normal(1.0, noise, size=len(base_points)) for _ in range(n_variants)]
+
+    if n_jobs != 1:
+        start = time.perf_counter()
+        optimize_variants(df, variants, points_col=points_col, n_jobs=n_jobs)
+        elapsed = time.perf_counter() - start
+        stats = {"variants": n_variants, "total_s": elapsed, "solves_per_minute": 60 * n_variants / elapsed}
+        print(f"Solved {n_variants} variants in {elapsed:.1f} s ({stats['solves_per_minute']:.0f} solves/minute)")
+        return stats
+
+    variant = df.copy()
+    timings = np.empty(n_variants)
+    for i, points in enumerate(variants):
+        variant[points_col] = points
+        start = time.perf_counter()
+        optimize_squad(variant, points_col=points_col)
+        timings[i] = time.perf_counter() - start
+
+    stats = {
+        "variants": n_variants,
+        "mean_ms": 1000 * timings.mean(),
+        "median_ms": 1000 * np.median(timings),
+        "p95_ms": 1000 * np.percentile(timings, 95),
+        "solves_per_minute": 60 / timings.mean(),
+    }
+    print(
+        f"Solved {n_variants} variants: mean {stats['mean_ms']:.1f} ms, "
+        f"median {stats['median_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms "
+        f"({stats['solves_per_minute']:.0f} solves/minute)"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    from src.analysis.get_positional_predictions import load_final_predictions
+
+    # Stored predictions have no prices or clubs, so take them from the API
+    # snapshot recorded after GW4.
+    api_df = pd.read_csv("data/raw/official_fpl_api/2025_09_15_11_17_23_fpl_api.csv")
+    final_df = load_final_predictions(4, "2025-26").merge(api_df[["code", "now_cost", "team"]], on="code")
+    best_squad = optimize_squad(final_df)
+    show_squad(best_squad)
+    benchmark_optimizer(final_df, n_variants=200)
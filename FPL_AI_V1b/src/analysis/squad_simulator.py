@@ -0,0 +1,211 @@
+import time
+import numpy as np
+import pandas as pd
+
+from src.analysis.transfer_planner import TOTAL_GAMEWEEKS
+
+N_SIMULATIONS = 100_000
+# Simulations drawn per pass; bounds the (chunk x players) sample matrix.
+CHUNK_SIZE = 10_000
+# Share of worst outcomes averaged for the conditional value at risk.
+RISK_LEVEL = 0.1
+CAPTAIN_MULTIPLIER = 2
+
+
+def gameweek_tree_predictions(df: pd.DataFrame, per_tree: np.ndarray, gw: int) -> np.ndarray:
+    """
+    Turn per-tree season totals into per-tree points for one upcoming gameweek.
+
+    Each tree's predicted remaining points are spread evenly over the
+    remaining gameweeks, as `transfer_planner.expected_gameweek_points`
+    does for the forest mean.
+
+    Args:
+        df (pd.DataFrame): The scored rows, with "current_total_points".
+        per_tree (np.ndarray): Per-tree season totals for `df`, from
+            `make_predictions.per_tree_predictions`.
+        gw (int): The last gameweek that has been played.
+
+    Returns:
+        np.ndarray: float32 array with the shape of `per_tree`.
+    """
+    remaining_gws = max(TOTAL_GAMEWEEKS - gw, 1)
+    current = df["current_total_points"].to_numpy(dtype=np.float32)[:, None]
+    return (np.clip(per_tree - current, 0, None) / remaining_gws).astype(np.float32)
+
+
+def squad_weights(squads, codes) -> np.ndarray:
+    """
+    Build the (players x squads) matrix of points multipliers.
+
+    A squad's simulated score is the sum of its starting XI's points with
+    the captain's counted twice, so each squad is a column holding 1 for
+    starters, `CAPTAIN_MULTIPLIER` for the captain and 0 for everyone else
+    (bench players only score through auto-substitutions, which are not
+    simulated).
+
+    Args:
+        squads (list): Squads as DataFrames returned by `optimize_squad`
+            (with "code", "in_starting_xi" and "is_captain"), or as dicts
+            with "starters" (a list of codes) and "captain" (a code).
+        codes (array-like): Player code of each row of the samples.
+
+    Returns:
+        np.ndarray: float32 array of shape (len(codes), len(squads)).
+
+    Raises:
+        KeyError: If a squad contains a player without samples.
+    """
+    index = {code: i for i, code in enumerate(codes)}
+    weights = np.zeros((len(index), len(squads)), dtype=np.float32)
+    for j, squad in enumerate(squads):
+        if isinstance(squad, pd.DataFrame):
+            starters = squad.loc[squad["in_starting_xi"], "code"]
+            captain = squad.loc[squad["is_captain"], "code"].iloc[0]
+        else:
+            starters, captain = squad["starters"], squad["captain"]
+        for code in starters:
+            weights[index[code], j] = 1
+        weights[index[captain], j] = CAPTAIN_MULTIPLIER
+    return weights
+
+
+def captain_variants(squad: pd.DataFrame) -> list:
+    """Return one copy of a squad per starter, each with that starter as captain."""
+    starters = squad.loc[squad["in_starting_xi"], "code"].tolist()
+    return [{"starters": starters, "captain": captain} for captain in starters]
+
+
+def sample_outcomes(rng: np.random.Generator, n: int, per_tree: np.ndarray = None,
+                    mean: np.ndarray = None, std: np.ndarray = None) -> np.ndarray:
+    """
+    Draw `n` simulated outcomes for every player.
+
+    With `per_tree`, each player's outcome in each simulation is the
+    prediction of a tree picked at random, so the samples follow the
+    forest's own spread. Otherwise outcomes are drawn from a normal
+    distribution per player, floored at 0.
+
+    Args:
+        rng (np.random.Generator): Random number generator.
+        n (int): Number of simulations.
+        per_tree (np.ndarray, optional): (players x trees) predictions.
+        mean (np.ndarray, optional): Mean per player, used without `per_tree`.
+        std (np.ndarray, optional): Standard deviation per player.
+
+    Returns:
+        np.ndarray: float32 array of shape (n, players).
+    """
+    if per_tree is not None:
+        n_players, n_trees = per_tree.shape
+        picks = rng.integers(0, n_trees, size=(n, n_players), dtype=np.int32)
+        picks += np.arange(n_players, dtype=np.int32) * n_trees
+        return per_tree.ravel()[picks]
+    samples = rng.standard_normal((n, len(mean)), dtype=np.float32)
+    samples *= np.asarray(std, dtype=np.float32)
+    samples += np.asarray(mean, dtype=np.float32)
+    return np.maximum(samples, 0, out=samples)
+
+
+def simulate_squads(squads, codes, per_tree: np.ndarray = None, mean: np.ndarray = None,
+                    std: np.ndarray = None, rival=None, n_simulations: int = N_SIMULATIONS,
+                    chunk_size: int = CHUNK_SIZE, risk_level: float = RISK_LEVEL,
+                    seed: int = 42) -> pd.DataFrame:
+    """
+    Simulate many candidate squads and captain choices against the same outcomes.
+
+    Only players picked by some squad (or the rival) are sampled. For each
+    chunk of simulations, one (simulations x players) sample matrix is
+    drawn and multiplied by the (players x squads) weights of
+    `squad_weights`, which scores every squad in every simulation in a
+    single matrix product. All squads see the same draws, so differences
+    between them are not blurred by sampling noise.
+
+    Args:
+        squads (list): Candidate squads (see `squad_weights`).
+        codes (array-like): Player code of each row of `per_tree` or
+            `mean`/`std`.
+        per_tree (np.ndarray, optional): (players x trees) predictions,
+            e.g. from `gameweek_tree_predictions`.
+        mean (np.ndarray, optional): Mean per player, when sampling from a
+            normal distribution instead of the trees.
+        std (np.ndarray, optional): Standard deviation per player.
+        rival (optional): A squad to compare against, in the same format.
+        n_simulations (int): Number of simulations.
+        chunk_size (int): Simulations drawn per pass.
+        risk_level (float): Quantile used for the downside measures.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: One row per squad with "expected_points", "std",
+        the `risk_level` quantile ("p10" by default), "cvar" (the mean of
+        the worst `risk_level` share of outcomes) and, with a rival,
+        "p_beat_rival".
+
+    Raises:
+        ValueError: If neither `per_tree` nor both `mean` and `std` are given.
+    """
+    if per_tree is None and (mean is None or std is None):
+        raise ValueError("Pass per_tree, or both mean and std")
+    start = time.time()
+    codes = np.asarray(codes)
+    weights = squad_weights(list(squads) + ([rival] if rival is not None else []), codes)
+    used = np.flatnonzero(weights.any(axis=1))
+    weights = weights[used]
+    if per_tree is not None:
+        per_tree = np.ascontiguousarray(per_tree[used], dtype=np.float32)
+    else:
+        mean, std = np.asarray(mean)[used], np.asarray(std)[used]
+
+    rng = np.random.default_rng(seed)
+    totals = np.empty((n_simulations, weights.shape[1]), dtype=np.float32)
+    for begin in range(0, n_simulations, chunk_size):
+        n = min(chunk_size, n_simulations - begin)
+        samples = sample_outcomes(rng, n, per_tree, mean, std)
+        np.matmul(samples, weights, out=totals[begin:begin + n])
+
+    rival_totals = None
+    if rival is not None:
+        rival_totals, totals = totals[:, -1], totals[:, :-1]
+
+    tail = max(1, int(n_simulations * risk_level))
+    worst = np.partition(totals, tail - 1, axis=0)[:tail]
+    report = pd.DataFrame({
+        "expected_points": totals.mean(axis=0, dtype=np.float64),
+        "std": totals.std(axis=0, dtype=np.float64),
+        f"p{round(risk_level * 100)}": np.quantile(totals, risk_level, axis=0).astype(np.float64),
+        "cvar": worst.mean(axis=0, dtype=np.float64),
+    })
+    if rival_totals is not None:
+        report["p_beat_rival"] = (totals > rival_totals[:, None]).mean(axis=0)
+    print(f"Simulated {len(report)} squads x {n_simulations} outcomes in {time.time() - start:.2f} seconds")
+    return report.round(3)
+
+
+if __name__ == "__main__":
+    from src.analysis.squad_optimizer import optimize_squad, optimize_variants
+    from src.model.make_predictions import load_current_data, load_model, per_tree_predictions, prepare_features
+
+    gw, year = 4, "2025-26"
+    model = load_model("models/random_forest_model.pkl")
+    current_df = load_current_data(f"data/pre-predictions/processed_data/{gw}_{year}_model_ready.csv")
+    # The recorded model-ready file has no prices or clubs, so take them
+    # from the API snapshot recorded after GW4.
+    api_df = pd.read_csv("data/raw/official_fpl_api/2025_09_15_11_17_23_fpl_api.csv")
+    current_df = current_df.merge(api_df[["code", "now_cost", "team"]], on="code")
+    X, meta_df = prepare_features(current_df)
+    players = pd.concat([meta_df.reset_index(drop=True), X.reset_index(drop=True)], axis=1)
+    # Each tree's season total turned into its points for GW{gw + 1}.
+    per_tree = gameweek_tree_predictions(players, per_tree_predictions(model, X), gw)
+    players["gameweek_points"] = per_tree.mean(axis=1)
+
+    # Candidates: the optimal squad under each of a hundred noisy
+    # prediction draws, plus every captain choice of the best squad.
+    rng = np.random.default_rng(0)
+    points = players["gameweek_points"].to_numpy()
+    variants = [points * rng.normal(1, 0.05, len(points)) for _ in range(100)]
+    best = optimize_squad(players, points_col="gameweek_points")
+    candidates = optimize_variants(players, variants, points_col="gameweek_points") + captain_variants(best)
+
+    report = simulate_squads(candidates, players["code"], per_tree, rival=best)
+    print(report.sort_values("expected_points", ascending=False).head(10))
@@ -0,0 +1,271 @@
+import time
+import numpy as np
+import pandas as pd
+
+from src.analysis.squad_optimizer import MAX_PER_CLUB, STARTING_XI_LIMITS
+
+TOTAL_GAMEWEEKS = 38
+HIT_COST = 4
+MAX_FREE_TRANSFERS = 5
+
+
+def expected_gameweek_points(df: pd.DataFrame, gw: int, horizon: int) -> np.ndarray:
+    """
+    Spread each player's predicted remaining points evenly over the season.
+
+    The model predicts end-of-season total points, so the points still to
+    come after gameweek `gw` are `total_points_predictions -
+    current_total_points`, shared equally among the remaining gameweeks.
+
+    Args:
+        df (pd.DataFrame): Predictions from `run_prediction_pipeline`.
+        gw (int): The last gameweek that has been played.
+        horizon (int): Number of upcoming gameweeks to plan for.
+
+    Returns:
+        np.ndarray: Array of shape (len(df), horizon) with expected points
+        per player per upcoming gameweek.
+    """
+    remaining_gws = max(TOTAL_GAMEWEEKS - gw, 1)
+    remaining_points = (df["total_points_predictions"] - df["current_total_points"]).clip(lower=0)
+    per_gw = remaining_points.to_numpy(dtype=float) / remaining_gws
+    return np.repeat(per_gw[:, None], horizon, axis=1)
+
+
+class TransferPlanner:
+    """
+    Beam search over transfer sequences for the next few gameweeks.
+
+    Each search state is a squad together with its bank and free
+    transfers. From every state the planner tries rolling the transfer,
+    the best single transfers and pairs of them, scores each resulting
+    squad over the rest of the horizon, and keeps the `beam_width` best
+    states for the next gameweek. Squad scores are memoized, and states
+    reached twice in the same gameweek are merged, so most of the work is
+    shared between branches of the search and between repeated calls.
+
+    Stats on states explored and the score cache are kept in `self.stats`.
+    """
+
+    def __init__(self, players: pd.DataFrame, points: np.ndarray, beam_width: int = 20,
+                 replacements_per_player: int = 3, top_singles: int = 12,
+                 max_transfers_per_gw: int = 2, hit_cost: int = HIT_COST,
+                 max_free_transfers: int = MAX_FREE_TRANSFERS):
+        """
+        Args:
+            players (pd.DataFrame): Player pool. Must include columns
+                "code", "element_type", "now_cost" and "team".
+            points (np.ndarray): Expected points of shape
+                (len(players), horizon), one column per upcoming gameweek.
+            beam_width (int): Number of states kept after each gameweek.
+            replacements_per_player (int): Best affordable replacements
+                tried for each player in the squad.
+            top_singles (int): Number of best single transfers kept per
+                state, and combined into double transfers.
+            max_transfers_per_gw (int): Maximum transfers in one gameweek.
+            hit_cost (int): Points deducted per transfer beyond the free ones.
+            max_free_transfers (int): Cap on rolled free transfers.
+        """
+        self.players = players.reset_index(drop=True)
+        self.points = np.asarray(points, dtype=float)
+        self.horizon = self.points.shape[1]
+        self.beam_width = beam_width
+        self.replacements_per_player = replacements_per_player
+        self.top_singles = top_singles
+        self.max_transfers_per_gw = max_transfers_per_gw
+        self.hit_cost = hit_cost
+        self.max_free_transfers = max_free_transfers
+
+        self.codes = self.players["code"].to_numpy()
+        self.positions = self.players["element_type"].to_numpy()
+        self.costs = self.players["now_cost"].to_numpy()
+        self.clubs = pd.factorize(self.players["team"])[0]
+        self.row_of = {code: row for row, code in enumerate(self.codes.tolist())}
+
+        # remaining[:, t] is each player's expected points from gameweek t
+        # to the end of the horizon; column `horizon` is all zeros.
+        self.remaining = np.zeros((len(self.players), self.horizon + 1))
+        self.remaining[:, :-1] = np.cumsum(self.points[:, ::-1], axis=1)[:, ::-1]
+
+        # Per-position candidate lists, best over the horizon first.
+        self.candidates = {
+            position: np.flatnonzero(self.positions == position)[
+                np.argsort(-self.remaining[self.positions == position, 0], kind="stable")
+            ].tolist()
+            for position in STARTING_XI_LIMITS
+        }
+
+        self._squad_cache = {}
+        self.stats = {"states_explored": 0, "cache_hits": 0, "cache_misses": 0}
+
+    def lineup_points(self, squad: tuple) -> np.ndarray:
+        """
+        Return the best starting XI points, captain doubled, for every gameweek.
+
+        Args:
+            squad (tuple): Sorted row indices of the 15 squad players.
+
+        Returns:
+            np.ndarray: Points per gameweek of the horizon.
+        """
+        cached = self._squad_cache.get(squad)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        self.stats["cache_misses"] += 1
+
+        rows = np.asarray(squad)
+        squad_points = self.points[rows]
+        squad_positions = self.positions[rows]
+
+        # Fill the minimum of each position, then the best of the remaining
+        # outfield players up to 11. The best player always starts and captains.
+        required, optional = [], []
+        for position, (minimum, maximum) in STARTING_XI_LIMITS.items():
+            ranked = -np.sort(-squad_points[squad_positions == position], axis=0)
+            required.append(ranked[:minimum])
+            optional.append(ranked[minimum:maximum])
+        required = np.vstack(required)
+        optional = -np.sort(-np.vstack(optional), axis=0)
+        free_slots = 11 - required.shape[0]
+        totals = required.sum(axis=0) + optional[:free_slots].sum(axis=0) + squad_points.max(axis=0)
+
+        self._squad_cache[squad] = totals
+        return totals
+
+    def _club_counts(self, squad: tuple) -> np.ndarray:
+        return np.bincount(self.clubs[list(squad)], minlength=self.clubs.max() + 1)
+
+    def _single_transfers(self, squad: tuple, bank: int, gw: int) -> list:
+        """Return (gain, out_row, in_row) for the best affordable single transfers."""
+        in_squad = set(squad)
+        club_counts = self._club_counts(squad)
+        singles = []
+        for out_row in squad:
+            funds = bank + self.costs[out_row]
+            found = 0
+            for in_row in self.candidates[self.positions[out_row]]:
+                gain = self.remaining[in_row, gw] - self.remaining[out_row, gw]
+                if gain <= 0:
+                    break
+                if in_row in in_squad or self.costs[in_row] > funds:
+                    continue
+                club = self.clubs[in_row]
+                if club != self.clubs[out_row] and club_counts[club] >= MAX_PER_CLUB:
+                    continue
+                singles.append((gain, out_row, in_row))
+                found += 1
+                if found == self.replacements_per_player:
+                    break
+        singles.sort(key=lambda move: -move[0])
+        return singles[:self.top_singles]
+
+    def _is_valid(self, squad: tuple, bank: int) -> bool:
+        return bank >= 0 and self._club_counts(squad).max() <= MAX_PER_CLUB
+
+    def _moves(self, squad: tuple, bank: int, gw: int) -> list:
+        """Return (transfers, new_squad, new_bank) for every move considered from a state."""
+        moves = [((), squad, bank)]
+        singles = self._single_transfers(squad, bank, gw)
+
+        for _, out_row, in_row in singles:
+            new_squad = tuple(sorted(set(squad) - {out_row} | {in_row}))
+            moves.append((((out_row, in_row),), new_squad, bank + self.costs[out_row] - self.costs[in_row]))
+
+        if self.max_transfers_per_gw >= 2:
+            for i, (_, out_a, in_a) in enumerate(singles):
+                for _, out_b, in_b in singles[i + 1:]:
+                    if out_a == out_b or in_a == in_b:
+                        continue
+                    new_squad = tuple(sorted(set(squad) - {out_a, out_b} | {in_a, in_b}))
+                    new_bank = bank + self.costs[out_a] + self.costs[out_b] - self.costs[in_a] - self.costs[in_b]
+                    if self._is_valid(new_squad, new_bank):
+                        moves.append((((out_a, in_a), (out_b, in_b)), new_squad, new_bank))
+        return moves
+
+    def plan(self, squad_codes, bank: int, free_transfers: int) -> dict:
+        """
+        Find the best transfer sequence over the planning horizon.
+
+        Args:
+            squad_codes (iterable): Codes of the 15 players in the current squad.
+            bank (int): Money in the bank, in `now_cost` units.
+            free_transfers (int): Free transfers available for the first gameweek.
+
+        Returns:
+            dict: With keys
+                - "plan": DataFrame with one row per gameweek offset giving
+                  the transfers out/in (player codes), hits taken, free
+                  transfers available and expected points.
+                - "total_points": Expected points over the horizon after hits.
+                - "stats": Search instrumentation (states explored, cache
+                  hits/misses, cache hit rate and elapsed seconds).
+        """
+        start = time.perf_counter()
+        squad = tuple(sorted(self.row_of[code] for code in squad_codes))
+
+        # Each beam entry: (score so far, squad, bank, free transfers, history)
+        beam = [(0.0, squad, bank, free_transfers, ())]
+
+        for gw in range(self.horizon):
+            best_by_state = {}
+            for score, squad, bank, free, history in beam:
+                for transfers, new_squad, new_bank in self._moves(squad, bank, gw):
+                    self.stats["states_explored"] += 1
+                    hits = max(len(transfers) - free, 0)
+                    gw_points = self.lineup_points(new_squad)[gw] - self.hit_cost * hits
+                    new_free = min(max(free - len(transfers), 0) + 1, self.max_free_transfers)
+                    key = (new_squad, new_bank, new_free)
+                    entry = (score + gw_points, new_squad, new_bank, new_free,
+                             history + ((transfers, hits, free, gw_points),))
+                    if key not in best_by_state or entry[0] > best_by_state[key][0]:
+                        best_by_state[key] = entry
+
+            # Rank states by points banked so far plus the squad's expected
+            # points over the rest of the horizon if no further moves are made.
+            beam = sorted(
+                best_by_state.values(),
+                key=lambda entry: -(entry[0] + self.lineup_points(entry[1])[gw + 1:].sum()),
+            )[:self.beam_width]
+
+        total, _, _, _, history = beam[0]
+        rows = []
+        for offset, (transfers, hits, free, gw_points) in enumerate(history):
+            rows.append({
+                "gw_offset": offset + 1,
+                "transfers_out": [int(self.codes[out_row]) for out_row, _ in transfers],
+                "transfers_in": [int(self.codes[in_row]) for _, in_row in transfers],
+                "free_transfers": free,
+                "hits": hits,
+                "expected_points": round(float(gw_points), 2),
+            })
+
+        lookups = self.stats["cache_hits"] + self.stats["cache_misses"]
+        stats = dict(self.stats)
+        stats["cache_hit_rate"] = self.stats["cache_hits"] / lookups if lookups else 0.0
+        stats["elapsed_s"] = time.perf_counter() - start
+
+        return {"plan": pd.DataFrame(rows), "total_points": round(float(total), 2), "stats": stats}
+
+
+def plan_transfers(df: pd.DataFrame, squad_codes, bank: int, free_transfers: int,
+                   gw: int, horizon: int = 5, **kwargs) -> dict:
+    """
+    Plan transfers for the next `horizon` gameweeks from a predictions frame.
+
+    Args:
+        df (pd.DataFrame): Predictions from `run_prediction_pipeline`,
+            including "now_cost" and "team".
+        squad_codes (iterable): Codes of the 15 players in the current squad.
+        bank (int): Money in the bank, in `now_cost` units.
+        free_transfers (int): Free transfers available for the next gameweek.
+        gw (int): The last gameweek that has been played.
+        horizon (int): Number of gameweeks to plan.
+        **kwargs: Passed through to `TransferPlanner`.
+
+    Returns:
+        dict: The result of `TransferPlanner.plan`.
+    """
+    players = df.dropna(subset=["now_cost", "team"]).reset_index(drop=True)
+    points = expected_gameweek_points(players, gw, horizon)
+    return TransferPlanner(players, points, **kwargs).plan(squad_codes, bank, free_transfers)
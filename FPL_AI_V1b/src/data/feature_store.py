@@ -0,0 +1,513 @@
+import os
+import pandas as pd
+
+from src.data.fixture_calendar import FIXTURE_COLUMNS, FixtureCalendar, add_fixture_features
+from src.data.player_panel import LAG_COLUMNS, add_lag_features, panel_lag_features
+from src.data.repository import read_season_data
+from src.data.rolling_form import FORM_COLUMNS, add_rolling_form
+from src.utils.feature_engineering import NAME_KEYS, add_name_keys, per_90
+
+STORE_DIR = "data/feature_store"
+RAW_DIR = "data/raw"
+SEASON_DATA_DIR = "data/prev_years"
+
+# Element type encoding used by the FPL API. The model uses API - 1 (GK = 0).
+POSITION_TO_API_ELEMENT_TYPE = {"GK": 1, "DEF": 2, "MID": 3, "FWD": 4}
+
+CUMULATIVE_STATS = [
+    "total_points", "goals_scored", "assists", "minutes", "goals_conceded",
+    "creativity", "influence", "threat", "bonus", "ict_index", "clean_sheets",
+    "yellow_cards", "red_cards",
+]
+SEASON_STATS = CUMULATIVE_STATS[:11]
+# Only in the gameweek files from 2022-23 and in the live API. Their season
+# totals are kept as `current_` columns when present, but are not model inputs.
+EXPECTED_STATS = ["expected_goals", "expected_assists"]
+
+META_COLUMNS = ["code", "first_name", "second_name", "element_type", "year", "gw", "now_cost", "team"]
+PREV_COLUMNS = [f"prev_{stat}" for stat in SEASON_STATS + ["cards_per_90", "points_per_90"]]
+CURRENT_COLUMNS = [f"current_{stat}" for stat in SEASON_STATS + ["cards_per_90", "points_per_90"]]
+
+# Model inputs, in the order `read_training` returns them (with the
+# "total_points" target after "element_type"). The legacy `data/model_ready`
+# CSVs do not all follow it: 2023-24 has its `prev_` columns last.
+FEATURE_COLUMNS = ["element_type", "gw"] + PREV_COLUMNS + ["prev_season_played", "matches"] + CURRENT_COLUMNS
+TARGET_COLUMN = "final_total_points"
+
+
+def feature_flags(columns) -> dict:
+    """
+    Return which optional feature groups a model's columns use.
+
+    Args:
+        columns (list of str): Model feature columns, e.g. `FeatureSpec.columns`.
+
+    Returns:
+        dict: "fixtures", "form" and "lags" flags, as taken by `read_latest`.
+    """
+    columns = set(columns)
+    return {
+        "fixtures": not columns.isdisjoint(FIXTURE_COLUMNS),
+        "form": not columns.isdisjoint(FORM_COLUMNS),
+        "lags": not columns.isdisjoint(LAG_COLUMNS),
+    }
+
+
+def index_prev_season(prev_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepare previous season stats for joining on normalized names.
+
+    Players whose normalized name is not unique are dropped. Passing the
+    result to `compute_features` instead of the raw season data skips
+    this step when features are computed repeatedly.
+
+    Args:
+        prev_df (pd.DataFrame): Previous season data from
+            `data/prev_years/{prev_year}_season_data.csv`.
+
+    Returns:
+        pd.DataFrame: Name keys and the previous season feature stats.
+    """
+    prev_df = add_name_keys(prev_df)
+    prev_df = prev_df[~prev_df.duplicated(subset=NAME_KEYS, keep=False)]
+    return prev_df[NAME_KEYS + SEASON_STATS + ["cards_per_90", "points_per_90"]]
+
+
+def current_features(totals) -> pd.DataFrame:
+    """
+    Compute the `current_` features from season-to-date totals.
+
+    Args:
+        totals (pd.DataFrame or dict of pd.Series): `CUMULATIVE_STATS`
+            totals per player.
+
+    Returns:
+        pd.DataFrame: `CURRENT_COLUMNS`, aligned with `totals`.
+    """
+    current = pd.DataFrame({f"current_{stat}": totals[stat] for stat in SEASON_STATS})
+    cards = totals["yellow_cards"] + totals["red_cards"]
+    current["current_cards_per_90"] = per_90(cards, totals["minutes"])
+    current["current_points_per_90"] = per_90(totals["total_points"], totals["minutes"])
+    return current
+
+
+def compute_features(snapshots: pd.DataFrame, prev_df: pd.DataFrame, year: str) -> pd.DataFrame:
+    """
+    Turn cumulative player snapshots into model feature rows.
+
+    This is the single feature computation shared by training, backtesting
+    and live inference. A snapshot is what the FPL API's player table looks
+    like after a gameweek: one row per player with season-to-date totals.
+    Previous season stats are joined on accent-insensitive names; players
+    whose previous season name is ambiguous are treated as new. Missing
+    previous season values are left as NaN so the caller can impute them
+    with values fitted on the training data (see `impute_prev_features`).
+
+    Args:
+        snapshots (pd.DataFrame): Cumulative stats per player per gameweek
+            with columns "code", "first_name", "second_name",
+            "element_type" (API encoding, 1-4), "gw", "matches", the
+            `CUMULATIVE_STATS`, and optionally "now_cost", "team" and
+            `TARGET_COLUMN`.
+        prev_df (pd.DataFrame): Previous season data from
+            `data/prev_years/{prev_year}_season_data.csv`, or the output
+            of `index_prev_season` for it.
+        year (str): The season of the snapshots (e.g. "2025-26").
+
+    Returns:
+        pd.DataFrame: `META_COLUMNS`, the model `FEATURE_COLUMNS` and, if
+        present in `snapshots`, `current_` totals of `EXPECTED_STATS` and
+        `TARGET_COLUMN`.
+    """
+    snapshots = add_name_keys(snapshots.reset_index(drop=True))
+    if "first_name_norm" not in prev_df:
+        prev_df = index_prev_season(prev_df)
+    merged = snapshots.merge(prev_df.add_prefix("prev_"), how="left",
+                             left_on=NAME_KEYS, right_on=[f"prev_{key}" for key in NAME_KEYS])
+
+    output = pd.DataFrame({
+        "code": merged["code"],
+        "first_name": merged["first_name"],
+        "second_name": merged["second_name"],
+        "element_type": merged["element_type"] - 1,
+        "year": year,
+        "gw": merged["gw"],
+        "now_cost": merged.get("now_cost"),
+        "team": merged.get("team"),
+    })
+    for col in PREV_COLUMNS:
+        output[col] = merged[col]
+    output["prev_season_played"] = merged["prev_minutes"].notna()
+    output["matches"] = merged["matches"]
+    for col, values in current_features(merged).items():
+        output[col] = values
+    for stat in EXPECTED_STATS:
+        if stat in merged:
+            output[f"current_{stat}"] = pd.to_numeric(merged[stat])
+
+    if TARGET_COLUMN in merged:
+        output[TARGET_COLUMN] = merged[TARGET_COLUMN]
+    return output.round(2)
+
+
+def impute_prev_features(df: pd.DataFrame, fill_values: pd.Series) -> pd.DataFrame:
+    """
+    Fill missing previous season features (players new to the league).
+
+    Args:
+        df (pd.DataFrame): Feature rows from `compute_features`.
+        fill_values (pd.Series): Value per `prev_` column, normally the
+            training means from `FeatureStore.imputation_values`.
+
+    Returns:
+        pd.DataFrame: A copy of `df` with the `prev_` columns filled.
+    """
+    df = df.copy()
+    df[PREV_COLUMNS] = df[PREV_COLUMNS].fillna(fill_values[PREV_COLUMNS]).round(2)
+    return df
+
+
+def load_season_gameweeks(season: str, base_dir: str = RAW_DIR) -> pd.DataFrame:
+    """
+    Load every gameweek CSV of a season into one long table.
+
+    Args:
+        season (str): The season (e.g. '2023-24').
+        base_dir (str): Base directory of the downloaded gameweek CSVs.
+
+    Returns:
+        pd.DataFrame: One row per player per match, with a `gw` column
+        taken from the file name. Rows for non-player positions are dropped.
+    """
+    frames = []
+    for gw in range(1, 39):
+        path = os.path.join(base_dir, season, f"gw{gw}.csv")
+        if not os.path.exists(path):
+            continue
+        df = pd.read_csv(path)
+        df["gw"] = gw
+        frames.append(df)
+    long_df = pd.concat(frames, ignore_index=True)
+    long_df = long_df[long_df["position"].isin(POSITION_TO_API_ELEMENT_TYPE)].copy()
+    # Some seasons mix column dtypes across gameweek files.
+    stats = CUMULATIVE_STATS + [stat for stat in EXPECTED_STATS if stat in long_df]
+    long_df[stats] = long_df[stats].apply(pd.to_numeric)
+    return long_df
+
+
+def build_cumulative_snapshots(season: str, base_dir: str = RAW_DIR,
+                               season_data_dir: str = SEASON_DATA_DIR) -> pd.DataFrame:
+    """
+    Rebuild what the FPL API's player table looked like after each gameweek.
+
+    Per-match stats are summed within each gameweek (double gameweeks) and
+    accumulated over the season with a single grouped `cumsum`. Blank
+    gameweeks carry the previous totals forward with `matches = 0`. Names
+    are split into first and second name using the season's
+    `_season_data.csv`. The element id is used as the player `code`, and
+    each player's final season total is attached as `TARGET_COLUMN`.
+
+    Args:
+        season (str): The season (e.g. '2023-24').
+        base_dir (str): Base directory of the downloaded gameweek CSVs.
+        season_data_dir (str): Directory of the `_season_data.csv` files.
+
+    Returns:
+        pd.DataFrame: One snapshot row per player per gameweek (from their
+        first appearance) in the format `compute_features` expects.
+    """
+    long_df = load_season_gameweeks(season, base_dir)
+    stats = CUMULATIVE_STATS + [stat for stat in EXPECTED_STATS if stat in long_df]
+    grouped = long_df.groupby(["element", "gw"])
+    per_gw = grouped[stats].sum()
+    per_gw["matches"] = grouped.size()
+    meta = grouped[["name", "position", "team", "value"]].last()
+
+    first_gw = per_gw.reset_index().groupby("element")["gw"].min()
+    grid = pd.MultiIndex.from_product([first_gw.index, range(1, 39)], names=["element", "gw"])
+    per_gw = per_gw.reindex(grid, fill_value=0)
+    meta = meta.reindex(grid).groupby(level="element").ffill()
+
+    totals = per_gw[stats].groupby(level="element").cumsum()
+    snapshots = pd.concat([meta, totals, per_gw["matches"]], axis=1).reset_index()
+    snapshots = snapshots[snapshots["gw"] >= snapshots["element"].map(first_gw)]
+
+    season_df = read_season_data(season, season_data_dir)
+    season_df["name"] = season_df["first_name"] + " " + season_df["second_name"]
+    names = season_df.drop_duplicates(subset="name").set_index("name")[["first_name", "second_name"]]
+    snapshots = snapshots.join(names, on="name")
+    split = snapshots["name"].str.split(" ", n=1, expand=True)
+    snapshots["first_name"] = snapshots["first_name"].fillna(split[0])
+    snapshots["second_name"] = snapshots["second_name"].fillna(split[1])
+
+    snapshots["code"] = snapshots["element"]
+    snapshots["element_type"] = snapshots["position"].map(POSITION_TO_API_ELEMENT_TYPE)
+    snapshots["now_cost"] = snapshots["value"]
+    final_points = snapshots[snapshots["gw"] == 38].set_index("code")["total_points"]
+    snapshots[TARGET_COLUMN] = snapshots["code"].map(final_points)
+    return snapshots.reset_index(drop=True)
+
+
+class FeatureStore:
+    """
+    Materialized model features keyed by (season, player code, gameweek).
+
+    Each season is one partition: a DataFrame indexed by a sorted
+    (code, gw) MultiIndex and pickled to `{root}/{season}.pkl`. Features
+    are computed once by `compute_features` when a season or live
+    snapshot is added, and afterwards only read:
+
+        - Training reads slices of historical seasons (`read_training`).
+        - Inference reads the latest row per player (`read_latest`).
+
+    Missing previous season values are stored as NaN and imputed at read
+    time with means over the historical training rows, so live rows are
+    never filled from their own batch.
+    """
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self._partitions = {}
+
+    def _path(self, season: str) -> str:
+        return os.path.join(self.root, f"{season}.pkl")
+
+    def seasons(self) -> list:
+        """Return the seasons stored, in chronological order."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(file[:-4] for file in os.listdir(self.root) if file.endswith(".pkl"))
+
+    def has(self, season: str, gw: int = None) -> bool:
+        """Return whether a season (or one gameweek of it) is stored."""
+        if not os.path.exists(self._path(season)):
+            return False
+        return gw is None or gw in self.read(season).index.get_level_values("gw_idx")
+
+    def read(self, season: str) -> pd.DataFrame:
+        """
+        Read one season's partition.
+
+        Returns:
+            pd.DataFrame: Stored features indexed by (code, gw).
+        """
+        if season not in self._partitions:
+            self._partitions[season] = pd.read_pickle(self._path(season))
+        return self._partitions[season]
+
+    def _write(self, season: str, features: pd.DataFrame) -> None:
+        features = features.set_index(["code", "gw"], drop=False).rename_axis(["code_idx", "gw_idx"])
+        features = features.sort_index()
+        os.makedirs(self.root, exist_ok=True)
+        features.to_pickle(self._path(season))
+        self._partitions[season] = features
+
+    def materialize_season(self, season: str, prev_season: str, overwrite: bool = False) -> pd.DataFrame:
+        """
+        Compute and store features for every gameweek of a finished season.
+
+        Args:
+            season (str): The season (e.g. '2023-24').
+            prev_season (str): The season before it (e.g. '2022-23').
+            overwrite (bool): Recompute even if the season is already stored.
+
+        Returns:
+            pd.DataFrame: The stored partition.
+        """
+        if self.has(season) and not overwrite:
+            return self.read(season)
+        snapshots = build_cumulative_snapshots(season)
+        prev_df = read_season_data(prev_season, SEASON_DATA_DIR)
+        self._write(season, compute_features(snapshots, prev_df, season))
+        print(f"Stored features for {season}")
+        return self.read(season)
+
+    def append_snapshot(self, snapshot: pd.DataFrame, season: str, prev_season: str, gw: int,
+                        overwrite: bool = False) -> pd.DataFrame:
+        """
+        Compute and store features for one live gameweek.
+
+        Args:
+            snapshot (pd.DataFrame): Cumulative player stats after `gw`
+                (e.g. the FPL API `elements` table) with a "matches" column.
+            season (str): The current season (e.g. "2025-26").
+            prev_season (str): The previous season (e.g. "2024-25").
+            gw (int): The last gameweek that has been played.
+            overwrite (bool): Replace the gameweek if it is already stored.
+
+        Returns:
+            pd.DataFrame: The features computed for this gameweek.
+        """
+        if self.has(season, gw) and not overwrite:
+            stored = self.read(season)
+            return stored[stored["gw"] == gw]
+
+        snapshot = snapshot.assign(gw=gw)
+        prev_df = read_season_data(prev_season, SEASON_DATA_DIR)
+        return self.append_features(compute_features(snapshot, prev_df, season), season, gw, overwrite)
+
+    def append_features(self, features: pd.DataFrame, season: str, gw: int,
+                        overwrite: bool = False) -> pd.DataFrame:
+        """
+        Store feature rows already computed by `compute_features` for one gameweek.
+
+        Args:
+            features (pd.DataFrame): The gameweek's feature rows.
+            season (str): The current season (e.g. "2025-26").
+            gw (int): The gameweek of the rows.
+            overwrite (bool): Replace the gameweek if it is already stored.
+
+        Returns:
+            pd.DataFrame: The stored rows for this gameweek.
+        """
+        if self.has(season, gw) and not overwrite:
+            stored = self.read(season)
+            return stored[stored["gw"] == gw]
+
+        if self.has(season):
+            stored = self.read(season)
+            features = pd.concat([stored[stored["gw"] != gw], features], ignore_index=True)
+        self._write(season, features)
+        stored = self.read(season)
+        return stored[stored["gw"] == gw]
+
+    def historical_seasons(self) -> list:
+        """Return stored seasons that have final totals, i.e. training seasons.
+
+        Live partitions written by `append_features` have no
+        `TARGET_COLUMN` at all, so they are skipped.
+        """
+        historical = []
+        for season in self.seasons():
+            df = self.read(season)
+            if TARGET_COLUMN in df and df[TARGET_COLUMN].notna().any():
+                historical.append(season)
+        return historical
+
+    def imputation_values(self, seasons=None) -> pd.Series:
+        """
+        Return the mean of each `prev_` feature over training rows.
+
+        Args:
+            seasons (list of str, optional): Training seasons. Defaults to
+                every historical season in the store.
+        """
+        seasons = self.historical_seasons() if seasons is None else seasons
+        rows = pd.concat([self.read(season)[PREV_COLUMNS] for season in seasons])
+        return rows.mean()
+
+    def read_training(self, seasons=None, fill_values: pd.Series = None, fixtures: bool = False,
+                      form: bool = False, lags: bool = False) -> pd.DataFrame:
+        """
+        Read training rows in the `data/model_ready` format.
+
+        Gameweeks a player had no match in are skipped, as in
+        `prepare_training_data`.
+
+        Args:
+            seasons (list of str, optional): Seasons to read. Defaults to
+                every historical season in the store.
+            fill_values (pd.Series, optional): Imputation values for the
+                `prev_` columns. Defaults to the means over `seasons`.
+            fixtures (bool): Append the next-fixture features
+                (`fixture_calendar.FIXTURE_COLUMNS`) from each season's
+                fixture calendar.
+            form (bool): Append last-N-gameweek form features
+                (`rolling_form.FORM_COLUMNS`). Expected goals and assists
+                form is NaN for seasons without expected stats.
+            lags (bool): Append multi-season lag features
+                (`player_panel.LAG_COLUMNS`) from the `data/prev_years`
+                files. Seasons a player is missing from are left NaN.
+
+        Returns:
+            pd.DataFrame: `FEATURE_COLUMNS` plus the "total_points" target,
+            followed by the fixture, form and lag features if requested.
+        """
+        seasons = self.historical_seasons() if seasons is None else seasons
+        fill_values = self.imputation_values(seasons) if fill_values is None else fill_values
+        lag_features = panel_lag_features() if lags else None
+        frames = []
+        for season in seasons:
+            season_df = self.read(season)
+            if form:
+                season_df = add_rolling_form(season_df)
+            if fixtures:
+                season_df = add_fixture_features(season_df, FixtureCalendar.from_gameweek_files(season))
+            if lags:
+                season_df = add_lag_features(season_df, lag_features)
+            frames.append(season_df)
+        df = pd.concat(frames, ignore_index=True)
+        df = impute_prev_features(df[df["matches"] > 0], fill_values)
+        df = df.rename(columns={TARGET_COLUMN: "total_points"})
+        cols = ["element_type", "total_points"] + FEATURE_COLUMNS[1:]
+        cols += [c for c in df.columns if c.startswith(("next_", "form_"))]
+        cols += [c for c in LAG_COLUMNS if c in df.columns]
+        return df[cols].reset_index(drop=True)
+
+    def read_latest(self, season: str, fill_values: pd.Series = None,
+                    calendar: FixtureCalendar = None, form: bool = False,
+                    lags: bool = False) -> pd.DataFrame:
+        """
+        Read the most recent feature row for every player in a season.
+
+        Args:
+            season (str): The season (e.g. "2025-26").
+            fill_values (pd.Series, optional): Imputation values for the
+                `prev_` columns, normally the model's
+                `FeatureSpec.prev_fill_values()`. Defaults to the training
+                means of the store's historical seasons; without any, missing
+                values are left as NaN for the feature spec to fill.
+            calendar (FixtureCalendar, optional): The season's fixtures. If
+                given, the next-fixture features are appended.
+            form (bool): Append last-N-gameweek form features, computed
+                over the stored gameweeks of the season. Windows starting
+                at a gameweek that was never fetched are NaN.
+            lags (bool): Append multi-season lag features from the
+                `data/prev_years` files before `season`.
+
+        Returns:
+            pd.DataFrame: One row per player with `META_COLUMNS` and
+            `FEATURE_COLUMNS` (plus fixture, form and lag features), in the
+            format of the pre-prediction model-ready files.
+        """
+        if fill_values is None and self.historical_seasons():
+            fill_values = self.imputation_values()
+        stored = self.read(season)
+        if form:
+            stored = add_rolling_form(stored, gameweeks=stored["gw"].unique())
+        codes = stored.index.get_level_values(0)
+        latest = stored[~codes.duplicated(keep="last")]
+        if fill_values is not None:
+            latest = impute_prev_features(latest, fill_values)
+        cols = META_COLUMNS + [c for c in FEATURE_COLUMNS if c not in META_COLUMNS]
+        cols += [c for c in latest.columns if c.startswith("form_")]
+        latest = latest[cols].reset_index(drop=True)
+        if calendar is not None:
+            latest = add_fixture_features(latest, calendar)
+        if lags:
+            # After the fixture features, in the training column order.
+            latest = add_lag_features(latest, panel_lag_features())
+        return latest
+
+
+def materialize_history(years, store: FeatureStore = None) -> FeatureStore:
+    """
+    Materialize every season in `years` that has a preceding season.
+
+    Args:
+        years (list of str): Seasons in chronological order.
+        store (FeatureStore, optional): The store to fill.
+
+    Returns:
+        FeatureStore: The filled store.
+    """
+    store = FeatureStore() if store is None else store
+    for prev_season, season in zip(years, years[1:]):
+        store.materialize_season(season, prev_season)
+    return store
+
+
+if __name__ == "__main__":
+    seasons = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
+    feature_store = materialize_history(seasons)
+    print(feature_store.read_training().describe().T)
@@ -0,0 +1,242 @@
+import os
+import numpy as np
+import pandas as pd
+
+RAW_DIR = "data/raw"
+MAX_GW = 38
+# Most fixtures a team can have in one gameweek (double gameweeks are 2).
+MAX_FIXTURES_PER_GW = 3
+HORIZONS = (1, 3, 5)
+FIXTURE_COLUMNS = [
+    f"next_{n}_{feature}" for n in HORIZONS for feature in ("fixtures", "home", "opponent_strength")
+]
+FIXTURE_FILE_COLUMNS = ["team", "fixture", "opponent_team", "was_home", "kickoff_time",
+                        "team_h_score", "team_a_score"]
+
+
+class FixtureCalendar:
+    """
+    A season's fixtures as dense arrays indexed by (team id, gameweek).
+
+    Team ids are the FPL ids (1-20) and gameweeks run from 1 to `MAX_GW`;
+    column `MAX_GW + 1` is always empty so windows can run off the end of
+    the season. For each (team, gw) the calendar holds the number of
+    fixtures (0 for a blank, 2 for a double) and up to
+    `MAX_FIXTURES_PER_GW` opponents, home flags and kickoff times, so the
+    fixtures of any team in any gameweek are found by indexing.
+
+    Opponent strength is the opponent's goal difference per match over the
+    fixtures finished by a given gameweek, so features for gameweek `gw`
+    only use results known after `gw`. It is computed the same way from
+    historical results and from the live API.
+
+    Attributes:
+        count (np.ndarray): Fixtures per (team, gw).
+        opponent (np.ndarray): Opponent ids per (team, gw, slot), 0 if none.
+        home (np.ndarray): Home flags per (team, gw, slot).
+        kickoff (np.ndarray): Kickoff times per (team, gw, slot), NaT if none.
+        team_ids (dict): Team name to id, when names are known.
+    """
+
+    def __init__(self, fixtures: pd.DataFrame, team_ids: dict = None):
+        """
+        Args:
+            fixtures (pd.DataFrame): One row per fixture with "gw",
+                "team_h", "team_a", "kickoff_time", "team_h_score" and
+                "team_a_score" (NaN until the fixture is finished).
+            team_ids (dict, optional): Team name to id.
+        """
+        self.team_ids = team_ids or {}
+        fixtures = fixtures.dropna(subset=["gw"])
+        n_teams = int(max(fixtures["team_h"].max(), fixtures["team_a"].max()))
+        shape = (n_teams + 1, MAX_GW + 2)
+
+        # One row per team per fixture, ordered so slots follow kickoff order.
+        kickoff = pd.to_datetime(fixtures["kickoff_time"], utc=True).dt.tz_localize(None)
+        sides = pd.DataFrame({
+            "team": np.concatenate([fixtures["team_h"], fixtures["team_a"]]).astype(int),
+            "opponent": np.concatenate([fixtures["team_a"], fixtures["team_h"]]).astype(int),
+            "home": np.repeat([True, False], len(fixtures)),
+            "gw": np.tile(fixtures["gw"].astype(int), 2),
+            "kickoff": np.tile(kickoff.to_numpy(), 2),
+            "scored": np.concatenate([fixtures["team_h_score"], fixtures["team_a_score"]]).astype(float),
+            "conceded": np.concatenate([fixtures["team_a_score"], fixtures["team_h_score"]]).astype(float),
+        }).sort_values(["team", "gw", "kickoff"], kind="stable")
+        sides["slot"] = sides.groupby(["team", "gw"]).cumcount()
+        sides = sides[sides["slot"] < MAX_FIXTURES_PER_GW]
+
+        team, gw, slot = sides["team"].to_numpy(), sides["gw"].to_numpy(), sides["slot"].to_numpy()
+        self.count = np.zeros(shape, dtype=np.int16)
+        np.add.at(self.count, (team, gw), 1)
+        self.opponent = np.zeros(shape + (MAX_FIXTURES_PER_GW,), dtype=np.int16)
+        self.opponent[team, gw, slot] = sides["opponent"].to_numpy()
+        self.home = np.zeros(shape + (MAX_FIXTURES_PER_GW,), dtype=bool)
+        self.home[team, gw, slot] = sides["home"].to_numpy()
+        self.kickoff = np.full(shape + (MAX_FIXTURES_PER_GW,), np.datetime64("NaT"), dtype="datetime64[s]")
+        self.kickoff[team, gw, slot] = sides["kickoff"].to_numpy()
+
+        # Running goal difference and matches played, for opponent strength.
+        finished = sides.dropna(subset=["scored", "conceded"])
+        goal_diff = np.zeros(shape)
+        played = np.zeros(shape)
+        np.add.at(goal_diff, (finished["team"], finished["gw"]), finished["scored"] - finished["conceded"])
+        np.add.at(played, (finished["team"], finished["gw"]), 1)
+        self._strength = np.cumsum(goal_diff, axis=1) / np.maximum(np.cumsum(played, axis=1), 1)
+        self._cum_count = np.cumsum(self.count, axis=1)
+        self._cum_home = np.cumsum(self.home.sum(axis=2), axis=1)
+
+    @classmethod
+    def from_gameweek_files(cls, season: str, base_dir: str = RAW_DIR) -> "FixtureCalendar":
+        """
+        Build a season's calendar from its historical `gw*.csv` files.
+
+        Every player row names its own team, the fixture, the opponent's id
+        and whether it was at home, so each fixture's home and away ids are
+        read from the away and home players' `opponent_team`. This also
+        gives the id of every team name.
+
+        Args:
+            season (str): The season (e.g. "2023-24").
+            base_dir (str): Base directory of the downloaded gameweek CSVs.
+
+        Returns:
+            FixtureCalendar
+        """
+        frames = []
+        for gw in range(1, MAX_GW + 1):
+            path = os.path.join(base_dir, season, f"gw{gw}.csv")
+            if os.path.exists(path):
+                frames.append(pd.read_csv(path, usecols=FIXTURE_FILE_COLUMNS).assign(gw=gw))
+        rows = pd.concat(frames, ignore_index=True)
+        # Some seasons mix bool and string `was_home` across gameweek files.
+        rows["was_home"] = rows["was_home"].astype(str) == "True"
+        rows = rows.drop_duplicates(subset=["fixture", "was_home"])
+
+        home = rows[rows["was_home"]].set_index("fixture")
+        away = rows[~rows["was_home"]].set_index("fixture")
+        fixtures = pd.DataFrame({
+            "gw": home["gw"],
+            "team_h": away["opponent_team"].reindex(home.index),
+            "team_a": home["opponent_team"],
+            "kickoff_time": home["kickoff_time"],
+            "team_h_score": home["team_h_score"],
+            "team_a_score": home["team_a_score"],
+        }).dropna(subset=["team_h"])
+
+        team_ids = dict(zip(home["team"], fixtures["team_h"].astype(int)))
+        team_ids.update(zip(away["team"], home["opponent_team"].reindex(away.index).fillna(0).astype(int)))
+        team_ids = {name: team_id for name, team_id in team_ids.items() if team_id > 0}
+        return cls(fixtures.reset_index(drop=True), team_ids)
+
+    @classmethod
+    def from_api(cls, fixtures: pd.DataFrame) -> "FixtureCalendar":
+        """
+        Build the current season's calendar from the FPL `fixtures` endpoint.
+
+        Fixtures without a gameweek (postponed and not yet rescheduled)
+        are left out, so they show up as blanks.
+
+        Args:
+            fixtures (pd.DataFrame): The endpoint's rows, e.g. from
+                `pull_current_fpl_api.pull_fixtures`.
+
+        Returns:
+            FixtureCalendar
+        """
+        return cls(fixtures.rename(columns={"event": "gw"}))
+
+    def team_index(self, teams) -> np.ndarray:
+        """Return team ids for a column of team ids or team names."""
+        teams = pd.Series(teams)
+        if pd.api.types.is_numeric_dtype(teams):
+            return teams.fillna(0).to_numpy(dtype=int)
+        return teams.map(self.team_ids).fillna(0).to_numpy(dtype=int)
+
+    def fixture_count(self, team: int, gw: int) -> int:
+        """Return how many fixtures a team plays in a gameweek (0 for a blank)."""
+        return int(self.count[team, gw])
+
+    def next_fixtures(self, team: int, gw: int, n: int = HORIZONS[-1]) -> pd.DataFrame:
+        """
+        Return a team's fixtures in the `n` gameweeks after `gw`.
+
+        Returns:
+            pd.DataFrame: "gw", "opponent", "was_home", "kickoff_time" and
+            "opponent_strength" (as of `gw`), one row per fixture.
+        """
+        gws = np.arange(gw + 1, min(gw + n, MAX_GW) + 1)
+        slots = np.arange(MAX_FIXTURES_PER_GW)
+        has_fixture = slots[None, :] < self.count[team, gws][:, None]
+        rows, slots = np.nonzero(has_fixture)
+        opponents = self.opponent[team, gws[rows], slots]
+        return pd.DataFrame({
+            "gw": gws[rows],
+            "opponent": opponents,
+            "was_home": self.home[team, gws[rows], slots],
+            "kickoff_time": self.kickoff[team, gws[rows], slots],
+            "opponent_strength": self._strength[opponents, gw],
+        })
+
+    def features(self, teams, gws, horizons=HORIZONS) -> pd.DataFrame:
+        """
+        Compute fixture features for many (team, gameweek) pairs at once.
+
+        For each horizon `n`, the features describe gameweeks `gw + 1` to
+        `gw + n`: the number of fixtures (so blanks and doubles show up),
+        how many are at home, and the mean strength of the opponents as of
+        `gw` (0 if there are none). Counts are differences of cumulative
+        sums and strengths are one gather over the window, so there is no
+        per-player loop.
+
+        Args:
+            teams (array-like): Team ids (or names, see `team_index`).
+            gws (array-like): The last gameweek played for each row.
+            horizons (tuple of int): Window lengths in gameweeks.
+
+        Returns:
+            pd.DataFrame: `next_{n}_fixtures`, `next_{n}_home` and
+            `next_{n}_opponent_strength` per horizon, one row per pair.
+        """
+        teams = self.team_index(teams)
+        teams = np.where(teams < len(self.count), teams, 0)
+        gws = np.clip(np.asarray(gws, dtype=int), 0, MAX_GW)
+
+        features = {}
+        for n in horizons:
+            end = np.minimum(gws + n, MAX_GW + 1)
+            window = np.minimum(gws[:, None] + np.arange(1, n + 1), MAX_GW + 1)
+            opponents = self.opponent[teams[:, None], window]
+            strength = self._strength[opponents, gws[:, None, None]]
+            played = opponents > 0
+            total = np.where(played, strength, 0).sum(axis=(1, 2))
+            matches = played.sum(axis=(1, 2))
+
+            features[f"next_{n}_fixtures"] = self._cum_count[teams, end] - self._cum_count[teams, gws]
+            features[f"next_{n}_home"] = self._cum_home[teams, end] - self._cum_home[teams, gws]
+            features[f"next_{n}_opponent_strength"] = np.divide(
+                total, matches, out=np.zeros(len(teams)), where=matches > 0
+            ).round(2)
+        return pd.DataFrame(features)
+
+
+def add_fixture_features(df: pd.DataFrame, calendar: FixtureCalendar, horizons=HORIZONS) -> pd.DataFrame:
+    """
+    Return a copy of feature rows with the calendar's fixture features appended.
+
+    Args:
+        df (pd.DataFrame): Rows with "team" and "gw" columns.
+        calendar (FixtureCalendar): The rows' season calendar.
+        horizons (tuple of int): Window lengths in gameweeks.
+
+    Returns:
+        pd.DataFrame
+    """
+    fixture_df = calendar.features(df["team"], df["gw"], horizons)
+    return pd.concat([df.reset_index(drop=True), fixture_df], axis=1)
+
+
+if __name__ == "__main__":
+    calendar = FixtureCalendar.from_gameweek_files("2024-25")
+    team = calendar.team_ids["Arsenal"]
+    print(calendar.next_fixtures(team, 10))
+    print(calendar.features([team] * 3, [10, 20, 30]))
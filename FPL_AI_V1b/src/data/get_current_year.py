@@ -1,6 +1,7 @@
 import os
 import pandas as pd
 
+from src.utils.cassette import read_csv as read_remote_csv
 from src.utils.feature_engineering import calc_cards_per_90, calc_pts_per_90
 
 def get_current_player_data(year, first_name, second_name, base_dir="data/raw"):
@@ -48,7 +49,7 @@ def get_current_player_data(year, first_name, second_name, base_dir="data/raw"):
         if not os.path.exists(local_path):
             url = f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{year}/gws/gw{n}.csv"
             try:
-                df_gw = pd.read_csv(url)
+                df_gw = read_remote_csv(url)
                 df_gw.to_csv(local_path, index=False)
             except Exception as e:
                 print(f"Error downloading GW{n} for {year}: {e}")
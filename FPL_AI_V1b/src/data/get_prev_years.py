@@ -1,6 +1,6 @@
-import pandas as pd
 import os
 
+from src.utils.cassette import read_csv as read_remote_csv
 from src.utils.feature_engineering import calc_cards_per_90, calc_pts_per_90
 
 def process_season_data(df):
@@ -46,7 +46,7 @@ def fetch_and_process_season(year, save_dir="data/prev_years"):
         f"master/data/{year}/cleaned_players.csv"
     )
     print(f"Fetching data for {year}...")
-    df = pd.read_csv(url)
+    df = read_remote_csv(url)
     df_processed = process_season_data(df)
 
     os.makedirs(save_dir, exist_ok=True)
@@ -0,0 +1,320 @@
+import os
+import time
+import pandas as pd
+
+from src.data.feature_store import (
+    CUMULATIVE_STATS, EXPECTED_STATS, FEATURE_COLUMNS, STORE_DIR, FeatureStore, compute_features, current_features,
+    feature_flags, impute_prev_features, index_prev_season
+)
+from src.data.fixture_calendar import FixtureCalendar
+from src.data.repository import read_season_data
+from src.model.feature_spec import check_model_columns
+from src.utils.cassette import get_json
+
+SNAPSHOT_COLUMNS = ["code", "first_name", "second_name", "element_type", "now_cost", "team"] + CUMULATIVE_STATS
+
+
+def _snapshot(api_df: pd.DataFrame) -> pd.DataFrame:
+    # The API sends expected stats as strings.
+    expected = [stat for stat in EXPECTED_STATS if stat in api_df]
+    snapshot = api_df.set_index("id")[SNAPSHOT_COLUMNS + expected]
+    return snapshot.astype({stat: float for stat in expected})
+
+
+def live_state_path(year: str, root: str = STORE_DIR) -> str:
+    """Return where the live state of a season is kept, next to its feature store partition."""
+    return os.path.join(root, "live", f"{year}.pkl")
+
+
+def pull_gameweek_deltas(gw: int) -> pd.DataFrame:
+    """
+    Pull every player's stats for a single gameweek from the FPL API.
+
+    Uses the `event/{gw}/live` endpoint, which only carries the gameweek's
+    own stats, instead of the full `bootstrap-static` player table.
+
+    Args:
+        gw (int): Gameweek number.
+
+    Returns:
+        pd.DataFrame: `CUMULATIVE_STATS` and `EXPECTED_STATS` for the
+        gameweek, indexed by FPL element id.
+    """
+    url = f"https://fantasy.premierleague.com/api/event/{gw}/live/"
+    elements = get_json(url)["elements"]
+    df = pd.DataFrame([{"id": element["id"], **element["stats"]} for element in elements])
+    stats = CUMULATIVE_STATS + [stat for stat in EXPECTED_STATS if stat in df]
+    return df.set_index("id")[stats].apply(pd.to_numeric)
+
+
+def snapshot_deltas(previous: pd.DataFrame, current: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-player stat changes between two `bootstrap-static` player tables.
+
+    Args:
+        previous (pd.DataFrame): The earlier player table.
+        current (pd.DataFrame): The later player table.
+
+    Returns:
+        pd.DataFrame: `CUMULATIVE_STATS` (and `EXPECTED_STATS`, if in both
+        tables) differences indexed by element id, for every player in
+        `current`.
+    """
+    stats = CUMULATIVE_STATS + [stat for stat in EXPECTED_STATS if stat in previous and stat in current]
+    previous = previous.set_index("id")[stats].apply(pd.to_numeric)
+    current = current.set_index("id")[stats].apply(pd.to_numeric)
+    return current.sub(previous.reindex(current.index, fill_value=0))
+
+
+class LiveFeatureState:
+    """
+    Model-ready state of the current season, updated one gameweek at a time.
+
+    The state keeps each player's raw season-to-date totals next to their
+    feature row (before imputation), both indexed by FPL element id. A
+    gameweek update adds the gameweek's stats to the totals of the players
+    who recorded any, and recomputes only their `current_` and per-90
+    features. Previous season features, which need the name merge with the
+    previous season's data, are computed once per player; the prepared
+    previous season table is kept for players who join mid-season.
+
+    The gameweek and fixture count features are set for every player, as
+    they change with each gameweek. Fixture, form and lag features are not
+    kept in the state; they are read back from the feature store with the
+    model-ready rows, using the `feature_flags` of the full pull the state
+    was built with.
+
+    Applying a gameweek costs about 1 ms when no totals changed and about
+    8 ms otherwise, whatever the number of changed players, against about
+    25 ms for a full `compute_features` rebuild of ~740 players. Gameweeks
+    with new signings also run `compute_features` on the new rows, which
+    costs about as much as the full rebuild.
+    """
+
+    def __init__(self, snapshot: pd.DataFrame, features: pd.DataFrame, prev_index: pd.DataFrame, year: str):
+        """
+        Args:
+            snapshot (pd.DataFrame): `SNAPSHOT_COLUMNS`, plus any
+                `EXPECTED_STATS`, indexed by element id.
+            features (pd.DataFrame): `compute_features` output with the same index.
+            prev_index (pd.DataFrame): Previous season from `index_prev_season`.
+            year (str): Current season (e.g. "2025-26").
+        """
+        self.snapshot = snapshot
+        self.features = features
+        self.prev_index = prev_index
+        self.year = year
+        self.feature_flags = {}
+        self.scored_inputs = None
+        self.predictions = None
+
+    @classmethod
+    def build(cls, api_df: pd.DataFrame, year: str, prev_year: str, gw: int) -> "LiveFeatureState":
+        """
+        Build the state from a full `bootstrap-static` player table.
+
+        Args:
+            api_df (pd.DataFrame): FPL API player data with a "matches" column.
+            year (str): Current season (e.g. "2025-26").
+            prev_year (str): Previous season (e.g. "2024-25").
+            gw (int): The last gameweek that has been played.
+        """
+        snapshot = _snapshot(api_df).sort_index()
+        prev_index = index_prev_season(read_season_data(prev_year))
+        matches = api_df.set_index("id")["matches"]
+        features = compute_features(snapshot.assign(gw=gw, matches=matches), prev_index, year)
+        features.index = snapshot.index
+        return cls(snapshot, features, prev_index, year)
+
+    def apply_gameweek(self, deltas: pd.DataFrame, gw: int, matches, new_players: pd.DataFrame = None) -> pd.Index:
+        """
+        Add one gameweek's stats to the state.
+
+        Args:
+            deltas (pd.DataFrame): The gameweek's `CUMULATIVE_STATS` (and
+                optionally `EXPECTED_STATS`) per player, indexed by element
+                id (see `pull_gameweek_deltas`).
+            gw (int): The gameweek the deltas belong to.
+            matches (int or pd.Series): Matches each team played in `gw`,
+                as a scalar or a Series indexed by team id.
+            new_players (pd.DataFrame, optional): `bootstrap-static` rows,
+                with season totals up to `gw`, for players who joined the
+                game since the state was built (e.g. new signings).
+
+        Returns:
+            pd.Index: Element ids whose season totals changed or who are new.
+
+        Raises:
+            ValueError: If `deltas` contains players that are neither in
+                the state nor in `new_players`.
+        """
+        new_ids = deltas.index.difference(self.snapshot.index)
+        if len(new_ids):
+            if new_players is None or len(new_ids.difference(new_players["id"])):
+                raise ValueError(f"{len(new_ids)} players are not in the live state; pass their bootstrap-static rows.")
+            self._add_players(new_players[new_players["id"].isin(new_ids)], gw)
+
+        expected = [stat for stat in EXPECTED_STATS if stat in deltas and stat in self.snapshot]
+        stats = CUMULATIVE_STATS + expected
+        deltas = deltas.drop(index=new_ids)[stats]
+        deltas = deltas[deltas.ne(0).any(axis=1).to_numpy()]
+        changed = deltas.index
+        if len(changed):
+            # Only the changed rows are read and written, each as one block,
+            # so the cost grows with the number of changed players.
+            rows = self.snapshot.index.get_indexer(changed)
+            totals = self.snapshot.iloc[rows][stats] + deltas
+            self.snapshot.iloc[rows, self.snapshot.columns.get_indexer(stats)] = totals
+            features = current_features(totals).round(2)
+            for stat in expected:
+                features[f"current_{stat}"] = totals[stat].round(2)
+            self.features.iloc[rows, self.features.columns.get_indexer(features.columns)] = features
+
+        self.features["gw"] = gw
+        if isinstance(matches, pd.Series):
+            matches = self.snapshot["team"].map(matches).fillna(0).astype(int)
+        self.features["matches"] = matches
+        return changed.append(new_ids)
+
+    def _add_players(self, api_rows: pd.DataFrame, gw: int) -> None:
+        snapshot = _snapshot(api_rows)[self.snapshot.columns]
+        features = compute_features(snapshot.assign(gw=gw, matches=0), self.prev_index, self.year)
+        features.index = snapshot.index
+        self.snapshot = pd.concat([self.snapshot, snapshot]).sort_index()
+        self.features = pd.concat([self.features, features]).sort_index()
+
+    def score(self, model, fill_values: pd.Series = None, spec=None, extra_features: pd.DataFrame = None) -> int:
+        """
+        Update `self.predictions`, re-scoring only players whose inputs changed.
+
+        Args:
+            model: Fitted model with a `predict` method.
+            fill_values (pd.Series, optional): Imputation values for the
+                `prev_` columns, or None to leave them missing.
+            spec (FeatureSpec, optional): The model's feature spec. The rows
+                are then checked and assembled by it, and any `prev_` gaps
+                left get its training fill values.
+            extra_features (pd.DataFrame, optional): Rows with "code" and
+                the fixture, form or lag columns the model was trained with,
+                e.g. from `build_model_ready_data`. Joined on "code".
+
+        Returns:
+            int: Number of players re-scored.
+
+        Raises:
+            ValueError: If the rows do not match the columns the model was
+                fitted on.
+        """
+        X = self.features if fill_values is None else impute_prev_features(self.features, fill_values)
+        if extra_features is not None:
+            extra = extra_features.set_index("code")
+            X = X.join(extra[[col for col in extra.columns if col not in X.columns]], on="code")
+        if spec is not None:
+            X = spec.to_frame(X)
+        else:
+            X = X[FEATURE_COLUMNS]
+        check_model_columns(model, list(X.columns))
+        self.predictions, rescored = score_changed_rows(model, X, self.scored_inputs, self.predictions)
+        self.scored_inputs = X
+        return rescored
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pd.to_pickle(self, path)
+
+    @staticmethod
+    def load(path: str) -> "LiveFeatureState":
+        return pd.read_pickle(path)
+
+
+def score_changed_rows(model, X: pd.DataFrame, previous_X: pd.DataFrame = None,
+                       previous_predictions: pd.Series = None) -> tuple:
+    """
+    Predict only the rows whose model inputs changed since the last scoring.
+
+    Rows are matched on the index, so `X` and `previous_X` must share one
+    (e.g. element id). Rows that are new or differ in any model input are
+    re-scored; the rest keep their previous prediction.
+
+    Args:
+        model: Fitted model with a `predict` method.
+        X (pd.DataFrame): Current model inputs.
+        previous_X (pd.DataFrame, optional): Inputs of the last scoring.
+        previous_predictions (pd.Series, optional): Predictions of the last
+            scoring, indexed like `previous_X`.
+
+    Returns:
+        tuple: (predictions as a Series indexed like `X`, number of rows re-scored)
+    """
+    if previous_X is None:
+        return pd.Series(model.predict(X), index=X.index), len(X)
+
+    previous_X = previous_X.reindex(X.index)
+    stale = (X.ne(previous_X) & ~(X.isna() & previous_X.isna())).any(axis=1).to_numpy()
+    predictions = previous_predictions.reindex(X.index).astype(float)
+    if stale.any():
+        predictions[stale] = model.predict(X[stale])
+    return predictions, int(stale.sum())
+
+
+def update_model_ready_api_data(gw: int, year: str = "2025-26", root: str = STORE_DIR,
+                                model_path: str = None) -> pd.Index:
+    """
+    Bring the current season's model-ready data up to gameweek `gw` incrementally.
+
+    Loads the live state saved by `save_model_ready_api_data` (or an earlier
+    update), applies the gameweek's stats from the `event/{gw}/live`
+    endpoint, stores the gameweek in the feature store and writes the
+    model-ready file, as a full `save_model_ready_api_data` run would.
+    Prices and transfers between clubs are not in the live endpoint, so
+    `now_cost` and `team` keep the values of the last full pull.
+
+    With `model_path`, missing previous season values are filled with the
+    imputation values of the model's feature spec, and predictions kept in
+    the state are refreshed for the players whose model inputs changed.
+    Fixture, form and lag features are added when the model's spec uses
+    them, or otherwise when the full pull the state was built with added
+    them (see `save_model_ready_api_data`).
+
+    Args:
+        gw (int): Gameweek number.
+        year (str, optional): Current season (default "2025-26").
+        root (str): Feature store directory.
+        model_path (str, optional): Trained model to re-score with.
+
+    Returns:
+        pd.Index: Element ids whose stats changed.
+    """
+    from src.data.pull_current_fpl_api import (
+        build_model_ready_data, pull_api_data, pull_fixture_counts, pull_fixtures, save_model_ready_csv
+    )
+    from src.model.make_predictions import load_model_and_spec
+
+    start = time.time()
+    path = live_state_path(year, root)
+    state = LiveFeatureState.load(path)
+    deltas = pull_gameweek_deltas(gw)
+    # Only new signings need the full player table.
+    new_players = pull_api_data() if len(deltas.index.difference(state.snapshot.index)) else None
+    changed = state.apply_gameweek(deltas, gw, pull_fixture_counts(gw), new_players)
+    print(f"Updated {len(changed)} of {len(state.features)} players to GW{gw} in {time.time() - start:.2f} seconds")
+
+    store = FeatureStore(root)
+    store.append_features(state.features.reset_index(drop=True), year, gw, overwrite=True)
+    model, spec = load_model_and_spec(model_path) if model_path is not None else (None, None)
+    # States saved before the flags were recorded add no optional features.
+    flags = feature_flags(spec.columns) if spec is not None else getattr(state, "feature_flags", {})
+    calendar = FixtureCalendar.from_api(pull_fixtures()) if flags.get("fixtures") else None
+    output_df, fill_values = build_model_ready_data(store, year, calendar, flags.get("form", False),
+                                                    flags.get("lags", False),
+                                                    spec.prev_fill_values() if spec is not None else None)
+    save_model_ready_csv(output_df, gw, year)
+    if model is not None:
+        rescored = state.score(model, fill_values, spec, output_df)
+        print(f"Re-scored {rescored} players")
+    state.save(path)
+    return changed
+
+
+if __name__ == "__main__":
+    update_model_ready_api_data(5)
@@ -0,0 +1,145 @@
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+
+from src.data.repository import read_season_data
+from src.utils.feature_engineering import NAME_KEYS, add_name_keys
+
+SEASON_DATA_DIR = "data/prev_years"
+SEASON_FILE_PATTERN = re.compile(r"^(\d{4}-\d{2})_season_data\.csv$")
+# Season stats, as in the `data/prev_years` files.
+PANEL_STATS = ["total_points", "goals_scored", "assists", "minutes", "goals_conceded", "creativity",
+               "influence", "threat", "bonus", "ict_index", "clean_sheets", "cards_per_90", "points_per_90"]
+LAGS = (2, 3)
+# Seasons before the target season summarised by the aggregate features.
+HISTORY = 3
+HISTORY_STATS = ["total_points", "minutes", "points_per_90"]
+LAG_COLUMNS = (
+    [f"prev{lag}_{stat}" for lag in LAGS for stat in PANEL_STATS]
+    + [f"hist{HISTORY}_seasons"]
+    + [f"hist{HISTORY}_{agg}_{stat}" for stat in HISTORY_STATS for agg in ("mean", "max")]
+)
+
+
+def next_season(season: str) -> str:
+    """Return the season after `season`, e.g. "2024-25" -> "2025-26"."""
+    start = int(season[:4]) + 1
+    return f"{start}-{str(start + 1)[2:]}"
+
+
+def build_panel(seasons=None, data_dir: str = SEASON_DATA_DIR) -> pd.DataFrame:
+    """
+    Stack every season's final stats into one player-season panel.
+
+    Players are identified by their normalized name across seasons. Names
+    that are ambiguous within a season are dropped from that season, as in
+    the `prev_` join.
+
+    Args:
+        seasons (list of str, optional): Seasons to include. Defaults to
+            every `{season}_season_data.csv` in `data_dir`.
+        data_dir (str): Directory of the season files.
+
+    Returns:
+        pd.DataFrame: One row per (player, season) with `NAME_KEYS`,
+        "season" and `PANEL_STATS`, ordered by season.
+    """
+    if seasons is None:
+        seasons = [match.group(1) for match in map(SEASON_FILE_PATTERN.match, os.listdir(data_dir)) if match]
+    frames = []
+    for season in sorted(seasons):
+        season_df = add_name_keys(read_season_data(season, data_dir))
+        season_df = season_df[~season_df.duplicated(subset=NAME_KEYS, keep=False)]
+        frames.append(season_df[NAME_KEYS + PANEL_STATS].assign(season=season))
+    return pd.concat(frames, ignore_index=True)
+
+
+def lag_features(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute multi-season lag and history features for every target season.
+
+    For a target season `S`, `prev{k}_{stat}` is the player's stat in the
+    season `k` before `S` (`prev_` is the season just before, added by
+    `compute_features`), and the `hist` columns summarise the `HISTORY`
+    seasons before `S`: how many the player appeared in, and the mean and
+    max of `HISTORY_STATS` over those. Seasons a player is missing from
+    stay NaN.
+
+    Each stat is pivoted to a (players x seasons) matrix once, with one
+    column per season and an extra one for the season after the last, so
+    lags are column shifts and the history is a rolling window over
+    columns. The cost is linear in players x seasons.
+
+    Args:
+        panel (pd.DataFrame): Output of `build_panel`.
+
+    Returns:
+        pd.DataFrame: `NAME_KEYS`, "season" (the target season) and
+        `LAG_COLUMNS`, for every player with any history before it.
+    """
+    # Every season from the first in the panel to the one after the last,
+    # so a season without a file is a gap rather than a shorter lag.
+    seasons = [panel["season"].min()]
+    while seasons[-1] <= panel["season"].max():
+        seasons.append(next_season(seasons[-1]))
+    targets = seasons[1:]
+    wide = panel.set_index(NAME_KEYS + ["season"])[PANEL_STATS].unstack("season").sort_index(axis=1)
+
+    features = {}
+    for stat in PANEL_STATS:
+        values = wide[stat].reindex(columns=seasons)
+        for lag in LAGS:
+            features[f"prev{lag}_{stat}"] = values.shift(lag, axis=1)
+    played = wide["minutes"].reindex(columns=seasons).notna().astype(float)
+    features[f"hist{HISTORY}_seasons"] = played.shift(1, axis=1).T.rolling(HISTORY, min_periods=1).sum().T
+    for stat in HISTORY_STATS:
+        before = wide[stat].reindex(columns=seasons).shift(1, axis=1).T
+        window = before.rolling(HISTORY, min_periods=1)
+        features[f"hist{HISTORY}_mean_{stat}"] = window.mean().T
+        features[f"hist{HISTORY}_max_{stat}"] = window.max().T
+
+    # Back to one row per (player, target season).
+    out = pd.concat({name: frame[targets] for name, frame in features.items()}, axis=1)
+    out = out.stack("season", future_stack=True)
+    out = out[out[f"hist{HISTORY}_seasons"] > 0]
+    return out[LAG_COLUMNS].round(2).reset_index()
+
+
+def add_lag_features(df: pd.DataFrame, features: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of feature rows with their multi-season lag features appended.
+
+    Rows are matched on normalized names and "year" (the target season).
+    Players without history get NaN lags and 0 for `hist{HISTORY}_seasons`.
+
+    Args:
+        df (pd.DataFrame): Rows with "first_name", "second_name" and "year".
+        features (pd.DataFrame): Output of `lag_features`.
+
+    Returns:
+        pd.DataFrame
+    """
+    keys = add_name_keys(df[["first_name", "second_name", "year"]])
+    lags = keys.merge(features, how="left", left_on=NAME_KEYS + ["year"], right_on=NAME_KEYS + ["season"],
+                      validate="many_to_one")
+    lags[f"hist{HISTORY}_seasons"] = lags[f"hist{HISTORY}_seasons"].fillna(0)
+    out = df.reset_index(drop=True)
+    return pd.concat([out, lags[LAG_COLUMNS].set_axis(out.index)], axis=1)
+
+
+def panel_lag_features(seasons=None, data_dir: str = SEASON_DATA_DIR) -> pd.DataFrame:
+    """Build the panel and its lag features, printing how long it took."""
+    start = time.time()
+    panel = build_panel(seasons, data_dir)
+    features = lag_features(panel)
+    print(f"Built lag features for {panel['season'].nunique()} seasons "
+          f"({len(panel)} player-seasons) in {time.time() - start:.2f} seconds")
+    return features
+
+
+if __name__ == "__main__":
+    features = panel_lag_features()
+    print(features[features["season"] == features["season"].max()].describe().T)
+    print(np.round(features.isna().mean(), 2).sort_values().tail())
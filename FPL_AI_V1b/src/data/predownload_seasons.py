@@ -1,5 +1,6 @@
 import os
-import pandas as pd
+
+from src.utils.cassette import read_csv as read_remote_csv
 
 SEASONS = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
 BASE_DIR = "data/raw"
@@ -22,7 +23,7 @@ def download_gw(year, gw):
 
     url = f"https://raw.githubusercontent.com/vaastav/Fantasy-Premier-League/master/data/{year}/gws/gw{gw}.csv"
     try:
-        df = pd.read_csv(url)
+        df = read_remote_csv(url)
         df.to_csv(local_path, index=False)
         print(f"Downloaded: {local_path}")
     except Exception as e:
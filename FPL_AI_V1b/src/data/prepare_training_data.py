@@ -2,6 +2,7 @@ import pandas as pd
 import os
 import time
 from src.data.get_current_year import get_current_player_data
+from src.data.repository import read_season_data
 
 def load_season_data(years, i, data_dir="data/prev_years"):
     """
@@ -18,8 +19,8 @@ def load_season_data(years, i, data_dir="data/prev_years"):
     this_year = years[i]
     prev_year = years[i - 1]
 
-    current_df = pd.read_csv(os.path.join(data_dir, f"{this_year}_season_data.csv"))
-    prev_df = pd.read_csv(os.path.join(data_dir, f"{prev_year}_season_data.csv"))
+    current_df = read_season_data(this_year, data_dir)
+    prev_df = read_season_data(prev_year, data_dir)
 
     return this_year, prev_df, current_df
 
@@ -1,16 +1,19 @@
-import requests
 import pandas as pd
-import json
 from datetime import datetime, timezone
 import os
-from src.utils.feature_engineering import calc_cards_per_90, calc_pts_per_90, normalize_name
+from src.data.repository import read_season_data
+from src.utils.cassette import get_json
+from src.data.fixture_calendar import FixtureCalendar
+from src.data.feature_store import FeatureStore, compute_features, impute_prev_features
+from src.data.incremental_update import LiveFeatureState, live_state_path
 
-def pull_api_data():
+def pull_api_data(save=True):
     """Pull the latest data from the official FPL API.
     
     Fetches the player elements dataset from the FPL `bootstrap-static`
     endpoint, saves the raw data to a timestamped CSV in 
-    `data/raw/official_fpl_api/`, and returns it as a DataFrame.
+    `data/raw/official_fpl_api/` (unless `save` is False), and returns it
+    as a DataFrame.
 
     Returns:
         df (pd.DataFrame): The raw FPL player data with the following 
@@ -47,161 +50,190 @@ def pull_api_data():
         defensive_contribution_per_90
     """
     url = 'https://fantasy.premierleague.com/api/bootstrap-static/'
-    response = requests.get(url)
-    data = json.loads(response.text)
+    data = get_json(url)
     df = pd.DataFrame.from_dict(data['elements'])
+    if not save:
+        return df
     now = datetime.now(timezone.utc)
     formatted = now.strftime("%Y_%m_%d_%H_%M_%S")
     path = f'data/raw/official_fpl_api/{formatted}_fpl_api.csv'
     df.to_csv(path, index=False)
     return df
 
-def process_api_data(current_df, year, prev_year, gw):
+def pull_fixture_counts(gw):
+    """Pull the number of fixtures each team plays in a gameweek.
+
+    Args:
+        gw (int): Gameweek number.
+
+    Returns:
+        pd.Series: Fixture count indexed by FPL team id. Teams with a
+        blank gameweek are absent.
+    """
+    url = f"https://fantasy.premierleague.com/api/fixtures/?event={gw}"
+    fixtures = pd.DataFrame(get_json(url))
+    return pd.concat([fixtures["team_h"], fixtures["team_a"]]).value_counts()
+
+def pull_fixtures():
+    """Pull every fixture of the current season from the FPL `fixtures` endpoint.
+
+    Returns:
+        pd.DataFrame: One row per fixture with "event" (the gameweek, NaN
+        if unscheduled), "team_h", "team_a", "kickoff_time", "team_h_score"
+        and "team_a_score", among others.
+    """
+    url = "https://fantasy.premierleague.com/api/fixtures/"
+    return pd.DataFrame(get_json(url))
+
+def process_api_data(current_df, year, prev_year, gw, matches=1, fill_values=None):
     """Transform raw FPL API data into a model-ready dataset.
 
+    Features are computed by `feature_store.compute_features`, the same
+    code used for training data.
+
     Args:
         current_df (pd.DataFrame): Current season FPL player data.
         year (str): Current season (e.g., "2025-26").
         prev_year (str): Previous season (e.g., "2024-25").
         gw (int): Gameweek number (the last gw which has been played).
+        matches (int or pd.Series): Matches each player's team played in
+            `gw`, e.g. `current_df["team"].map(pull_fixture_counts(gw))`.
+        fill_values (pd.Series, optional): Values for missing previous
+            season features, normally the model's
+            `FeatureSpec.prev_fill_values()`. If not given, they are left as
+            NaN for the feature spec to fill at prediction time.
 
     Returns:
         pd.DataFrame: Processed model-ready dataset including:
             - Player metadata (names, code, element_type, year, gw).
+            - Squad selection metadata (now_cost in tenths of £1m, team).
             - Previous season features (prefixed with `prev_`).
             - Current season features (prefixed with `current_`).
             - Engineered metrics (cards_per_90, points_per_90).
-            - Missing previous season numeric values filled with column 
-            means.
+            - Missing previous season numeric values filled with
+            `fill_values`, if given.
 """
-    
-    def drop_name_duplicates(df):
-        return df[~df.duplicated(subset=["first_name", "second_name"], keep=False)]  
-    
-    current_df = current_df.copy()
-    
     keep_cols_current = [
         "first_name", "second_name", "element_type", "total_points", 
         "goals_scored", "assists", "minutes", "goals_conceded", "creativity", 
         "influence", "threat", "bonus", "ict_index", "clean_sheets", 
-        "yellow_cards", "red_cards", "code"
+        "yellow_cards", "red_cards", "code", "now_cost", "team"
         ]
-    current_df = current_df[keep_cols_current]
+    snapshot = current_df[keep_cols_current].assign(gw=gw, matches=matches)
     
-    prev_path = os.path.join("data", "prev_years", f"{prev_year}_season_data.csv")
-    prev_df = pd.read_csv(prev_path)
-    prev_df = prev_df.copy()
+    prev_df = read_season_data(prev_year)
     
-    current_df['first_name_norm'] = current_df['first_name'].apply(normalize_name)
-    current_df['second_name_norm'] = current_df['second_name'].apply(normalize_name)
-    prev_df['first_name_norm'] = prev_df['first_name'].apply(normalize_name)
-    prev_df['second_name_norm'] = prev_df['second_name'].apply(normalize_name)
+    output = compute_features(snapshot, prev_df, year)
+    if fill_values is None:
+        return output
+    return impute_prev_features(output, fill_values)
     
-    # Drop players with duplicate names.
-    current_clean = current_df
-    prev_clean = drop_name_duplicates(prev_df)
-    
-    prev_clean["points_per_90_prev"] = prev_clean["points_per_90"]
-    prev_clean["cards_per_90_prev"] = prev_clean["cards_per_90"]
-    
-    merged = pd.merge(
-        current_clean,
-        prev_clean,
-        left_on=["first_name_norm", "second_name_norm"],
-        right_on=["first_name_norm", "second_name_norm"],
-        how="left",
-        suffixes=("", "_prev")
-    )
-    merged = merged.drop(columns=['first_name_norm', 'second_name_norm'])
-    
-    output = pd.DataFrame()
-       
-    output = pd.DataFrame()
-    output["code"] = merged["code"]
-    output["first_name"] = merged["first_name"]
-    output["second_name"] = merged["second_name"]
-    # Element type index is 1 more in current season (2025-26) than in training data
-    output["element_type"] = merged["element_type"] - 1
-    output["year"] = year
-    output["gw"] = gw
-    
-    # Previous season features (if player was in prev_years, otherwise NaN)
-    output["prev_total_points"]   = merged.get("total_points_prev")
-    output["prev_goals_scored"]   = merged.get("goals_scored_prev")
-    output["prev_assists"]        = merged.get("assists_prev")
-    output["prev_minutes"]        = merged.get("minutes_prev")
-    output["prev_goals_conceded"] = merged.get("goals_conceded_prev")
-    output["prev_creativity"]     = merged.get("creativity_prev")
-    output["prev_influence"]      = merged.get("influence_prev")
-    output["prev_threat"]         = merged.get("threat_prev")
-    output["prev_bonus"]          = merged.get("bonus_prev")
-    output["prev_ict_index"]      = merged.get("ict_index_prev")
-    output["prev_clean_sheets"]   = merged.get("clean_sheets_prev")
-    output["prev_cards_per_90"]   = merged.get("cards_per_90_prev")
-    output["prev_points_per_90"]  = merged.get("points_per_90_prev")
-    output["prev_season_played"]  = merged["minutes_prev"].notna()
-    
-    # Current season features
-    # TODO: Find out how to get matches for gw and player to tell if it is a double gw.
-    # At the moment just assumes it is a single gameweek.
-    output["matches"] = 1
-    output["current_total_points"]   = merged["total_points"]
-    output["current_goals_scored"]   = merged["goals_scored"]
-    output["current_assists"]        = merged["assists"]
-    output["current_minutes"]        = merged["minutes"]
-    output["current_goals_conceded"] = merged["goals_conceded"]
-    output["current_creativity"]     = merged["creativity"]
-    output["current_influence"]      = merged["influence"]
-    output["current_threat"]         = merged["threat"]
-    output["current_bonus"]          = merged["bonus"]
-    output["current_ict_index"]      = merged["ict_index"]
-    output["current_clean_sheets"]   = merged["clean_sheets"]
-    
-    output["current_cards_per_90"] = merged.apply(
-        lambda row: calc_cards_per_90(
-            row.get("yellow_cards", 0) + row.get("red_cards", 0),
-            row.get("minutes", 0)
-        ),
-        axis=1
-    )
-    
-    output["current_points_per_90"] = merged.apply(
-        lambda row: calc_pts_per_90(
-            row.get("total_points"),
-            row.get("minutes", 0)
-        ),
-        axis=1
-    )
-    
-    prev_cols = [col for col in output.columns if col.startswith("prev_")]
-    for col in prev_cols:
-        if pd.api.types.is_numeric_dtype(output[col]):
-            output[col] = output[col].fillna(output[col].mean())
-    
-    output = output.round(2)  
-    
-    return output
-    
-def save_model_ready_api_data(gw, year="2025-26", prev_year="2024-25"):
-    """Generate and save model-ready API data for a given gameweek.
+def build_model_ready_data(store, year, calendar=None, form=False, lags=False, fill_values=None):
+    """Return the latest feature row per player in the model-ready format.
 
-    Pulls the latest FPL API data, processes it into the model-ready
-    format (with current and previous season features), and saves
-    it to `data/pre-predictions/processed_data`.
+    Missing previous season values are filled with `fill_values`, normally
+    the imputation values saved in the model's feature spec. Without them,
+    the training means of the store's historical seasons are used; if the
+    store has none, the values are left as NaN for the feature spec to fill
+    at prediction time. They are never filled from the live batch itself.
 
     Args:
-        gw (int): Gameweek number.
-        year (str, optional): Current season (default "2025-26").
-        prev_year (str, optional): Previous season (default "2024-25").
+        store (FeatureStore): Store holding the season.
+        year (str): Current season (e.g., "2025-26").
+        calendar (FixtureCalendar, optional): The season's fixtures. If
+            given, next-fixture features are added to the output.
+        form (bool): Add last-N-gameweek form features to the output.
+        lags (bool): Add multi-season lag features to the output.
+        fill_values (pd.Series, optional): Imputation values for the
+            `prev_` columns, e.g. `FeatureSpec.prev_fill_values()`.
+
+    Returns:
+        tuple: (model_ready_df, fill_values) where `fill_values` is the
+        pd.Series of imputation values used, or None if missing values
+        were left as NaN.
     """
-    df = pull_api_data()
-    output_df = process_api_data(df, year, prev_year, gw)
-    
+    if fill_values is None and store.historical_seasons():
+        fill_values = store.imputation_values()
+    elif fill_values is None:
+        print("No imputation values, leaving missing previous season values to the feature spec.")
+    return store.read_latest(year, fill_values, calendar, form, lags), fill_values
+
+def save_model_ready_csv(df, gw, year):
+    """Save model-ready rows to `data/pre-predictions/processed_data` and return the path."""
     base_dir = "data/pre-predictions/processed_data"
     os.makedirs(base_dir, exist_ok=True)
     filename = f"{gw}_{year}_model_ready.csv"
     file_path = os.path.join(base_dir, filename)
-    output_df.to_csv(file_path, index=False)
+    df.to_csv(file_path, index=False)
     print(f"Saved model-ready data for GW{gw} {year} to {file_path}")
+    return file_path
+
+def write_model_ready_data(store, gw, year, calendar=None, form=False, lags=False, fill_values=None):
+    """Save the latest feature row per player to `data/pre-predictions/processed_data`.
+
+    See `build_model_ready_data` for how the rows are built.
+
+    Args:
+        store (FeatureStore): Store holding the season.
+        gw (int): Gameweek number.
+        year (str): Current season (e.g., "2025-26").
+        calendar (FixtureCalendar, optional): The season's fixtures.
+        form (bool): Add last-N-gameweek form features to the output.
+        lags (bool): Add multi-season lag features to the output.
+        fill_values (pd.Series, optional): Imputation values for the
+            `prev_` columns.
+
+    Returns:
+        pd.Series: The imputation values used, or None.
+    """
+    output_df, fill_values = build_model_ready_data(store, year, calendar, form, lags, fill_values)
+    save_model_ready_csv(output_df, gw, year)
+    return fill_values
+
+def save_model_ready_api_data(gw, year="2025-26", prev_year="2024-25", fixtures=False, form=False,
+                              lags=False, fill_values=None):
+    """Generate and save model-ready API data for a given gameweek.
+
+    Pulls the latest FPL API data and fixture counts, stores the gameweek's
+    features in the feature store, and saves the latest row per player in
+    the model-ready format with `write_model_ready_data`. The live state is
+    saved too, so later gameweeks can be applied incrementally with
+    `incremental_update.update_model_ready_api_data`.
+
+    Args:
+        gw (int): Gameweek number.
+        year (str, optional): Current season (default "2025-26").
+        prev_year (str, optional): Previous season (default "2024-25").
+        fixtures (bool, optional): Add next-fixture features from the
+            season's fixture calendar, for models trained with them.
+        form (bool, optional): Add last-N-gameweek form features from the
+            gameweeks stored for the season, for models trained with them.
+        lags (bool, optional): Add multi-season lag features from the
+            previous seasons' files, for models trained with them.
+        fill_values (pd.Series, optional): Imputation values for the
+            `prev_` columns, normally the model's
+            `FeatureSpec.prev_fill_values()` (see `build_model_ready_data`).
+
+    Returns:
+        pd.DataFrame: The model-ready rows that were saved, so callers can
+        score them without reading the file back.
+    """
+    df = pull_api_data()
+    calendar = None
+    if fixtures:
+        calendar = FixtureCalendar.from_api(pull_fixtures())
+        df["matches"] = calendar.count[calendar.team_index(df["team"]), gw]
+    else:
+        df["matches"] = df["team"].map(pull_fixture_counts(gw)).fillna(0).astype(int)
+
+    state = LiveFeatureState.build(df, year, prev_year, gw)
+    state.feature_flags = {"fixtures": fixtures, "form": form, "lags": lags}
+    store = FeatureStore()
+    store.append_features(state.features.reset_index(drop=True), year, gw, overwrite=True)
+    output_df, _ = build_model_ready_data(store, year, calendar, form, lags, fill_values)
+    save_model_ready_csv(output_df, gw, year)
+    state.save(live_state_path(year, store.root))
+    return output_df
 
-save_model_ready_api_data(1)
+if __name__ == "__main__":
+    save_model_ready_api_data(1)
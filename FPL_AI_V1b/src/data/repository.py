@@ -0,0 +1,126 @@
+import os
+from collections import OrderedDict
+import pandas as pd
+
+SEASON_DATA_DIR = "data/prev_years"
+PREDICTIONS_DIR = "outputs/predictions"
+MAX_ENTRIES = 32
+
+# With Copy-on-Write (the default from pandas 3) a shallow copy can be
+# handed out safely: any write through it copies the data first.
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or bool(pd.get_option("mode.copy_on_write"))
+
+
+class DataRepository:
+    """
+    Bounded LRU cache of parsed CSV files.
+
+    Each file is parsed once and served from memory until it changes on
+    disk: entries are keyed by path and read options and validated against
+    the file's modification time and size on every lookup. Callers get
+    views of the cached frames, so changes they make never reach the cache.
+
+    Hit, miss, invalidation and eviction counts are kept in `self.stats`.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        """
+        Args:
+            max_entries (int): Number of frames kept before the least
+                recently used one is evicted.
+        """
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def read_csv(self, path: str, **kwargs) -> pd.DataFrame:
+        """
+        Read a CSV file through the cache.
+
+        Args:
+            path (str): Path of the CSV file.
+            **kwargs: Passed to `pd.read_csv`. Must be hashable.
+
+        Returns:
+            pd.DataFrame: A view of the cached frame.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = (os.path.abspath(path), tuple(sorted(kwargs.items())))
+
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == signature:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._view(entry[1])
+
+        if entry is not None:
+            self.stats["invalidations"] += 1
+        self.stats["misses"] += 1
+        df = pd.read_csv(path, **kwargs)
+        self._cache[key] = (signature, df)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self.stats["evictions"] += 1
+        return self._view(df)
+
+    @staticmethod
+    def _view(df: pd.DataFrame) -> pd.DataFrame:
+        return df.copy(deep=not COPY_ON_WRITE)
+
+    def clear(self) -> None:
+        """Drop every cached frame and reset the counters."""
+        self._cache.clear()
+        self.stats = dict.fromkeys(self.stats, 0)
+
+    def hit_rate(self) -> float:
+        """Return the fraction of lookups served from the cache."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+
+_repository = DataRepository()
+
+
+def get_repository() -> DataRepository:
+    """Return the process-wide repository shared by every loader."""
+    return _repository
+
+
+def read_season_data(season: str, data_dir: str = SEASON_DATA_DIR) -> pd.DataFrame:
+    """
+    Load a season's final player stats, e.g. `data/prev_years/2024-25_season_data.csv`.
+
+    Args:
+        season (str): The season string (e.g., "2024-25").
+        data_dir (str): Directory containing `{season}_season_data.csv` files.
+
+    Returns:
+        pd.DataFrame: The season's player data.
+    """
+    return _repository.read_csv(os.path.join(data_dir, f"{season}_season_data.csv"))
+
+
+def read_predictions(gw: int, year: str, predictions_dir: str = PREDICTIONS_DIR) -> pd.DataFrame:
+    """
+    Load the stored predictions for a gameweek.
+
+    Args:
+        gw (int): The gameweek number.
+        year (str): The season string (e.g., "2025-26").
+        predictions_dir (str): Directory containing the predictions files.
+
+    Returns:
+        pd.DataFrame: The predictions DataFrame.
+
+    Raises:
+        FileNotFoundError: If the predictions file does not exist.
+    """
+    file_path = os.path.join(predictions_dir, f"{gw}_{year}_v1b_predictions.csv")
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Predictions file not found: {file_path}")
+    return _repository.read_csv(file_path)
@@ -0,0 +1,96 @@
+import time
+import numpy as np
+import pandas as pd
+
+FORM_WINDOWS = (3, 5)
+# Expected goals and assists are only stored for seasons that have them
+# (see `feature_store.EXPECTED_STATS`).
+FORM_STATS = ["total_points", "minutes", "ict_index", "goals_scored", "assists",
+              "expected_goals", "expected_assists"]
+FORM_COLUMNS = [f"form_{n}_{stat}" for n in FORM_WINDOWS for stat in FORM_STATS]
+
+
+def rolling_form(features: pd.DataFrame, windows=FORM_WINDOWS, gameweeks=None) -> pd.DataFrame:
+    """
+    Compute each player's stats over their last `n` gameweeks.
+
+    The feature rows of a season already hold season-to-date totals
+    (`current_*`) per (player, gameweek), so the total over gameweeks
+    `gw - n + 1` to `gw` is the difference between the totals at `gw` and
+    at `gw - n`. The earlier totals are found for every row at once with
+    one `merge_asof` per window, grouped by player code; if the player has
+    no row at `gw - n` the latest earlier row is used, and before their
+    first row the total is 0.
+
+    That is only right when every gameweek of the season is stored, as in
+    the historical seasons. A live partition only holds the gameweeks that
+    were fetched, so given the `gameweeks` whose totals are known, a window
+    whose start gameweek `gw - n` is not among them is NaN rather than
+    silently covering more gameweeks than in training.
+
+    Args:
+        features (pd.DataFrame): Feature rows of one season with "code",
+            "gw" and `current_` totals, e.g. a `FeatureStore` partition.
+        windows (tuple of int): Window lengths in gameweeks.
+        gameweeks (array-like, optional): Gameweeks whose totals are
+            stored, e.g. the fetched gameweeks of a live season. Defaults
+            to every gameweek, as in a historical season.
+
+    Returns:
+        pd.DataFrame: `form_{n}_{stat}` columns for each window and each
+        of `FORM_STATS`, aligned with `features`. Stats without stored
+        totals (expected goals and assists before 2022-23) are NaN, as are
+        windows starting at a gameweek not in `gameweeks`.
+    """
+    stats = [stat for stat in FORM_STATS if f"current_{stat}" in features]
+    totals = pd.DataFrame({"code": features["code"].to_numpy(), "gw": features["gw"].to_numpy()})
+    for stat in stats:
+        totals[stat] = features[f"current_{stat}"].to_numpy()
+    totals["row"] = np.arange(len(totals))
+    totals = totals.sort_values("gw", kind="stable")
+
+    gws = features["gw"].to_numpy()
+    form = {}
+    for n in windows:
+        # Rows whose window starts at a gameweek with known totals; before
+        # the season starts every total is 0.
+        known = np.ones(len(gws), dtype=bool) if gameweeks is None else (gws - n <= 0) | np.isin(gws - n, gameweeks)
+        lagged = pd.merge_asof(
+            totals[["code", "gw", "row"]].assign(gw=totals["gw"] - n),
+            totals.drop(columns="row"), on="gw", by="code",
+        ).sort_values("row")
+        for stat in FORM_STATS:
+            if stat not in stats:
+                form[f"form_{n}_{stat}"] = np.full(len(totals), np.nan)
+                continue
+            current = features[f"current_{stat}"].to_numpy()
+            form[f"form_{n}_{stat}"] = np.where(known, current - lagged[stat].fillna(0).to_numpy(), np.nan)
+    return pd.DataFrame(form, index=features.index).round(2)
+
+
+def add_rolling_form(features: pd.DataFrame, windows=FORM_WINDOWS, gameweeks=None) -> pd.DataFrame:
+    """
+    Return a copy of a season's feature rows with rolling form appended.
+
+    Prints how long the pass took, so the build-time cost stays visible.
+
+    Args:
+        features (pd.DataFrame): Feature rows of one season (see `rolling_form`).
+        windows (tuple of int): Window lengths in gameweeks.
+        gameweeks (array-like, optional): Gameweeks whose totals are stored.
+
+    Returns:
+        pd.DataFrame
+    """
+    start = time.time()
+    form = rolling_form(features, windows, gameweeks)
+    print(f"Computed rolling form for {len(features)} rows in {time.time() - start:.2f} seconds")
+    return pd.concat([features, form], axis=1)
+
+
+if __name__ == "__main__":
+    from src.data.feature_store import FeatureStore
+
+    store = FeatureStore()
+    season = store.materialize_season("2024-25", "2023-24")
+    print(add_rolling_form(season).filter(like="form_").describe().T)
@@ -0,0 +1,276 @@
+import os
+import re
+import sqlite3
+import time
+import pandas as pd
+
+WAREHOUSE_PATH = "outputs/predictions.sqlite"
+PREDICTIONS_DIR = "outputs/predictions"
+PREDICTIONS_PATTERN = re.compile(r"^(\d+)_(\d{4}-\d{2})_v1b_predictions\.csv$")
+# Version recorded for predictions imported from CSVs whose model is unknown.
+UNKNOWN_VERSION = "unknown"
+
+PLAYER_COLUMNS = ["code", "first_name", "second_name", "element_type", "team", "now_cost"]
+PREDICTION_COLUMNS = ["total_points_predictions", "total_points_p10", "total_points_p50",
+                      "total_points_p90", "total_points_std"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    season TEXT NOT NULL,
+    gw INTEGER NOT NULL,
+    model_version TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (season, gw, model_version)
+);
+-- The most recently saved run of every gameweek, which queries read by default.
+CREATE TABLE IF NOT EXISTS latest (
+    season TEXT NOT NULL,
+    gw INTEGER NOT NULL,
+    model_version TEXT NOT NULL,
+    PRIMARY KEY (season, gw)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS predictions (
+    season TEXT NOT NULL,
+    gw INTEGER NOT NULL,
+    model_version TEXT NOT NULL,
+    code INTEGER NOT NULL,
+    first_name TEXT,
+    second_name TEXT,
+    element_type INTEGER,
+    team INTEGER,
+    now_cost REAL,
+    total_points_predictions REAL NOT NULL,
+    total_points_p10 REAL,
+    total_points_p50 REAL,
+    total_points_p90 REAL,
+    total_points_std REAL,
+    PRIMARY KEY (season, gw, model_version, code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS predictions_player ON predictions (code, season, gw);
+CREATE INDEX IF NOT EXISTS predictions_leaderboard
+    ON predictions (season, gw, model_version, element_type, total_points_predictions DESC);
+"""
+
+
+class PredictionWarehouse:
+    """
+    Every stored prediction in one SQLite file, keyed by (season, gameweek,
+    model version, player code).
+
+    Each `save_predictions` call adds one run. Queries read the latest run
+    of each gameweek unless a model version is given. Two indexes answer the
+    common questions without scanning the table:
+
+        - (code, season, gw) for a player's history across gameweeks.
+        - (season, gw, model_version, element_type, prediction) for
+          positional leaderboards, already in ranked order.
+    """
+
+    def __init__(self, path: str = WAREHOUSE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def insert(self, df: pd.DataFrame, season: str, gw: int, model_version: str) -> int:
+        """
+        Bulk insert one gameweek's predictions, replacing an earlier run of
+        the same model version.
+
+        Args:
+            df (pd.DataFrame): Predictions in the `add_predictions` format.
+            season (str): The season (e.g. "2025-26").
+            gw (int): The gameweek number.
+            model_version (str): Version of the model that made them.
+
+        Returns:
+            int: Number of rows inserted.
+        """
+        rows = pd.DataFrame({"season": season, "gw": gw, "model_version": model_version}, index=df.index)
+        for col in PLAYER_COLUMNS + PREDICTION_COLUMNS:
+            rows[col] = df[col] if col in df else None
+        records = rows.astype(object).where(rows.notna(), None).itertuples(index=False, name=None)
+
+        columns = ", ".join(rows.columns)
+        placeholders = ", ".join("?" * len(rows.columns))
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM predictions WHERE season = ? AND gw = ? AND model_version = ?",
+                (season, int(gw), model_version),
+            )
+            self.connection.executemany(f"INSERT INTO predictions ({columns}) VALUES ({placeholders})", records)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO runs (season, gw, model_version, created_at) VALUES (?, ?, ?, ?)",
+                (season, int(gw), model_version, time.strftime("%Y-%m-%dT%H:%M:%S")),
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO latest (season, gw, model_version) VALUES (?, ?, ?)",
+                (season, int(gw), model_version),
+            )
+        return len(rows)
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        # Building the frame from the cursor avoids most of the fixed
+        # overhead of `pd.read_sql_query` on small results.
+        cursor = self.connection.execute(sql, params)
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=[col[0] for col in cursor.description])
+
+    def runs(self) -> pd.DataFrame:
+        """Return every stored run, oldest first."""
+        return self._query("SELECT * FROM runs ORDER BY run_id")
+
+    def find_player(self, name: str) -> pd.DataFrame:
+        """Return the codes and names of players whose name contains `name`."""
+        pattern = f"%{name}%"
+        return self._query(
+            "SELECT DISTINCT code, first_name, second_name, element_type FROM predictions "
+            "WHERE first_name || ' ' || second_name LIKE ? ORDER BY second_name",
+            (pattern,),
+        )
+
+    def player_history(self, code: int, season: str = None, model_version: str = None) -> pd.DataFrame:
+        """
+        Return a player's predictions across gameweeks.
+
+        Args:
+            code (int): The player code.
+            season (str, optional): Only this season.
+            model_version (str, optional): Only this model. Defaults to the
+                latest run of each gameweek.
+
+        Returns:
+            pd.DataFrame: "season", "gw", "model_version" and the
+            prediction columns, in chronological order.
+        """
+        sql = (
+            f"SELECT p.season, p.gw, p.model_version, {', '.join('p.' + c for c in PREDICTION_COLUMNS)} "
+            "FROM predictions p "
+        )
+        params = [int(code)]
+        if model_version is None:
+            sql += "JOIN latest l USING (season, gw, model_version) WHERE p.code = ?"
+        else:
+            sql += "WHERE p.code = ? AND p.model_version = ?"
+            params.append(model_version)
+        if season is not None:
+            sql += " AND p.season = ?"
+            params.append(season)
+        return self._query(sql + " ORDER BY p.season, p.gw", params)
+
+    def _version(self, season: str, gw: int, model_version: str = None) -> str:
+        if model_version is not None:
+            return model_version
+        row = self.connection.execute(
+            "SELECT model_version FROM latest WHERE season = ? AND gw = ?", (season, int(gw))
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No predictions stored for GW{gw} {season}")
+        return row[0]
+
+    def leaderboard(self, season: str, gw: int, element_type: int = None, n: int = 10,
+                    model_version: str = None) -> pd.DataFrame:
+        """
+        Return the top `n` predictions of a gameweek, overall or for one position.
+
+        Args:
+            season (str): The season (e.g. "2025-26").
+            gw (int): The gameweek number.
+            element_type (int, optional): Position (0 = GK ... 3 = FWD).
+            n (int): Number of players.
+            model_version (str, optional): Defaults to the latest run.
+
+        Returns:
+            pd.DataFrame: Player columns and predictions, highest first.
+        """
+        sql = (f"SELECT {', '.join(PLAYER_COLUMNS + PREDICTION_COLUMNS)} FROM predictions "
+               "WHERE season = ? AND gw = ? AND model_version = ?")
+        params = [season, int(gw), self._version(season, gw, model_version)]
+        if element_type is not None:
+            sql += " AND element_type = ?"
+            params.append(int(element_type))
+        sql += " ORDER BY total_points_predictions DESC LIMIT ?"
+        return self._query(sql, params + [n])
+
+    def gameweek_diff(self, season: str, gw_from: int, gw_to: int, n: int = None,
+                      model_version: str = None) -> pd.DataFrame:
+        """
+        Compare every player's prediction between two gameweeks.
+
+        Args:
+            season (str): The season (e.g. "2025-26").
+            gw_from (int): The earlier gameweek.
+            gw_to (int): The later gameweek.
+            n (int, optional): Only the `n` largest absolute changes.
+            model_version (str, optional): Compare this model's runs.
+                Defaults to the latest run of each gameweek.
+
+        Returns:
+            pd.DataFrame: "code", names, "element_type", "before", "after"
+            and "change", largest absolute change first. Players in only
+            one of the gameweeks are left out.
+        """
+        sql = (
+            "SELECT b.code, b.first_name, b.second_name, b.element_type, "
+            "a.total_points_predictions AS before, b.total_points_predictions AS after, "
+            "ROUND(b.total_points_predictions - a.total_points_predictions, 2) AS change "
+            "FROM predictions a JOIN predictions b ON a.code = b.code "
+            "WHERE a.season = ? AND a.gw = ? AND a.model_version = ? "
+            "AND b.season = ? AND b.gw = ? AND b.model_version = ? "
+            "ORDER BY ABS(change) DESC"
+        )
+        params = [season, int(gw_from), self._version(season, gw_from, model_version),
+                  season, int(gw_to), self._version(season, gw_to, model_version)]
+        if n is not None:
+            sql += " LIMIT ?"
+            params.append(n)
+        return self._query(sql, params)
+
+
+def store_predictions(df: pd.DataFrame, output_path: str, model_version: str,
+                      warehouse_path: str = WAREHOUSE_PATH) -> None:
+    """
+    Add a predictions file's rows to the warehouse.
+
+    The season and gameweek are read from the `{gw}_{year}_v1b_predictions.csv`
+    file name; other file names are skipped.
+    """
+    match = PREDICTIONS_PATTERN.match(os.path.basename(output_path))
+    if match is None:
+        return
+    warehouse = PredictionWarehouse(warehouse_path)
+    try:
+        warehouse.insert(df, match.group(2), int(match.group(1)), model_version)
+    finally:
+        warehouse.close()
+
+
+def import_predictions_dir(predictions_dir: str = PREDICTIONS_DIR,
+                           warehouse_path: str = WAREHOUSE_PATH) -> PredictionWarehouse:
+    """
+    Load every stored predictions CSV into the warehouse.
+
+    Files written before the warehouse existed have no model version, so
+    they are recorded as `UNKNOWN_VERSION`.
+
+    Returns:
+        PredictionWarehouse: The filled warehouse.
+    """
+    warehouse = PredictionWarehouse(warehouse_path)
+    for file in sorted(os.listdir(predictions_dir)):
+        match = PREDICTIONS_PATTERN.match(file)
+        if match is not None:
+            df = pd.read_csv(os.path.join(predictions_dir, file))
+            warehouse.insert(df, match.group(2), int(match.group(1)), UNKNOWN_VERSION)
+    return warehouse
+
+
+if __name__ == "__main__":
+    warehouse = import_predictions_dir()
+    print(warehouse.runs())
+    salah = warehouse.find_player("Salah")["code"].iloc[0]
+    print(warehouse.player_history(salah))
@@ -0,0 +1,154 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.data.feature_store import (
+    FEATURE_COLUMNS, META_COLUMNS, STORE_DIR, TARGET_COLUMN, FeatureStore, impute_prev_features
+)
+from src.data.predownload_seasons import SEASONS
+from src.model.make_predictions import prepare_features
+from src.model.train_random_forest import build_model
+
+OUTPUT_DIR = "outputs/backtest"
+
+
+def _materialize(season: str, prev_season: str, store_dir: str) -> None:
+    FeatureStore(store_dir).materialize_season(season, prev_season)
+
+
+def build_backtest_features(seasons, n_jobs: int = -1, store_dir: str = STORE_DIR) -> FeatureStore:
+    """
+    Materialize the feature rows the live pipeline would have produced
+    after every gameweek of past seasons.
+
+    Features come from the shared feature store, so each row is exactly
+    what `compute_features` gives the live pipeline. Seasons not yet in the
+    store are built in parallel, one worker per season, with all gameweeks
+    of a season computed in one vectorized pass. Stored seasons are reused.
+
+    Args:
+        seasons (list of str): Seasons to replay, plus the seasons their
+            models train on; each must have a preceding season in `SEASONS`.
+        n_jobs (int): Number of parallel workers.
+        store_dir (str): Feature store directory.
+
+    Returns:
+        FeatureStore: The store holding every requested season.
+    """
+    store = FeatureStore(store_dir)
+    missing = [season for season in seasons if not store.has(season)]
+    Parallel(n_jobs=n_jobs)(
+        delayed(_materialize)(season, SEASONS[SEASONS.index(season) - 1], store_dir)
+        for season in missing
+    )
+    return FeatureStore(store_dir)
+
+
+def backtest_season(store: FeatureStore, season: str, train_seasons, **model_overrides) -> pd.DataFrame:
+    """
+    Score a replayed season with a model trained only on earlier seasons.
+
+    Missing previous season values are imputed with the training seasons'
+    means, as in the live pipeline.
+
+    Args:
+        store (FeatureStore): Store holding `season` and `train_seasons`.
+        season (str): The season to score.
+        train_seasons (list of str): Seasons used for training.
+        **model_overrides: Hyperparameters to change from `MODEL_PARAMS`.
+
+    Returns:
+        pd.DataFrame: The features' metadata with `total_points_predictions`,
+        `final_total_points` and `error` (prediction minus actual).
+    """
+    fill_values = store.imputation_values(train_seasons)
+    train_df = store.read_training(train_seasons, fill_values)
+    model = build_model(**model_overrides)
+    model.fit(train_df.drop(columns=["total_points"]), train_df["total_points"])
+
+    features = impute_prev_features(store.read(season).reset_index(drop=True), fill_values)
+    X, meta_df = prepare_features(features[META_COLUMNS + FEATURE_COLUMNS[2:]])
+    results = meta_df.copy()
+    results["element_type"] = X["element_type"]
+    results["gw"] = X["gw"]
+    results["total_points_predictions"] = model.predict(X)
+    results["final_total_points"] = features[TARGET_COLUMN]
+    results["error"] = results["total_points_predictions"] - results["final_total_points"]
+    return results
+
+
+def summarise_errors(results: pd.DataFrame, by) -> pd.DataFrame:
+    """Return MAE, RMSE, bias and row count of the backtest errors grouped by `by`."""
+    grouped = results.groupby(by)["error"]
+    return pd.DataFrame({
+        "mae": grouped.apply(lambda e: e.abs().mean()),
+        "rmse": grouped.apply(lambda e: np.sqrt((e ** 2).mean())),
+        "bias": grouped.mean(),
+        "n": grouped.size(),
+    }).round(2).reset_index()
+
+
+def run_backtest(seasons=None, n_jobs: int = -1, output_dir: str = OUTPUT_DIR, **model_overrides) -> dict:
+    """
+    Replay past seasons gameweek by gameweek and measure prediction error.
+
+    For every season with earlier training data, the features the live
+    pipeline would have produced after each gameweek are read from the
+    feature store (built in parallel if needed), scored with a model trained only on earlier
+    seasons, and compared with each player's final season total. Seasons
+    are trained and scored in parallel.
+
+    Args:
+        seasons (list of str, optional): Seasons to replay. Defaults to
+            every season in `SEASONS` that has earlier training data.
+        n_jobs (int): Number of parallel workers for feature building.
+        output_dir (str): Directory to save the backtest reports.
+        **model_overrides: Hyperparameters to change from `MODEL_PARAMS`,
+            e.g. a smaller `n_estimators` for quick runs.
+
+    Returns:
+        dict: With keys "predictions" (one row per player per gameweek),
+        "by_gameweek" and "by_position" error summaries.
+    """
+    # The first season has no previous season data, so it has no features.
+    available = SEASONS[1:]
+    if seasons is None:
+        seasons = available[1:]
+
+    start = time.time()
+    train_seasons = {season: [s for s in available if SEASONS.index(s) < SEASONS.index(season)] for season in seasons}
+    store = build_backtest_features(sorted(set(seasons).union(*train_seasons.values())), n_jobs)
+    print(f"Built features for {len(seasons)} seasons in {time.time() - start:.1f} seconds")
+
+    # Seasons are scored in parallel, so each forest is fitted on one core.
+    model_overrides.setdefault("n_jobs", 1)
+    start = time.time()
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(backtest_season)(store, season, train_seasons[season], **model_overrides)
+        for season in seasons
+    )
+    for season, season_results in zip(seasons, results):
+        season_results["year"] = season
+    print(f"Trained and scored {len(seasons)} seasons in {time.time() - start:.1f} seconds")
+
+    predictions = pd.concat(results, ignore_index=True)
+    report = {
+        "predictions": predictions,
+        "by_gameweek": summarise_errors(predictions, ["year", "gw"]),
+        "by_position": summarise_errors(predictions, ["year", "element_type"]),
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, df in report.items():
+        df.to_csv(os.path.join(output_dir, f"backtest_{name}.csv"), index=False)
+    print(f"Saved backtest reports to {output_dir}")
+    return report
+
+
+if __name__ == "__main__":
+    start = time.time()
+    report = run_backtest()
+    print(report["by_position"])
+    print("Done in", time.time() - start, "seconds")
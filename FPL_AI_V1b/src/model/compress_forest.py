@@ -0,0 +1,225 @@
+import copy
+import io
+import os
+import time
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.metrics import mean_squared_error
+
+from src.model.make_predictions import per_tree_predictions
+from src.model.train_random_forest import MODEL_PATH, build_model
+
+COMPRESSED_DIR = "models/compressed"
+# Allowed relative increase in validation MSE over the full forest.
+TOLERANCE = 0.01
+DEPTH_CAPS = (12, 16, 20)
+# Distilled student: a small, shallow forest fitted to the teacher's predictions.
+STUDENT_PARAMS = {"n_estimators": 50, "max_depth": 14, "max_features": None}
+# A gameweek scores roughly this many players.
+LATENCY_ROWS = 800
+
+
+def order_trees(model, X_val, y_val, tolerance: float = TOLERANCE) -> tuple:
+    """
+    Select the smallest ordered subset of trees that matches the full forest.
+
+    Trees are added greedily, each time picking the tree whose addition
+    gives the lowest validation MSE of the running average (ordered
+    aggregation). Selection stops as soon as the subset's MSE is within
+    `tolerance` of the full forest's, since a well-ordered prefix usually
+    reaches that after a small fraction of the trees.
+
+    Args:
+        model: A fitted `RandomForestRegressor`.
+        X_val (pd.DataFrame): Validation features.
+        y_val (array-like): Validation targets.
+        tolerance (float): Allowed relative increase in MSE.
+
+    Returns:
+        tuple: (indices, full_mse) where `indices` are the selected trees in
+        the order they were added.
+    """
+    # Trees x rows, so each candidate tree's predictions are contiguous.
+    preds = np.ascontiguousarray(per_tree_predictions(model, X_val).T)
+    y_val = np.asarray(y_val, dtype=float)
+    full_mse = np.mean((preds.mean(axis=0) - y_val) ** 2)
+    target = full_mse * (1 + tolerance)
+
+    remaining = np.ones(len(preds), dtype=bool)
+    total = np.zeros(preds.shape[1])
+    indices = []
+    while remaining.any():
+        candidates = np.flatnonzero(remaining)
+        mses = (((total + preds[candidates]) / (len(indices) + 1) - y_val) ** 2).mean(axis=1)
+        best = candidates[np.argmin(mses)]
+        indices.append(best)
+        remaining[best] = False
+        total += preds[best]
+        if mses.min() <= target:
+            break
+    return indices, full_mse
+
+
+def select_trees(model, indices):
+    """Return a copy of a fitted forest that keeps only the trees in `indices`."""
+    pruned = copy.copy(model)
+    pruned.estimators_ = [model.estimators_[i] for i in indices]
+    pruned.n_estimators = len(indices)
+    return pruned
+
+
+def distill(teacher, X_train, **student_overrides):
+    """
+    Fit a compact student forest to a teacher model's predictions.
+
+    The teacher's predictions are smoother than the raw points targets, so
+    a much smaller model can reproduce them.
+
+    Args:
+        teacher: The fitted full forest.
+        X_train (pd.DataFrame): Features the teacher was trained on.
+        **student_overrides: Hyperparameters to change from `STUDENT_PARAMS`.
+
+    Returns:
+        RandomForestRegressor: The fitted student.
+    """
+    student = build_model(**{**STUDENT_PARAMS, **student_overrides})
+    student.fit(X_train, teacher.predict(X_train))
+    return student
+
+
+def measure(model, X_val, y_val, latency_rows: int = LATENCY_ROWS) -> dict:
+    """
+    Measure the size, load time, scoring latency and accuracy of a model.
+
+    Returns:
+        dict: "size_mb" (pickled), "load_s", "predict_ms" (median time to
+        score `latency_rows` rows), "mse" and "n_trees".
+    """
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    size_mb = buffer.tell() / 1024 ** 2
+
+    buffer.seek(0)
+    start = time.perf_counter()
+    joblib.load(buffer)
+    load_s = time.perf_counter() - start
+
+    batch = X_val[:latency_rows]
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        model.predict(batch)
+        timings.append(1000 * (time.perf_counter() - start))
+
+    return {
+        "n_trees": len(model.estimators_),
+        "size_mb": size_mb,
+        "load_s": load_s,
+        "predict_ms": sorted(timings)[1],
+        "mse": mean_squared_error(y_val, model.predict(X_val)),
+    }
+
+
+def compress_forest(model, X_train, y_train, X_val, y_val, final_model=None, X_full=None, y_full=None,
+                    tolerance: float = TOLERANCE, depth_caps=DEPTH_CAPS,
+                    output_dir: str = COMPRESSED_DIR) -> pd.DataFrame:
+    """
+    Build smaller candidates of a fitted forest and compare them.
+
+    Candidates are:
+      - "full": the forest as trained.
+      - "ordered": the smallest greedily ordered subset of trees within
+        `tolerance` of the full forest's validation MSE.
+      - "depth_{d}": a forest with as many trees as "ordered", retrained
+        with `max_depth=d` (fitted trees cannot be truncated in place).
+      - "distilled": a small student forest fitted to the full forest's
+        predictions (see `distill`).
+
+    Candidates are built from the split-trained `model` for measurement.
+    The first half of the validation rows selects the trees and the second
+    half scores every candidate, so "ordered" is not measured on the rows
+    it was chosen with.
+
+    With `final_model` (the same forest fitted on all of `X_full`,
+    `y_full`), the depth-capped forests are refitted on all rows and the
+    student is distilled from `final_model` before they are saved, so a
+    deployed candidate is not trained on less data than the model it
+    replaces. "ordered" needs held-out rows to choose its trees, so it is
+    always saved from the split model; the report's "trained_on" column
+    says which data each saved candidate was fitted on.
+
+    Every candidate is saved to `{output_dir}/{name}.pkl` and the
+    trade-off table to `{output_dir}/compression_report.csv`, so the deploy
+    artifact can be copied to `MODEL_PATH`.
+
+    Args:
+        model: The fitted full forest.
+        X_train, y_train: The data `model` was trained on.
+        X_val, y_val: Held-out data used for selection and evaluation.
+        final_model (optional): The forest refitted on all data.
+        X_full, y_full (optional): All training data, for `final_model`.
+        tolerance (float): Allowed relative increase in validation MSE.
+        depth_caps (tuple of int): Depth caps to try.
+        output_dir (str): Directory for candidates and the report.
+
+    Returns:
+        pd.DataFrame: One row per candidate with "n_trees", "size_mb",
+        "load_s", "predict_ms", "mse", "mse_increase" (relative to "full"),
+        all measured on the split, and "trained_on" ("all" or "split").
+    """
+    half = len(X_val) // 2
+    X_select, y_select = X_val[:half], y_val[:half]
+    X_val, y_val = X_val[half:], y_val[half:]
+
+    print("Ordering trees...")
+    indices, _ = order_trees(model, X_select, y_select, tolerance)
+    candidates = {"full": model, "ordered": select_trees(model, indices)}
+    print(f"Kept {len(indices)} of {len(model.estimators_)} trees")
+
+    for depth in depth_caps:
+        print(f"Training depth {depth} forest...")
+        candidates[f"depth_{depth}"] = build_model(n_estimators=len(indices), max_depth=depth).fit(X_train, y_train)
+
+    print("Distilling student forest...")
+    candidates["distilled"] = distill(model, X_train)
+
+    rows = [{"model": name, **measure(candidate, X_val, y_val)} for name, candidate in candidates.items()]
+    trained_on = {name: "split" for name in candidates}
+
+    if final_model is not None:
+        # Deploy versions of the recipe candidates, fitted on all rows.
+        for depth in depth_caps:
+            print(f"Refitting depth {depth} forest on all data...")
+            candidates[f"depth_{depth}"] = build_model(n_estimators=len(indices), max_depth=depth).fit(X_full, y_full)
+            trained_on[f"depth_{depth}"] = "all"
+        print("Distilling student forest from the final model...")
+        candidates["distilled"] = distill(final_model, X_full)
+        trained_on["distilled"] = "all"
+        trained_on["full"] = "all"
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, candidate in candidates.items():
+        if name != "full":
+            joblib.dump(candidate, os.path.join(output_dir, f"{name}.pkl"))
+
+    report = pd.DataFrame(rows)
+    report["trained_on"] = report["model"].map(trained_on)
+    report["mse_increase"] = report["mse"] / report.loc[report["model"] == "full", "mse"].iloc[0] - 1
+    report = report.round(4)
+    report.to_csv(os.path.join(output_dir, "compression_report.csv"), index=False)
+    return report
+
+
+if __name__ == "__main__":
+    from sklearn.model_selection import train_test_split
+    from src.model.train_random_forest import load_model_ready_data
+
+    df = load_model_ready_data()
+    X, y = df.drop(columns=["total_points"]), df["total_points"]
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+    full = build_model().fit(X_train, y_train)
+    final = build_model().fit(X, y)
+    print(compress_forest(full, X_train, y_train, X_val, y_val, final, X, y).to_string(index=False))
+    print(f"Copy the chosen candidate from {COMPRESSED_DIR} to {MODEL_PATH} to deploy it.")
@@ -0,0 +1,319 @@
+import os
+import numpy as np
+import pandas as pd
+import joblib
+
+# Centroids kept per quantile sketch; features with at most this many
+# distinct values (positions, gameweeks, match counts) are kept exactly.
+MAX_CENTROIDS = 128
+# Training gameweeks on either side of a live gameweek used as its reference.
+# Season-to-date totals grow every gameweek, so by default only the same
+# gameweek is used.
+REFERENCE_WINDOW = 0
+# Drift thresholds: population stability index, mean shift in training
+# standard deviations, rise in null rate, and share of live values outside
+# the training range.
+PSI_THRESHOLD = 0.25
+SHIFT_THRESHOLD = 1.0
+NULL_RATE_THRESHOLD = 0.1
+RANGE_THRESHOLD = 0.01
+PSI_BINS = 10
+# The reference window already matches the gameweek, so it is not compared.
+IGNORED_FEATURES = ("gw",)
+
+
+class QuantileSketch:
+    """
+    A mergeable summary of a distribution as weighted centroids.
+
+    Values are kept exactly until there are more than `max_size` distinct
+    ones; after that, neighbouring values are merged into `max_size`
+    buckets of roughly equal weight. Two sketches merge by pooling their
+    centroids and compressing again, so summaries of separate batches
+    combine without the raw values.
+    """
+
+    def __init__(self, max_size: int = MAX_CENTROIDS):
+        self.max_size = max_size
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    @property
+    def total(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values) -> "QuantileSketch":
+        """Add non-null values to the sketch."""
+        values = np.asarray(values, dtype=float)
+        values, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        return self._absorb(values, counts.astype(float))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add another sketch's centroids to this one."""
+        return self._absorb(other.values, other.weights)
+
+    def _absorb(self, values: np.ndarray, weights: np.ndarray) -> "QuantileSketch":
+        values, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        weights = np.bincount(inverse, weights=np.concatenate([self.weights, weights]))
+        if len(values) > self.max_size:
+            cumulative = np.cumsum(weights)
+            bucket = ((cumulative - weights / 2) / cumulative[-1] * self.max_size).astype(int)
+            bucket_weights = np.bincount(bucket, weights=weights)
+            keep = bucket_weights > 0
+            values = (np.bincount(bucket, weights=values * weights)[keep] / bucket_weights[keep])
+            weights = bucket_weights[keep]
+        self.values, self.weights = values, weights
+        return self
+
+    def quantile(self, q) -> np.ndarray:
+        """Return approximate quantiles, interpolating between centroids."""
+        if not len(self.values):
+            return np.full(np.shape(q), np.nan)
+        cumulative = np.cumsum(self.weights)
+        return np.interp(np.asarray(q) * cumulative[-1], cumulative - self.weights / 2, self.values)
+
+    def cdf(self, x) -> np.ndarray:
+        """Return the share of the weight at or below each value of `x`."""
+        cumulative = np.concatenate([[0], np.cumsum(self.weights)])
+        return cumulative[np.searchsorted(self.values, x, side="right")] / max(self.total, 1)
+
+    def share_outside(self, low: float, high: float) -> float:
+        """Return the share of the weight below `low` or above `high`."""
+        outside = (self.values < low) | (self.values > high)
+        return float(self.weights[outside].sum() / max(self.total, 1))
+
+
+class FeatureSummary:
+    """
+    Streaming statistics for every numeric column of a feature frame.
+
+    Per column it keeps the row and null counts, mean and sum of squared
+    deviations (merged with Chan's parallel formula), min, max and a
+    `QuantileSketch`. `update` adds a batch of rows and `merge` adds
+    another summary, so summaries can be built per gameweek or per season
+    and combined later without re-reading the data.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.sketches = {}
+
+    def update(self, df: pd.DataFrame) -> "FeatureSummary":
+        """Add a batch of rows."""
+        for col in df.select_dtypes(include=["number", "bool"]).columns:
+            x = df[col].to_numpy(dtype=float)
+            present = x[~np.isnan(x)]
+            batch = {"count": len(present), "nulls": len(x) - len(present), "mean": 0.0, "m2": 0.0,
+                     "min": np.inf, "max": -np.inf}
+            if len(present):
+                batch.update(mean=present.mean(), m2=((present - present.mean()) ** 2).sum(),
+                             min=present.min(), max=present.max())
+            self._merge_column(col, batch, QuantileSketch().update(present))
+        return self
+
+    def merge(self, other: "FeatureSummary") -> "FeatureSummary":
+        """Add the rows summarised by another summary."""
+        for col, stats in other.stats.items():
+            self._merge_column(col, stats, other.sketches[col])
+        return self
+
+    def _merge_column(self, col: str, batch: dict, sketch: QuantileSketch) -> None:
+        if col not in self.stats:
+            self.stats[col] = {"count": 0, "nulls": 0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf}
+            self.sketches[col] = QuantileSketch()
+        stats = self.stats[col]
+        n = stats["count"] + batch["count"]
+        if n:
+            delta = batch["mean"] - stats["mean"]
+            stats["m2"] += batch["m2"] + delta ** 2 * stats["count"] * batch["count"] / n
+            stats["mean"] += delta * batch["count"] / n
+        stats["count"] = n
+        stats["nulls"] += batch["nulls"]
+        stats["min"] = min(stats["min"], batch["min"])
+        stats["max"] = max(stats["max"], batch["max"])
+        self.sketches[col].merge(sketch)
+
+    def null_rate(self, col: str) -> float:
+        stats = self.stats[col]
+        return stats["nulls"] / max(stats["count"] + stats["nulls"], 1)
+
+    def std(self, col: str) -> float:
+        stats = self.stats[col]
+        return float(np.sqrt(stats["m2"] / stats["count"])) if stats["count"] else np.nan
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return one row per column with counts, null rate, moments and quartiles."""
+        rows = []
+        for col, stats in self.stats.items():
+            quartiles = self.sketches[col].quantile([0.25, 0.5, 0.75])
+            rows.append({
+                "feature": col, "count": stats["count"], "null_rate": self.null_rate(col),
+                "mean": stats["mean"], "std": self.std(col), "min": stats["min"],
+                "p25": quartiles[0], "p50": quartiles[1], "p75": quartiles[2], "max": stats["max"],
+            })
+        return pd.DataFrame(rows).round(3)
+
+
+def population_stability(reference: QuantileSketch, live: QuantileSketch, bins: int = PSI_BINS) -> float:
+    """
+    Population stability index of `live` against `reference`.
+
+    Bins are the reference deciles (merged where they coincide, so a
+    discrete feature gets one bin per value).
+    """
+    if not reference.total or not live.total:
+        return np.nan
+    edges = np.unique(reference.quantile(np.arange(1, bins) / bins))
+    expected = np.diff(np.concatenate([[0], reference.cdf(edges), [1]]))
+    actual = np.diff(np.concatenate([[0], live.cdf(edges), [1]]))
+    expected, actual = np.maximum(expected, 1e-4), np.maximum(actual, 1e-4)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def unimpute(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of feature rows with imputed previous season values set to NaN.
+
+    Players without a previous season have their `prev_` features filled
+    with means (per season in training, training means when live), which
+    would show up as a point mass at a different value on each side. They
+    are the rows with `prev_season_played == 0`, so their `prev_` values
+    are summarised as nulls instead, and the null rate becomes the share
+    of imputed rows.
+    """
+    if "prev_season_played" not in X:
+        return X
+    prev_cols = [col for col in X.columns if col.startswith("prev_") and col != "prev_season_played"]
+    X = X.copy()
+    X.loc[X["prev_season_played"] == 0, prev_cols] = np.nan
+    return X
+
+
+def compare_summaries(reference: FeatureSummary, live: FeatureSummary,
+                      ignore=IGNORED_FEATURES) -> pd.DataFrame:
+    """
+    Compare a live summary with a reference one, feature by feature.
+
+    Returns:
+        pd.DataFrame: One row per feature with reference and live means,
+        "shift" (mean difference in reference standard deviations),
+        reference and live null rates, "psi", "out_of_range" (share of live
+        values outside the reference min-max) and "drift", a comma
+        separated list of the thresholds crossed (empty if none). Features
+        missing from either side are flagged as "missing". Drifted
+        features come first.
+    """
+    rows = []
+    for col in dict.fromkeys(list(reference.stats) + list(live.stats)):
+        if col in ignore:
+            continue
+        if col not in reference.stats or col not in live.stats:
+            rows.append({"feature": col, "drift": "missing"})
+            continue
+        ref, cur = reference.stats[col], live.stats[col]
+        std = reference.std(col)
+        row = {
+            "feature": col,
+            "reference_mean": ref["mean"],
+            "live_mean": cur["mean"],
+            "shift": (cur["mean"] - ref["mean"]) / std if std > 0 else 0.0,
+            "reference_null_rate": reference.null_rate(col),
+            "live_null_rate": live.null_rate(col),
+            "psi": population_stability(reference.sketches[col], live.sketches[col]),
+            "out_of_range": live.sketches[col].share_outside(ref["min"], ref["max"]),
+        }
+        flags = []
+        if row["psi"] > PSI_THRESHOLD:
+            flags.append("psi")
+        if abs(row["shift"]) > SHIFT_THRESHOLD:
+            flags.append("shift")
+        if row["live_null_rate"] - row["reference_null_rate"] > NULL_RATE_THRESHOLD:
+            flags.append("nulls")
+        if row["out_of_range"] > RANGE_THRESHOLD:
+            flags.append("range")
+        row["drift"] = ",".join(flags)
+        rows.append(row)
+    report = pd.DataFrame(rows)
+    report["drifted"] = report["drift"] != ""
+    report = report.sort_values(["drifted", "psi"], ascending=False, na_position="first")
+    return report.drop(columns="drifted").reset_index(drop=True).round(3)
+
+
+def stats_path(model_path: str) -> str:
+    """Map `models/x.pkl` to the feature statistics `models/x_feature_stats.pkl` next to it."""
+    return os.path.splitext(model_path)[0] + "_feature_stats.pkl"
+
+
+class DriftMonitor:
+    """
+    Feature statistics of a model's training data and of each live gameweek.
+
+    Training rows are summarised per gameweek, because features such as
+    season-to-date totals depend on how far into the season a row is, and
+    imputed values are counted as nulls on both sides (see `unimpute`). A
+    live gameweek is compared with the merged training summaries of the
+    gameweeks around it, so no training data is read at prediction time.
+    The monitor is saved next to the model with `stats_path`.
+
+    Attributes:
+        reference (dict): Training `FeatureSummary` per gameweek.
+        live (dict): Live `FeatureSummary` per (season, gameweek).
+    """
+
+    def __init__(self):
+        self.reference = {}
+        self.live = {}
+
+    def add_reference(self, X: pd.DataFrame) -> "DriftMonitor":
+        """Add training rows (with a "gw" column) to the per-gameweek summaries."""
+        for gw, rows in unimpute(X).groupby("gw"):
+            self.reference.setdefault(int(gw), FeatureSummary()).update(rows)
+        return self
+
+    def reference_for(self, gw: int, window: int = REFERENCE_WINDOW) -> FeatureSummary:
+        """Merge the training summaries of gameweeks `gw - window` to `gw + window`."""
+        summary = FeatureSummary()
+        for near in range(gw - window, gw + window + 1):
+            if near in self.reference:
+                summary.merge(self.reference[near])
+        if not summary.stats:
+            raise KeyError(f"No training rows near GW{gw}")
+        return summary
+
+    def record_live(self, X: pd.DataFrame, season: str, gw: int) -> FeatureSummary:
+        """Summarise a live gameweek's feature rows, replacing an earlier summary of it."""
+        self.live[(season, int(gw))] = FeatureSummary().update(unimpute(X))
+        return self.live[(season, int(gw))]
+
+    def check(self, season: str, gw: int, window: int = REFERENCE_WINDOW) -> pd.DataFrame:
+        """Compare a recorded live gameweek with training (see `compare_summaries`)."""
+        return compare_summaries(self.reference_for(gw, window), self.live[(season, int(gw))])
+
+    def save(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path: str) -> "DriftMonitor":
+        return joblib.load(path)
+
+
+def show_drift(report: pd.DataFrame, season: str, gw: int) -> None:
+    """Print the drifted features of a `compare_summaries` report."""
+    drifted = report[report["drift"] != ""]
+    if drifted.empty:
+        print(f"No feature drift in GW{gw} {season}.")
+        return
+    print(f"\n=== Feature drift in GW{gw} {season}: {len(drifted)} of {len(report)} features ===")
+    print(drifted.to_string(index=False))
+
+
+if __name__ == "__main__":
+    from src.model.make_predictions import load_current_data, prepare_features
+    from src.model.train_random_forest import MODEL_PATH
+
+    monitor = DriftMonitor.load(stats_path(MODEL_PATH))
+    X, _ = prepare_features(load_current_data("data/pre-predictions/processed_data/4_2025-26_model_ready.csv"))
+    monitor.record_live(X, "2025-26", 4)
+    show_drift(monitor.check("2025-26", 4), "2025-26", 4)
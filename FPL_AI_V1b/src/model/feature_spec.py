@@ -0,0 +1,183 @@
+import json
+import os
+import warnings
+import numpy as np
+import pandas as pd
+
+# Positions as the model sees them; the FPL API numbers them 1-4.
+ELEMENT_TYPES = {0: "GK", 1: "DEF", 2: "MID", 3: "FWD"}
+
+
+class FeatureSpec:
+    """
+    The input schema of a trained model, saved next to it.
+
+    Holds the training columns in order with their dtypes, the imputation
+    value of every `prev_` column (the training mean over players who had a
+    previous season) and the `element_type` codes seen in training. At
+    inference `to_array` checks a frame against the spec and assembles the
+    single C-contiguous float32 array the forest reads, so `predict` uses
+    it without converting or copying it again.
+
+    Attributes:
+        columns (list of str): Feature columns in training order.
+        dtypes (dict): Training dtype of each column.
+        fill_values (dict): Imputation value of each `prev_` column.
+        element_types (list of int): Valid `element_type` codes.
+    """
+
+    def __init__(self, columns, dtypes: dict, fill_values: dict, element_types):
+        self.columns = list(columns)
+        self.dtypes = dict(dtypes)
+        self.fill_values = dict(fill_values)
+        self.element_types = sorted(int(code) for code in element_types)
+
+    @classmethod
+    def fit(cls, X: pd.DataFrame) -> "FeatureSpec":
+        """
+        Build the spec of a training feature matrix.
+
+        The model-ready training data already has missing `prev_` values
+        filled with per-season means, so the imputation values are the
+        means over rows with `prev_season_played == 1` where that column
+        exists.
+        """
+        prev_cols = [col for col in X.columns if col.startswith("prev_") and col != "prev_season_played"]
+        played = X[X["prev_season_played"] == 1] if "prev_season_played" in X else X
+        return cls(
+            columns=X.columns,
+            dtypes={col: str(dtype) for col, dtype in X.dtypes.items()},
+            fill_values=played[prev_cols].mean().round(2).to_dict(),
+            element_types=np.unique(X["element_type"].dropna()) if "element_type" in X else [],
+        )
+
+    def validate(self, df: pd.DataFrame) -> None:
+        """
+        Check that a frame has every feature column, numeric, with valid positions.
+
+        Extra columns (meta columns such as names and codes) are ignored.
+
+        Raises:
+            ValueError: On missing or non-numeric columns, or `element_type`
+                codes not seen in training (e.g. the API's 1-4 numbering).
+        """
+        missing = [col for col in self.columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
+        not_numeric = [col for col in self.columns
+                       if not pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+        if not_numeric:
+            raise ValueError(f"Non-numeric feature columns: {not_numeric}")
+        if self.element_types and "element_type" in df:
+            unknown = sorted(set(df["element_type"].dropna().astype(int)) - set(self.element_types))
+            if unknown:
+                raise ValueError(
+                    f"element_type codes {unknown} were not seen in training (expected "
+                    f"{self.element_types}: {ELEMENT_TYPES}); API positions must be shifted down by 1"
+                )
+
+    def to_array(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Validate a frame and assemble its features as one float32 array.
+
+        The array is allocated once and filled column by column in training
+        order, with missing `prev_` values set to the training imputation
+        values.
+
+        Args:
+            df (pd.DataFrame): Model-ready rows; meta columns are ignored.
+
+        Returns:
+            np.ndarray: C-contiguous float32 array of shape
+            (len(df), len(self.columns)).
+        """
+        self.validate(df)
+        X = np.empty((len(df), len(self.columns)), dtype=np.float32)
+        for i, col in enumerate(self.columns):
+            X[:, i] = df[col].to_numpy()
+            if col in self.fill_values:
+                column = X[:, i]
+                column[np.isnan(column)] = self.fill_values[col]
+        return X
+
+    def to_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return `to_array(df)` as a frame with the spec's columns and `df`'s index."""
+        return pd.DataFrame(self.to_array(df), columns=self.columns, index=df.index)
+
+    def prev_fill_values(self) -> pd.Series:
+        """Return the `prev_` imputation values as a Series, for `impute_prev_features`."""
+        return pd.Series(self.fill_values, dtype=float)
+
+    def to_dict(self) -> dict:
+        return {
+            "columns": self.columns,
+            "dtypes": self.dtypes,
+            "fill_values": self.fill_values,
+            "element_types": self.element_types,
+        }
+
+    def save(self, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "FeatureSpec":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def spec_path(model_path: str) -> str:
+    """Map `models/x.pkl` to the feature spec `models/x_feature_spec.json` next to it."""
+    return os.path.splitext(model_path)[0] + "_feature_spec.json"
+
+
+def load_feature_spec(model_path: str):
+    """Return the spec saved with a model, or None for models saved before specs existed."""
+    path = spec_path(model_path)
+    return FeatureSpec.load(path) if os.path.exists(path) else None
+
+
+def check_model_columns(model, spec) -> None:
+    """
+    Check that a spec, or a list of columns, matches the columns a model was fitted on.
+
+    Paths that build feature arrays themselves call this with the columns
+    they build, so models saved without a spec still fail fast.
+
+    Raises:
+        ValueError: If the model's feature names differ from the spec's.
+    """
+    columns = spec.columns if isinstance(spec, FeatureSpec) else list(spec)
+    fitted = getattr(model, "feature_names_in_", None)
+    if fitted is not None and list(fitted) != columns:
+        missing = [col for col in fitted if col not in columns]
+        raise ValueError("Feature columns do not match the columns the model was fitted on"
+                         + (f" (missing {missing})" if missing else " (different order)"))
+
+
+def predict_array(model, X: np.ndarray, method: str = "predict") -> np.ndarray:
+    """
+    Call `model.predict` (or `apply`) on a feature frame or a `FeatureSpec.to_array` array.
+
+    For arrays, the spec has already checked the column names and order,
+    so scikit-learn's warning about arrays without feature names is
+    silenced.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return getattr(model, method)(X)
+
+
+if __name__ == "__main__":
+    from src.model.make_predictions import load_current_data, load_model
+    from src.model.train_random_forest import MODEL_PATH
+
+    model = load_model(MODEL_PATH)
+    spec = load_feature_spec(MODEL_PATH)
+    check_model_columns(model, spec)
+    df = load_current_data("data/pre-predictions/processed_data/4_2025-26_model_ready.csv")
+    X = spec.to_array(df)
+    print(X.shape, X.dtype, X.flags["C_CONTIGUOUS"])
+    print(predict_array(model, X)[:10])
@@ -1,11 +1,36 @@
 import os
+import glob
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import joblib
 
+from src.data.warehouse import WAREHOUSE_PATH, store_predictions
+from src.model.feature_spec import check_model_columns, load_feature_spec, predict_array
+
+MODEL_READY_GLOB = "data/pre-predictions/processed_data/*_model_ready.csv"
+PREDICTIONS_DIR = "outputs/predictions"
+
+UNCERTAINTY_QUANTILES = (0.1, 0.5, 0.9)
+# Upper bound on the per-tree prediction matrix held in memory at once.
+MAX_CHUNK_BYTES = 64 * 1024 ** 2
+
 def load_model(model_path: str):
     """Load a trained model given a path."""
     return joblib.load(model_path)
 
+def model_version(model_path: str) -> str:
+    """
+    Return a short version id for a saved model file.
+
+    The id is derived from the file's size and modification time, like the
+    data repository's cache invalidation, so retraining (which rewrites the
+    file) changes it without hashing a multi-gigabyte forest.
+    """
+    stat = os.stat(model_path)
+    return hashlib.sha256(f"{stat.st_size}-{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
 def load_current_data(input_path: str) -> pd.DataFrame:
     """Load the pre-processed current season data."""
     return pd.read_csv(input_path)
@@ -14,24 +39,177 @@ def prepare_features(df: pd.DataFrame, drop_cols=None):
     """
     Prepare features for prediction by removing non-feature columns.
     Returns the features and the dropped columns separately so they can
-    be added back later.
+    be added back later. Columns in `drop_cols` that are missing from
+    `df` (e.g. `now_cost` in older model-ready files) are skipped.
     """
     if drop_cols is None:
-        drop_cols = ["code", "first_name", "second_name", "year"]
+        drop_cols = ["code", "first_name", "second_name", "year", "now_cost", "team"]
+    drop_cols = [col for col in drop_cols if col in df.columns]
 
     meta_df = df[drop_cols].copy()
     X = df.drop(columns=drop_cols, errors="ignore")
     return X, meta_df
 
-def add_predictions(X: pd.DataFrame, predictions, meta_df: pd.DataFrame) -> pd.DataFrame:
+def tree_leaf_values(model) -> tuple:
+    """
+    Flatten the leaf values of every tree in a fitted forest.
+
+    Returns:
+        tuple: (values, offsets) where `values` holds the node values of all
+        trees back to back and `offsets[t]` is where tree `t` starts, so the
+        value of node `n` of tree `t` is `values[offsets[t] + n]`.
+    """
+    node_values = [est.tree_.value[:, 0, 0] for est in model.estimators_]
+    offsets = np.cumsum([0] + [len(values) for values in node_values[:-1]])
+    return np.concatenate(node_values), offsets
+
+
+def per_tree_predictions(model, X, leaf_values: tuple = None) -> np.ndarray:
+    """
+    Return every tree's prediction for every row of a fitted forest.
+
+    The leaf reached in every tree is found in one `model.apply` call and
+    the predictions are gathered from the flat leaf values, rather than
+    calling `predict` on each tree.
+
+    Args:
+        model: A fitted `RandomForestRegressor`.
+        X (pd.DataFrame or np.ndarray): Feature matrix, or the array of
+            `FeatureSpec.to_array`.
+        leaf_values (tuple, optional): `tree_leaf_values(model)`, for
+            callers scoring several chunks.
+
+    Returns:
+        np.ndarray: Array of shape (len(X), n_trees).
+    """
+    values, offsets = tree_leaf_values(model) if leaf_values is None else leaf_values
+    return values[predict_array(model, X, "apply") + offsets]
+
+
+def flatten_forest(model) -> dict:
+    """
+    Pack the nodes of every tree in a fitted forest into flat arrays.
+
+    Node `n` of tree `t` becomes node `offsets[t] + n`. Leaves point to
+    themselves, so every tree can be walked for the same number of steps.
+
+    Returns:
+        dict: Arrays "left", "right", "feature", "threshold",
+        "missing_left", "value" and "is_leaf" over all nodes, plus "roots"
+        (the root of each tree) and "max_depth".
+    """
+    trees = [est.tree_ for est in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+    left, right = [], []
+    for tree, offset in zip(trees, offsets):
+        nodes = np.arange(tree.node_count) + offset
+        leaf = tree.children_left == -1
+        left.append(np.where(leaf, nodes, tree.children_left + offset))
+        right.append(np.where(leaf, nodes, tree.children_right + offset))
+    missing_left = [
+        getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=bool)).astype(bool)
+        for tree in trees
+    ]
+    return {
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "feature": np.concatenate([np.maximum(tree.feature, 0) for tree in trees]),
+        "threshold": np.concatenate([tree.threshold for tree in trees]),
+        "missing_left": np.concatenate(missing_left),
+        "value": np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+        "is_leaf": np.concatenate([tree.children_left == -1 for tree in trees]),
+        "roots": offsets,
+        "max_depth": max(tree.max_depth for tree in trees),
+    }
+
+
+def predict_flat(forest: dict, X) -> np.ndarray:
+    """
+    Predict a handful of rows by walking all trees of a flattened forest at once.
+
+    `model.predict` has a fixed cost per tree, which dominates when only a
+    few rows are scored. Here each step moves every (row, tree) pair one
+    level down with a few vectorized gathers, so scoring k rows costs about
+    `max_depth` array operations over `k * n_trees` elements. Inputs are
+    compared in float32, as scikit-learn does, so the results match
+    `model.predict` up to floating point summation order.
+
+    Args:
+        forest (dict): Output of `flatten_forest`.
+        X (pd.DataFrame or np.ndarray): Feature rows in training column order.
+
+    Returns:
+        np.ndarray: The forest mean prediction per row.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    rows = np.repeat(np.arange(len(X)), len(forest["roots"]))
+    nodes = np.tile(forest["roots"], len(X))
+    for _ in range(forest["max_depth"]):
+        values = X[rows, forest["feature"][nodes]]
+        go_left = (values <= forest["threshold"][nodes]) | (np.isnan(values) & forest["missing_left"][nodes])
+        nodes = np.where(go_left, forest["left"][nodes], forest["right"][nodes])
+        if forest["is_leaf"][nodes].all():
+            break
+    return forest["value"][nodes].reshape(len(X), -1).mean(axis=1)
+
+
+def predict_with_uncertainty(model, X, quantiles=UNCERTAINTY_QUANTILES,
+                             max_chunk_bytes: int = MAX_CHUNK_BYTES):
+    """
+    Predict with a random forest and summarise the spread of its trees.
+
+    Rather than calling `predict` on each tree in Python, the leaf reached
+    in every tree is found in one `model.apply` call and the per-tree
+    predictions are gathered from a flat array of leaf values. Rows are
+    processed in chunks so the (rows x trees) matrix stays under
+    `max_chunk_bytes`; quantiles need every tree's prediction for a row,
+    so chunks split rows rather than trees.
+
+    Args:
+        model: A fitted `RandomForestRegressor`.
+        X (pd.DataFrame or np.ndarray): Feature matrix, or the array of
+            `FeatureSpec.to_array`.
+        quantiles (tuple of float): Quantiles of the per-tree predictions.
+        max_chunk_bytes (int): Memory budget for the per-tree matrix.
+
+    Returns:
+        tuple: (predictions, uncertainty_df) where `predictions` is the
+        forest mean and `uncertainty_df` has one `total_points_p{q}` column
+        per quantile plus `total_points_std`.
+    """
+    leaf_values = tree_leaf_values(model)
+    n_trees = len(leaf_values[1])
+    chunk_rows = max(1, max_chunk_bytes // (8 * n_trees))
+
+    means, stds, quantile_values = [], [], []
+    for start in range(0, len(X), chunk_rows):
+        per_tree = per_tree_predictions(model, X[start:start + chunk_rows], leaf_values)
+        means.append(per_tree.mean(axis=1))
+        stds.append(per_tree.std(axis=1))
+        quantile_values.append(np.quantile(per_tree, quantiles, axis=1).T)
+
+    quantile_values = np.vstack(quantile_values)
+    uncertainty_df = pd.DataFrame(
+        {f"total_points_p{round(q * 100)}": quantile_values[:, i] for i, q in enumerate(quantiles)}
+    )
+    uncertainty_df["total_points_std"] = np.concatenate(stds)
+    return np.concatenate(means), uncertainty_df
+
+
+def add_predictions(X: pd.DataFrame, predictions, meta_df: pd.DataFrame,
+                    uncertainty_df: pd.DataFrame = None) -> pd.DataFrame:
     """
     Add predictions, restore meta columns, reorder, and sort by prediction.
+    Uncertainty columns, if given, are placed after the predictions.
     """
-    df_out = X.copy()
-    df_out["total_points_predictions"] = predictions
-    df_out = pd.concat([meta_df.reset_index(drop=True), df_out.reset_index(drop=True)], axis=1)
+    predictions_df = pd.DataFrame({"total_points_predictions": predictions})
+    frames = [meta_df.reset_index(drop=True), X.reset_index(drop=True), predictions_df]
+    if uncertainty_df is not None:
+        frames.append(uncertainty_df.reset_index(drop=True))
+    df_out = pd.concat(frames, axis=1)
     
-    cols = ["total_points_predictions"] + [c for c in df_out.columns if c != "total_points_predictions"]
+    front = ["total_points_predictions"] + ([] if uncertainty_df is None else list(uncertainty_df.columns))
+    cols = front + [c for c in df_out.columns if c not in front]
     df_out = df_out[cols]
     
     df_out = df_out.sort_values(by="total_points_predictions", ascending=False).reset_index(drop=True)
@@ -40,41 +218,168 @@ def add_predictions(X: pd.DataFrame, predictions, meta_df: pd.DataFrame) -> pd.D
     return df_out
 
 
-def save_predictions(df: pd.DataFrame, output_path: str):
-    """Save predictions dataframe to CSV."""
+def save_predictions(df: pd.DataFrame, output_path: str, version: str = None,
+                     warehouse_path: str = WAREHOUSE_PATH):
+    """Save predictions dataframe to CSV.
+
+    With a model `version`, the rows are also bulk inserted into the
+    predictions warehouse, keyed by the season and gameweek in the file name.
+    """
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     df.to_csv(output_path, index=False)
+    if version is not None:
+        store_predictions(df, output_path, version, warehouse_path)
+
+
+def predict_features(model, X, uncertainty: bool = False, spec=None) -> tuple:
+    """
+    Predict feature rows, through the model's feature spec when it has one.
+
+    With a spec, the rows are checked against it and scored as one float32
+    array (see `FeatureSpec.to_array`); without one, the frame is passed
+    to the model as is.
+
+    Returns:
+        tuple: (predictions, uncertainty_df), with `uncertainty_df` None
+        unless `uncertainty` is True.
+    """
+    if spec is not None:
+        X = spec.to_array(X)
+    if uncertainty:
+        return predict_with_uncertainty(model, X)
+    return predict_array(model, X), None
+
+
+def predict_dataframe(model, current_df: pd.DataFrame, uncertainty: bool = False,
+                      spec=None) -> pd.DataFrame:
+    """
+    Score model-ready rows already in memory.
+
+    Args:
+        model: The trained model.
+        current_df (pd.DataFrame): Rows in the model-ready format.
+        uncertainty (bool): Also add per-tree quantiles and standard deviation.
+        spec (FeatureSpec, optional): The model's feature spec.
+
+    Returns:
+        pd.DataFrame: The `add_predictions` output.
+    """
+    X, meta_df = prepare_features(current_df)
+    preds, uncertainty_df = predict_features(model, X, uncertainty, spec)
+    return add_predictions(X, preds, meta_df, uncertainty_df)
+
+
+def load_model_and_spec(model_path: str) -> tuple:
+    """
+    Load a model and the feature spec saved with it, checking they agree.
+
+    Returns:
+        tuple: (model, spec), with `spec` None for models saved before
+        specs existed.
+    """
+    model = load_model(model_path)
+    spec = load_feature_spec(model_path)
+    if spec is not None:
+        check_model_columns(model, spec)
+    return model, spec
 
 
 def run_prediction_pipeline(
     model_path: str,
     input_data_path: str,
-    output_path: str
+    output_path: str,
+    uncertainty: bool = False
 ):
     """Full pipeline to load data, predict, and save results.
+
+    With `uncertainty=True`, the P10/P50/P90 and standard deviation of
+    the individual trees' predictions are added to the output. Inputs are
+    checked against the model's feature spec when it has one.
     """
     print(f"Loading model from {model_path}...")
-    model = load_model(model_path)
+    model, spec = load_model_and_spec(model_path)
 
     print(f"Loading current season data from {input_data_path}...")
     current_df = load_current_data(input_data_path)
 
-    print("Preparing features...")
-    X, meta_df = prepare_features(current_df)
-
     print("Making predictions...")
-    preds = model.predict(X)
-
-    print("Adding predictions to dataframe...")
-    final_df = add_predictions(X, preds, meta_df)
+    final_df = predict_dataframe(model, current_df, uncertainty, spec)
 
     print(f"Saving predictions to {output_path}...")
-    save_predictions(final_df, output_path)
+    save_predictions(final_df, output_path, model_version(model_path))
     print("Done.")
     
     return final_df
 
 
+def prediction_output_path(input_path: str, output_dir: str = PREDICTIONS_DIR) -> str:
+    """Map `{gw}_{year}_model_ready.csv` to `{output_dir}/{gw}_{year}_v1b_predictions.csv`."""
+    name = os.path.basename(input_path).replace("_model_ready.csv", "_v1b_predictions.csv")
+    return os.path.join(output_dir, name)
+
+
+def run_batch_prediction_pipeline(
+    model_path: str,
+    input_paths=None,
+    output_dir: str = PREDICTIONS_DIR,
+    uncertainty: bool = False
+) -> dict:
+    """Score many model-ready files with a single model load and predict.
+
+    The model is unpickled on one thread while the input CSVs are read and
+    parsed on others, so file loading overlaps with the model load. All
+    feature rows are then concatenated into one matrix, scored with a
+    single `predict`, and split back into one predictions file per input.
+
+    Args:
+        model_path (str): Path to the trained model pickle file.
+        input_paths (list of str, optional): Model-ready CSVs to score.
+            Defaults to every file matching `MODEL_READY_GLOB`.
+        output_dir (str): Directory for the `{gw}_{year}_v1b_predictions.csv`
+            outputs.
+        uncertainty (bool): Also add per-tree quantiles and standard deviation.
+
+    Returns:
+        dict: Maps each input path to its predictions DataFrame.
+
+    Raises:
+        ValueError: If no input files are found or their feature columns differ.
+    """
+    if input_paths is None:
+        input_paths = sorted(glob.glob(MODEL_READY_GLOB))
+    if not input_paths:
+        raise ValueError("No model-ready files to score.")
+
+    print(f"Loading model from {model_path} and {len(input_paths)} input files...")
+    with ThreadPoolExecutor(max_workers=min(8, len(input_paths)) + 1) as executor:
+        model_future = executor.submit(load_model_and_spec, model_path)
+        prepared = list(executor.map(lambda path: prepare_features(load_current_data(path)), input_paths))
+        model, spec = model_future.result()
+
+    feature_cols = list(prepared[0][0].columns)
+    for path, (X, _) in zip(input_paths, prepared):
+        if list(X.columns) != feature_cols:
+            raise ValueError(f"Feature columns in {path} do not match {input_paths[0]}")
+
+    X_all = pd.concat([X for X, _ in prepared], ignore_index=True)
+    print(f"Making predictions for {len(X_all)} rows...")
+    preds_all, uncertainty_all = predict_features(model, X_all, uncertainty, spec)
+
+    results = {}
+    version = model_version(model_path)
+    bounds = np.cumsum([0] + [len(X) for X, _ in prepared])
+    for path, (X, meta_df), start, end in zip(input_paths, prepared, bounds[:-1], bounds[1:]):
+        uncertainty_df = None if uncertainty_all is None else uncertainty_all.iloc[start:end]
+        final_df = add_predictions(X, preds_all[start:end], meta_df, uncertainty_df)
+        output_path = prediction_output_path(path, output_dir)
+        save_predictions(final_df, output_path, version)
+        print(f"Saved predictions to {output_path}")
+        results[path] = final_df
+
+    print("Done.")
+    return results
+
+
 if __name__ == "__main__":
     model_path = "models/random_forest_model.pkl"
     input_data_path = "data/pre-predictions/processed_data/1_2025-26_model_ready.csv"
@@ -0,0 +1,140 @@
+import copy
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+N_REPEATS = 3
+# Rows of the held-out set used for scoring; permutation importance needs
+# every tree's prediction for every permuted copy, so the full test split
+# of a 1000-tree forest is sampled down.
+MAX_ROWS = 5000
+FAMILIES = ("meta", "prev", "current")
+
+
+def feature_family(column: str) -> str:
+    """
+    Return the family of a model feature.
+
+    `prev_*` features describe the previous season, `current_*` features
+    and `matches` the current season so far, and the rest ("element_type",
+    "gw") are meta features.
+    """
+    if column.startswith("prev_"):
+        return "prev"
+    if column.startswith("current_") or column == "matches":
+        return "current"
+    return "meta"
+
+
+def report_path(model_path: str) -> str:
+    """Map `models/x.pkl` to the importance report `models/x_importance.csv` next to it."""
+    return os.path.splitext(model_path)[0] + "_importance.csv"
+
+
+def _mse(model, values: np.ndarray, columns: list, y: np.ndarray) -> float:
+    # Wrap without copying so the model sees the feature names it was fitted with.
+    predictions = model.predict(pd.DataFrame(values, columns=columns, copy=False))
+    return np.mean((predictions - y) ** 2)
+
+
+def permutation_importance(model, X: pd.DataFrame, y, n_repeats: int = N_REPEATS,
+                           max_rows: int = MAX_ROWS, n_jobs: int = -1,
+                           random_state: int = 42) -> pd.DataFrame:
+    """
+    Compute permutation importance for every feature and feature family.
+
+    The unpermuted predictions are computed once and shared by every
+    feature, so each unit of work costs a single `predict`. Workers are
+    threads (the forest's `predict` releases the GIL), so the model and
+    the baseline are shared in memory. The workers score with a shallow
+    copy of the model set to `n_jobs=1`, so `n_jobs` threads each predict
+    with one tree at a time instead of each starting a thread per CPU.
+    Each worker keeps one private copy
+    of the feature matrix and permutes the columns it is scoring in place,
+    restoring them afterwards, instead of copying the matrix per column.
+
+    Families are permuted jointly with a single row order, which measures
+    the loss of the whole group rather than the sum of its parts.
+
+    Args:
+        model: A fitted regressor.
+        X (pd.DataFrame): Held-out features in training column order.
+        y (array-like): Held-out targets.
+        n_repeats (int): Permutations per feature or family.
+        max_rows (int): Sample at most this many rows of `X`.
+        n_jobs (int): Number of worker threads (-1 for all CPUs).
+        random_state (int): Seed for the row sample and permutations.
+
+    Returns:
+        pd.DataFrame: One row per feature and per family with "feature",
+        "family", "kind" ("feature" or "family"), "importance_mean" and
+        "importance_std" (increase in MSE), sorted by importance.
+    """
+    rng = np.random.default_rng(random_state)
+    y = np.asarray(y, dtype=float)
+    if len(X) > max_rows:
+        sample = np.sort(rng.choice(len(X), max_rows, replace=False))
+        X, y = X.iloc[sample], y[sample]
+
+    columns = list(X.columns)
+    values = np.array(X, dtype=np.float32)
+    baseline = _mse(model, values, columns, y)
+
+    units = [(col, feature_family(col), "feature", [i]) for i, col in enumerate(columns)]
+    for family in FAMILIES:
+        indices = [i for i, col in enumerate(columns) if feature_family(col) == family]
+        if indices:
+            units.append((family, family, "family", indices))
+    # Draw every permutation up front so results do not depend on scheduling.
+    orders = [[rng.permutation(len(values)) for _ in range(n_repeats)] for _ in units]
+
+    local = threading.local()
+    n_workers = max(1, min(os.cpu_count() if n_jobs == -1 else n_jobs, len(units)))
+    scorer = model
+    if n_workers > 1 and "n_jobs" in model.get_params():
+        # Shares the fitted trees; only the copy's own n_jobs changes.
+        scorer = copy.copy(model).set_params(n_jobs=1)
+
+    def score(unit, unit_orders):
+        if not hasattr(local, "values"):
+            local.values = values.copy()
+        work = local.values
+        indices = unit[3]
+        original = work[:, indices].copy()
+        losses = []
+        for order in unit_orders:
+            work[:, indices] = original[order]
+            losses.append(_mse(scorer, work, columns, y) - baseline)
+        work[:, indices] = original
+        return losses
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        losses = list(executor.map(score, units, orders))
+
+    report = pd.DataFrame({
+        "feature": [unit[0] for unit in units],
+        "family": [unit[1] for unit in units],
+        "kind": [unit[2] for unit in units],
+        "importance_mean": [np.mean(loss) for loss in losses],
+        "importance_std": [np.std(loss) for loss in losses],
+    })
+    return report.sort_values("importance_mean", ascending=False).reset_index(drop=True)
+
+
+def save_importance_report(report: pd.DataFrame, model_path: str) -> str:
+    """Write a permutation importance report next to the model and return its path."""
+    path = report_path(model_path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    report.round(4).to_csv(path, index=False)
+    return path
+
+
+def show_importance(report: pd.DataFrame, n: int = 10) -> None:
+    """Print the family importances and the `n` most important features."""
+    print("Permutation importance (increase in MSE):")
+    for kind, rows in (("family", report[report["kind"] == "family"]),
+                       ("feature", report[report["kind"] == "feature"].head(n))):
+        for row in rows.itertuples():
+            print(f"  {kind:<8} {row.feature:<28} {row.importance_mean:8.3f} ± {row.importance_std:.3f}")
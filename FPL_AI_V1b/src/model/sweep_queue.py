@@ -0,0 +1,351 @@
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.model.train_random_forest import INPUT_DIR, build_model
+
+QUEUE_PATH = "outputs/sweeps/sweep_queue.sqlite"
+# A claimed job goes back to the queue if its worker has not renewed the
+# lease for this many seconds; workers renew it every third of that.
+LEASE_SECONDS = 120
+POLL_SECONDS = 2.0
+MAX_ATTEMPTS = 3
+
+# Named column subsets of the model-ready data a job can train on.
+FEATURE_SETS = {
+    "all": lambda col: True,
+    "prev_only": lambda col: not col.startswith("current_"),
+    "current_only": lambda col: not col.startswith("prev_"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sweep TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (sweep, spec)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_expires);
+"""
+
+
+class JobQueue:
+    """
+    A queue of sweep jobs in one SQLite file on a shared directory.
+
+    Any number of processes, on this machine or others mounting the same
+    directory, can claim jobs. A claim is a single `BEGIN IMMEDIATE`
+    transaction, so two workers never get the same job. A claimed job
+    holds a lease that its worker renews while it runs; if the worker
+    dies, the lease runs out and the next `claim` hands the job to
+    another worker, up to `MAX_ATTEMPTS` times.
+
+    Job states are "pending", "running", "done" and "failed".
+    """
+
+    def __init__(self, path: str = QUEUE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The rollback journal (SQLite's default) rather than WAL, which
+        # needs shared memory and so does not work across machines.
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def submit(self, sweep: str, specs) -> int:
+        """
+        Add jobs to a sweep. Jobs already in the sweep are not added again.
+
+        Args:
+            sweep (str): Sweep name.
+            specs (list of dict): One JSON-serializable spec per job.
+
+        Returns:
+            int: Number of new jobs.
+        """
+        now = time.time()
+        rows = [(sweep, json.dumps(spec, sort_keys=True), now) for spec in specs]
+        before = self.connection.total_changes
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO jobs (sweep, spec, updated_at) VALUES (?, ?, ?)", rows
+            )
+        return self.connection.total_changes - before
+
+    def claim(self, worker: str, lease_seconds: float = LEASE_SECONDS,
+              max_attempts: int = MAX_ATTEMPTS) -> tuple:
+        """
+        Claim the oldest pending job, or a running job whose lease expired.
+
+        Returns:
+            tuple: (job_id, spec) or None if there is nothing to claim.
+        """
+        now = time.time()
+        cursor = self.connection.cursor()
+        # Take the write lock before reading, so no other worker can pick
+        # the same job between the SELECT and the UPDATE.
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose workers died too often are given up on.
+            cursor.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired too many times', updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, now, max_attempts),
+            )
+            row = cursor.execute(
+                "SELECT job_id, spec FROM jobs WHERE status = 'pending' "
+                "OR (status = 'running' AND lease_expires < ?) ORDER BY job_id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                cursor.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                    (worker, now + lease_seconds, now, row[0]),
+                )
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def renew(self, job_id: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend a job's lease. Returns False if the worker no longer holds it."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+                (time.time() + lease_seconds, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: int, worker: str, result: dict = None, error: str = None,
+               max_attempts: int = MAX_ATTEMPTS) -> bool:
+        """
+        Record a job's result, or its error.
+
+        A failed job is put back in the queue until it has been tried
+        `max_attempts` times. Results from a worker that lost its lease are
+        ignored, since another worker owns the job.
+
+        Returns:
+            bool: Whether the result was recorded.
+        """
+        if error is None:
+            sql = "UPDATE jobs SET status = 'done', result = ?, error = NULL, updated_at = ? "
+            params = [json.dumps(result)]
+        else:
+            sql = ("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                   "error = ?, updated_at = ? ")
+            params = [max_attempts, error]
+        with self.connection:
+            cursor = self.connection.execute(
+                sql + "WHERE job_id = ? AND worker = ? AND status = 'running'",
+                params + [time.time(), job_id, worker],
+            )
+        return cursor.rowcount == 1
+
+    def status(self, sweep: str = None) -> pd.DataFrame:
+        """Return the number of jobs in each state per sweep."""
+        sql = "SELECT sweep, status, COUNT(*) AS jobs FROM jobs"
+        params = ()
+        if sweep is not None:
+            sql += " WHERE sweep = ?"
+            params = (sweep,)
+        cursor = self.connection.execute(sql + " GROUP BY sweep, status ORDER BY sweep, status", params)
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=["sweep", "status", "jobs"])
+
+    def results(self, sweep: str) -> pd.DataFrame:
+        """Return one row per finished job of a sweep, with its spec and result fields as columns."""
+        cursor = self.connection.execute(
+            "SELECT job_id, worker, attempts, spec, result FROM jobs "
+            "WHERE sweep = ? AND status = 'done' ORDER BY job_id",
+            (sweep,),
+        )
+        rows = []
+        for job_id, worker, attempts, spec, result in cursor.fetchall():
+            spec = json.loads(spec)
+            params = spec.pop("params", {})
+            rows.append({"job_id": job_id, "worker": worker, "attempts": attempts, **spec,
+                         **{f"param_{key}": value for key, value in params.items()}, **json.loads(result)})
+        return pd.DataFrame(rows)
+
+
+def sweep_specs(grid: dict, seasons, feature_sets=("all",)) -> list:
+    """
+    Expand a hyperparameter grid into one job spec per combination.
+
+    Args:
+        grid (dict): Hyperparameter name to a list of values.
+        seasons (list of str): Seasons to evaluate on; each job trains on
+            the earlier model-ready seasons.
+        feature_sets (tuple of str): Names from `FEATURE_SETS`.
+
+    Returns:
+        list of dict: Specs with "season", "feature_set" and "params".
+    """
+    names = sorted(grid)
+    return [
+        {"season": season, "feature_set": feature_set, "params": dict(zip(names, values))}
+        for season in seasons
+        for feature_set in feature_sets
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+_seasons = {}
+
+
+def load_season(season: str, input_dir: str = INPUT_DIR) -> pd.DataFrame:
+    """Read a season's model-ready CSV once per process."""
+    if season not in _seasons:
+        _seasons[season] = pd.read_csv(os.path.join(input_dir, f"{season}_model_ready.csv"))
+    return _seasons[season]
+
+
+def available_seasons(input_dir: str = INPUT_DIR) -> list:
+    """Return the seasons with model-ready data, oldest first."""
+    return sorted(file[:-len("_model_ready.csv")] for file in os.listdir(input_dir)
+                  if file.endswith("_model_ready.csv"))
+
+
+def run_job(spec: dict, input_dir: str = INPUT_DIR) -> dict:
+    """
+    Train on the seasons before `spec["season"]` and evaluate on it.
+
+    Args:
+        spec (dict): A spec from `sweep_specs`.
+        input_dir (str): Directory of the model-ready CSVs.
+
+    Returns:
+        dict: "mse", "rmse", "mae", "r2", row counts and "train_seconds".
+
+    Raises:
+        ValueError: If the season has no earlier seasons to train on.
+    """
+    seasons = available_seasons(input_dir)
+    train_seasons = [season for season in seasons if season < spec["season"]]
+    if not train_seasons:
+        raise ValueError(f"No model-ready seasons before {spec['season']} to train on")
+    train_df = pd.concat([load_season(season, input_dir) for season in train_seasons], ignore_index=True)
+    test_df = load_season(spec["season"], input_dir)
+
+    keep = FEATURE_SETS[spec["feature_set"]]
+    features = [col for col in train_df.columns if col != "total_points" and keep(col)]
+    # Workers are the unit of parallelism, so each forest uses one core.
+    model = build_model(**{"n_jobs": 1, **spec["params"]})
+    start = time.time()
+    model.fit(train_df[features], train_df["total_points"])
+    train_seconds = time.time() - start
+
+    y_pred = model.predict(test_df[features])
+    mse = mean_squared_error(test_df["total_points"], y_pred)
+    return {
+        "mse": round(mse, 3),
+        "rmse": round(float(np.sqrt(mse)), 3),
+        "mae": round(mean_absolute_error(test_df["total_points"], y_pred), 3),
+        "r2": round(r2_score(test_df["total_points"], y_pred), 4),
+        "n_train": len(train_df),
+        "n_test": len(test_df),
+        "train_seconds": round(train_seconds, 2),
+    }
+
+
+def _keep_renewing(queue_path: str, job_id: int, worker: str, lease_seconds: float,
+                   stop: threading.Event) -> None:
+    # Separate connection: SQLite connections are not shared across threads.
+    queue = JobQueue(queue_path)
+    try:
+        while not stop.wait(lease_seconds / 3):
+            if not queue.renew(job_id, worker, lease_seconds):
+                return
+    finally:
+        queue.close()
+
+
+def run_worker(queue_path: str = QUEUE_PATH, worker: str = None, lease_seconds: float = LEASE_SECONDS,
+               poll_seconds: float = POLL_SECONDS, max_jobs: int = None, wait: bool = False,
+               input_dir: str = INPUT_DIR) -> int:
+    """
+    Claim and run jobs from a queue until it is empty.
+
+    The lease is renewed on a background thread while a job trains, so a
+    job only goes back to the queue if this process stops. Errors are
+    recorded on the job and the worker moves on.
+
+    Args:
+        queue_path (str): Path of the shared queue file.
+        worker (str, optional): Worker name. Defaults to host and process id.
+        lease_seconds (float): Lease length.
+        poll_seconds (float): Wait between claims when the queue is empty.
+        max_jobs (int, optional): Stop after this many jobs.
+        wait (bool): Keep polling an empty queue instead of exiting, for
+            workers started before the sweep is submitted.
+        input_dir (str): Directory of the model-ready CSVs.
+
+    Returns:
+        int: Number of jobs run.
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    queue = JobQueue(queue_path)
+    done = 0
+    try:
+        while max_jobs is None or done < max_jobs:
+            claimed = queue.claim(worker, lease_seconds)
+            if claimed is None:
+                if not wait:
+                    break
+                time.sleep(poll_seconds)
+                continue
+
+            job_id, spec = claimed
+            print(f"[{worker}] job {job_id}: {spec}")
+            stop = threading.Event()
+            renewer = threading.Thread(target=_keep_renewing,
+                                       args=(queue_path, job_id, worker, lease_seconds, stop), daemon=True)
+            renewer.start()
+            try:
+                result, error = run_job(spec, input_dir), None
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+            finally:
+                stop.set()
+                renewer.join()
+            if not queue.finish(job_id, worker, result, error):
+                print(f"[{worker}] lost the lease on job {job_id}, result discarded")
+            done += 1
+    finally:
+        queue.close()
+    print(f"[{worker}] ran {done} jobs")
+    return done
+
+
+if __name__ == "__main__":
+    import subprocess
+    import sys
+
+    # Four worker processes stand in for four machines sharing the queue.
+    queue = JobQueue()
+    grid = {"n_estimators": [50], "max_features": ["log2", "sqrt"], "min_samples_leaf": [1, 5]}
+    print(f"Submitted {queue.submit('demo', sweep_specs(grid, ['2023-24', '2024-25']))} jobs")
+    workers = [subprocess.Popen([sys.executable, "-m", "scripts.fpl", "sweep", "work"]) for _ in range(4)]
+    for process in workers:
+        process.wait()
+    print(queue.status())
+    print(queue.results("demo").sort_values("mse").to_string(index=False))
@@ -1,4 +1,5 @@
 import os
+import time
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
@@ -6,9 +7,42 @@ from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.model_selection import RandomizedSearchCV
 import joblib
 
+from src.model.drift_monitor import DriftMonitor, stats_path
+from src.model.feature_spec import FeatureSpec, spec_path
+from src.model.permutation_importance import permutation_importance, save_importance_report, show_importance
+
 INPUT_DIR = "data/model_ready"
 MODEL_PATH = "models/random_forest_model.pkl"
 
+# Tuned in notebooks/hyperparameter_tuning.ipynb.
+MODEL_PARAMS = {
+    "random_state": 42,
+    "n_jobs": -1,
+    "n_estimators": 1000,
+    "max_depth": None,
+    "max_features": "log2",
+    "min_samples_leaf": 1,
+    "min_samples_split": 2,
+}
+
+# Out-of-bag training: trees added per step, and the relative OOB MSE
+# improvement below which a step counts as a plateau.
+OOB_STEP = 100
+OOB_TOLERANCE = 0.001
+OOB_PATIENCE = 2
+
+def build_model(**overrides):
+    """
+    Create an unfitted Random Forest with the tuned hyperparameters.
+
+    Args:
+        **overrides: Hyperparameters to change from `MODEL_PARAMS`.
+
+    Returns:
+        RandomForestRegressor
+    """
+    return RandomForestRegressor(**{**MODEL_PARAMS, **overrides})
+
 def load_model_ready_data():
     """
     Load and combine all preprocessed training CSV files.
@@ -26,37 +60,122 @@ def load_model_ready_data():
             dfs.append(df)
     return pd.concat(dfs, ignore_index=True)
 
-def train_random_forest():
+def oob_curve_path(model_path: str) -> str:
+    """Map `models/x.pkl` to the learning curve `models/x_oob_curve.csv` next to it."""
+    return os.path.splitext(model_path)[0] + "_oob_curve.csv"
+
+def fit_with_oob_stopping(X, y, step: int = OOB_STEP, max_trees: int = MODEL_PARAMS["n_estimators"],
+                          tolerance: float = OOB_TOLERANCE, patience: int = OOB_PATIENCE):
+    """
+    Fit a forest on all the data, growing it until its out-of-bag error plateaus.
+
+    Each bootstrap leaves about a third of the rows out of a tree, so
+    every row is scored by the trees that never saw it. That gives a
+    held-out error estimate from a single fit, with no train/test split
+    and no second fit. The forest is grown `step` trees at a time with
+    `warm_start`, and stops once `patience` consecutive steps improve the
+    OOB MSE by less than `tolerance` (relative), or at `max_trees`.
+
+    Args:
+        X (pd.DataFrame): Features.
+        y (pd.Series): Target.
+        step (int): Trees added per step.
+        max_trees (int): Upper limit on the number of trees.
+        tolerance (float): Relative OOB MSE improvement that counts as progress.
+        patience (int): Steps without progress before stopping.
+
+    Returns:
+        tuple: (model, curve) where `curve` is a DataFrame with
+        "n_estimators", "oob_mse", "oob_r2" and "seconds" per step.
+    """
+    model = build_model(n_estimators=0, warm_start=True, oob_score=True)
+    rows = []
+    best_mse, stalled = None, 0
+    start = time.time()
+    while model.n_estimators < max_trees and stalled < patience:
+        model.set_params(n_estimators=min(model.n_estimators + step, max_trees))
+        model.fit(X, y)
+        oob_mse = mean_squared_error(y, model.oob_prediction_)
+        rows.append({
+            "n_estimators": model.n_estimators,
+            "oob_mse": oob_mse,
+            "oob_r2": model.oob_score_,
+            "seconds": time.time() - start,
+        })
+        print(f"{model.n_estimators} trees: OOB MSE {oob_mse:.2f}, OOB R² {model.oob_score_:.3f}")
+
+        if best_mse is not None and oob_mse > best_mse * (1 - tolerance):
+            stalled += 1
+        else:
+            stalled = 0
+        best_mse = oob_mse if best_mse is None else min(best_mse, oob_mse)
+    return model, pd.DataFrame(rows)
+
+def save_feature_stats(X: pd.DataFrame, model_path: str) -> None:
+    """
+    Save the training features' spec and per-gameweek statistics next to the model.
+
+    The spec (`*_feature_spec.json`) is checked against every batch the
+    model scores, and the statistics (`*_feature_stats.pkl`) are used for
+    drift checks.
+    """
+    FeatureSpec.fit(X).save(spec_path(model_path))
+    print(f"Feature spec saved to {spec_path(model_path)}")
+    DriftMonitor().add_reference(X).save(stats_path(model_path))
+    print(f"Feature statistics saved to {stats_path(model_path)}")
+
+def train_random_forest(df: pd.DataFrame = None, importance: bool = True, compress: bool = False,
+                        oob: bool = False):
     """
     Train, evaluate, and save a Random Forest regression model.
 
     Steps:
-    1. Loads training data via `load_model_ready_data()`.
+    1. Loads training data via `load_model_ready_data()`, unless `df` is given.
     2. Splits into train/test sets.
     3. Trains a Random Forest model and evaluates performance on test data
        (MSE and R² are printed to console).
-    4. Retrains the model on the full dataset using the same hyperparameters.
-    5. Saves the trained model as a `.pkl` file for later use.
+    4. Unless `importance` is False, computes permutation importance of
+       each feature and feature family on the test data.
+    5. Retrains the model on the full dataset using the same hyperparameters.
+    6. If `compress` is True, builds pruned, depth-capped and distilled
+       versions of the model, measures their size, latency and accuracy on
+       the test split, and saves deploy versions fitted on the full dataset
+       where possible (see `compress_forest`).
+    7. Saves the trained model as a `.pkl` file for later use, with the
+       importance report (`*_importance.csv`), the feature spec
+       (`*_feature_spec.json`) and per-gameweek feature statistics for
+       drift checks (`*_feature_stats.pkl`) next to it.
+
+    With `oob=True`, steps 2-6 are replaced by a single fit on the full
+    dataset that reports out-of-bag MSE and R² and stops adding trees once
+    the OOB error plateaus (see `fit_with_oob_stopping`). The learning
+    curve is saved next to the model (`*_oob_curve.csv`). Permutation
+    importance and compression need a held-out split, so they are skipped.
     """
-    df = load_model_ready_data()
+    if df is None:
+        df = load_model_ready_data()
 
     X = df.drop(columns=["total_points"])
     y = df["total_points"]
 
+    if oob:
+        if importance or compress:
+            print("Skipping permutation importance and compression, which need a held-out split.")
+        final_model, curve = fit_with_oob_stopping(X, y)
+        os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+        joblib.dump(final_model, MODEL_PATH)
+        print(f"Model saved to {MODEL_PATH}")
+        curve.round(4).to_csv(oob_curve_path(MODEL_PATH), index=False)
+        print(f"OOB learning curve saved to {oob_curve_path(MODEL_PATH)}")
+        save_feature_stats(X, MODEL_PATH)
+        return
+
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42
     )
 
-    model = RandomForestRegressor(
-        random_state=42, 
-        n_jobs=-1,
-        n_estimators=1000,
-        max_depth=None,
-        max_features='log2',
-        min_samples_leaf=1,
-        min_samples_split=2
-    )
-    
+    model = build_model()
+
     model.fit(X_train, y_train)
 
     y_pred = model.predict(X_test)
@@ -65,21 +184,26 @@ def train_random_forest():
     r2 = r2_score(y_test, y_pred)
     print(f"Mean Squared Error: {mse:.2f}")
     print(f"R² Score: {r2:.3f}")
-    
-    final_model = RandomForestRegressor(
-        random_state=42,
-        n_jobs=-1,
-        n_estimators=1000,
-        max_depth=None,
-        max_features="log2",
-        min_samples_leaf=1,
-        min_samples_split=2,
-    )
+
+    report = None
+    if importance:
+        report = permutation_importance(model, X_test, y_test)
+        show_importance(report)
+
+    final_model = build_model()
     final_model.fit(X, y)
 
+    if compress:
+        # Imported here because compress_forest builds its candidates with `build_model`.
+        from src.model.compress_forest import compress_forest
+        print(compress_forest(model, X_train, y_train, X_test, y_test, final_model, X, y).to_string(index=False))
+
     os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
     joblib.dump(final_model, MODEL_PATH)
     print(f"Model saved to {MODEL_PATH}")
+    if report is not None:
+        print(f"Importance report saved to {save_importance_report(report, MODEL_PATH)}")
+    save_feature_stats(X, MODEL_PATH)
 
 if __name__ == "__main__":
     train_random_forest()
\ No newline at end of file
@@ -0,0 +1,123 @@
+import hashlib
+import io
+import json
+import os
+import time
+import pandas as pd
+import requests
+
+CASSETTE_DIR = "data/cassettes"
+MODES = ("live", "record", "replay")
+# Environment variables that select the mode and store, so every process
+# started by a pipeline or CI job uses the same settings.
+MODE_ENV = "FPL_HTTP_MODE"
+DIR_ENV = "FPL_CASSETTE_DIR"
+
+
+def get_mode() -> str:
+    """
+    Return the current HTTP mode from `FPL_HTTP_MODE` (default "live").
+
+    - "live": fetch from the network.
+    - "record": fetch from the network and save every response.
+    - "replay": serve saved responses only; never touch the network.
+
+    Raises:
+        ValueError: If the variable holds an unknown mode.
+    """
+    mode = os.environ.get(MODE_ENV, "live")
+    if mode not in MODES:
+        raise ValueError(f"{MODE_ENV} must be one of {MODES}, got {mode!r}")
+    return mode
+
+
+def set_mode(mode: str, cassette_dir: str = None) -> None:
+    """Set the HTTP mode (and optionally the cassette directory) for this process and its children."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    os.environ[MODE_ENV] = mode
+    if cassette_dir is not None:
+        os.environ[DIR_ENV] = cassette_dir
+
+
+def cassette_paths(url: str, cassette_dir: str = None) -> tuple:
+    """Return the (body, metadata) file paths a URL is recorded to."""
+    cassette_dir = cassette_dir or os.environ.get(DIR_ENV, CASSETTE_DIR)
+    key = hashlib.sha256(url.encode()).hexdigest()[:20]
+    return os.path.join(cassette_dir, f"{key}.body"), os.path.join(cassette_dir, f"{key}.json")
+
+
+def fetch(url: str, timeout: float = 30) -> bytes:
+    """
+    Return the body of a GET request, going through the cassette store.
+
+    Every remote read of the pipeline goes through here, so one run in
+    "record" mode captures everything a later "replay" run needs.
+
+    Args:
+        url (str): The URL to fetch.
+        timeout (float): Network timeout in seconds (live and record modes).
+
+    Returns:
+        bytes: The response body.
+
+    Raises:
+        FileNotFoundError: In replay mode, if the URL was never recorded.
+        requests.HTTPError: If the server returns an error status.
+    """
+    mode = get_mode()
+    body_path, meta_path = cassette_paths(url)
+    if mode == "replay":
+        if not os.path.exists(body_path):
+            raise FileNotFoundError(f"No recording of {url} in {os.path.dirname(body_path)}")
+        with open(body_path, "rb") as f:
+            return f.read()
+
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    if mode == "record":
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        with open(body_path, "wb") as f:
+            f.write(response.content)
+        with open(meta_path, "w") as f:
+            json.dump({
+                "url": url,
+                "status": response.status_code,
+                "content_type": response.headers.get("Content-Type"),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "bytes": len(response.content),
+            }, f, indent=2)
+    return response.content
+
+
+def get_json(url: str):
+    """Fetch a URL through the cassette store and parse it as JSON."""
+    return json.loads(fetch(url))
+
+
+def read_csv(url: str, **kwargs) -> pd.DataFrame:
+    """Fetch a CSV through the cassette store and parse it with `pd.read_csv`."""
+    return pd.read_csv(io.BytesIO(fetch(url)), **kwargs)
+
+
+def list_recordings(cassette_dir: str = None) -> pd.DataFrame:
+    """
+    List the recorded responses in a cassette directory.
+
+    Returns:
+        pd.DataFrame: One row per recording with "url", "status",
+        "content_type", "recorded_at" and "bytes".
+    """
+    cassette_dir = cassette_dir or os.environ.get(DIR_ENV, CASSETTE_DIR)
+    if not os.path.isdir(cassette_dir):
+        return pd.DataFrame(columns=["url", "status", "content_type", "recorded_at", "bytes"])
+    rows = []
+    for file in sorted(os.listdir(cassette_dir)):
+        if file.endswith(".json"):
+            with open(os.path.join(cassette_dir, file)) as f:
+                rows.append(json.load(f))
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    print(list_recordings())
@@ -1,6 +1,9 @@
 import pandas as pd
 import unicodedata
 
+# Player identity across seasons: accent-insensitive first and second name.
+NAME_KEYS = ["first_name_norm", "second_name_norm"]
+
 def map_element_type(df: pd.DataFrame) -> pd.DataFrame:
     """
     Map 'element_type' to numeric values for modelling.
@@ -53,6 +56,20 @@ def calc_pts_per_90(points, minutes):
         return 0.0
     return 90 * points / minutes
 
+def per_90(values, minutes):
+    """
+    Vectorized per-90 rate with the same 270-minute threshold as
+    `calc_cards_per_90` and `calc_pts_per_90`.
+
+    Args:
+        values (pd.Series): Totals (e.g. points or cards).
+        minutes (pd.Series): Total minutes played.
+
+    Returns:
+        pd.Series: 90 * values / minutes, or 0 where minutes < 270.
+    """
+    return (90 * values / minutes).where(minutes >= 270, 0.0)
+
 def get_feature_columns(df: pd.DataFrame, exclude=None) -> list:
     """
     Return a list of feature columns, excluding specified ones.
@@ -75,4 +92,17 @@ def normalize_name(name):
     if pd.isna(name):
         return ""
     return unicodedata.normalize('NFKD', str(name)).encode(
-        'ASCII', 'ignore').decode('utf-8').lower().strip()
\ No newline at end of file
+        'ASCII', 'ignore').decode('utf-8').lower().strip()
+
+def add_name_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of `df` with `NAME_KEYS`, normalizing each distinct name once.
+
+    Both the one-season `prev_` join and the multi-season lag join match
+    players on these keys.
+    """
+    df = df.copy()
+    for col in ("first_name", "second_name"):
+        names = df[col].drop_duplicates()
+        df[f"{col}_norm"] = df[col].map(dict(zip(names, names.map(normalize_name))))
+    return df
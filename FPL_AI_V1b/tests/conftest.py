@@ -0,0 +1,65 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.data.feature_store import CUMULATIVE_STATS, FEATURE_COLUMNS  # noqa: E402
+
+POSITIONS = {"GK": 1, "DEF": 2, "MID": 3, "FWD": 4}
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    """Run every test from the repo root, where the `data/...` paths resolve."""
+    monkeypatch.chdir(ROOT)
+
+
+def make_api_players(n_known: int = 8, n_new: int = 2, gw: int = 4, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a small FPL API `elements` table.
+
+    The first `n_known` players are taken from `data/prev_years/2024-25`, so
+    they get `prev_` features; the last `n_new` are new to the league.
+    """
+    prev = pd.read_csv("data/prev_years/2024-25_season_data.csv")
+    prev = prev[prev["minutes"] > 0].drop_duplicates(subset=["first_name", "second_name"]).head(n_known)
+    rng = pd.Series(range(n_known + n_new)) * (seed + 1)
+    df = pd.DataFrame({
+        "first_name": list(prev["first_name"]) + [f"New{i}" for i in range(n_new)],
+        "second_name": list(prev["second_name"]) + [f"Player{i}" for i in range(n_new)],
+        "element_type": list(prev["element_type"].map(POSITIONS)) + [3] * n_new,
+        "code": range(1000, 1000 + n_known + n_new),
+        "now_cost": 50 + rng % 50,
+        "team": 1 + rng % 20,
+    })
+    for i, stat in enumerate(CUMULATIVE_STATS):
+        df[stat] = (rng * (i + 1) + gw) % 7
+    df["minutes"] = 90 * gw - rng % 90
+    df["total_points"] = 2 * gw + rng % 11
+    return df
+
+
+@pytest.fixture
+def api_players():
+    return make_api_players()
+
+
+def fit_small_model(columns, seed: int = 0):
+    """Fit a tiny forest on random rows with the given feature columns."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((200, len(columns))) * 100, columns=columns)
+    X["element_type"] = rng.integers(0, 4, len(X))
+    X["prev_season_played"] = rng.integers(0, 2, len(X))
+    y = X["current_total_points"] + rng.random(len(X))
+    return RandomForestRegressor(n_estimators=5, random_state=seed).fit(X, y), X
+
+
+@pytest.fixture(scope="session")
+def small_model():
+    return fit_small_model(FEATURE_COLUMNS)
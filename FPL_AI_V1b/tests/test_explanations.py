@@ -0,0 +1,28 @@
+import joblib
+import pandas as pd
+
+import src.analysis.explanations as explanations
+from src.model.feature_spec import FeatureSpec, spec_path
+
+
+def fail_load(path):
+    raise AssertionError("the model was loaded again")
+
+
+def test_explain_gameweek_uses_loaded_model_and_disk_cache(small_model, tmp_path, monkeypatch):
+    model, X = small_model
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(model, model_path)
+    spec = FeatureSpec.fit(X)
+    spec.save(spec_path(model_path))
+    current_df = X.head(20).assign(code=range(20))
+    monkeypatch.setattr(explanations, "load_model", fail_load)
+
+    shap_df, top_df = explanations.explain_gameweek(
+        model_path, current_df, 4, "2025-26", model, spec, output_dir=str(tmp_path), n_jobs=1)
+    cached_df, _ = explanations.explain_gameweek(
+        model_path, current_df, 4, "2025-26", output_dir=str(tmp_path), n_jobs=1)
+
+    assert len(shap_df) == 20 and len(top_df) == 20 * explanations.TOP_K
+    assert list(shap_df.columns) == ["code"] + spec.columns + ["base_value"]
+    pd.testing.assert_frame_equal(cached_df, shap_df, check_dtype=False, atol=1e-6)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.live_watch import LiveRankings
+from src.data.feature_store import FEATURE_COLUMNS, PREV_COLUMNS
+from src.data.incremental_update import LiveFeatureState
+from src.model.feature_spec import FeatureSpec, check_model_columns
+
+from conftest import fit_small_model
+
+SNAPSHOT = "data/raw/official_fpl_api/2025_09_15_11_17_23_fpl_api.csv"
+
+
+@pytest.fixture(scope="module")
+def api_snapshot():
+    return pd.read_csv(SNAPSHOT).assign(matches=1)
+
+
+def test_to_array_fills_prev_gaps_and_keeps_order(small_model):
+    model, X = small_model
+    spec = FeatureSpec.fit(X)
+    rows = X.head(3)[FEATURE_COLUMNS[::-1]].copy()
+    rows.loc[rows.index[0], PREV_COLUMNS] = np.nan
+
+    array = spec.to_array(rows)
+
+    assert array.dtype == np.float32 and array.flags["C_CONTIGUOUS"]
+    assert list(array[0, 2:2 + len(PREV_COLUMNS)]) == pytest.approx(
+        [spec.fill_values[col] for col in PREV_COLUMNS], rel=1e-6)
+    assert array[1:, 0] == pytest.approx(X["element_type"].iloc[1:3].to_numpy())
+
+
+def test_check_model_columns_rejects_other_order(small_model):
+    model, _ = small_model
+    check_model_columns(model, FEATURE_COLUMNS)
+    with pytest.raises(ValueError):
+        check_model_columns(model, FEATURE_COLUMNS[::-1])
+
+
+def test_live_rankings_fail_fast_on_other_columns(api_snapshot):
+    model, X = fit_small_model(FEATURE_COLUMNS + ["form_total_points_3"])
+    with pytest.raises(ValueError, match="form_total_points_3"):
+        LiveRankings(model, "2025-26", "2024-25", 4, 1)
+    with pytest.raises(ValueError, match="form_total_points_3"):
+        LiveRankings(model, "2025-26", "2024-25", 4, 1, spec=FeatureSpec.fit(X)).start(api_snapshot)
+
+
+def test_live_rankings_score_through_spec(small_model, api_snapshot):
+    model, X = small_model
+    spec = FeatureSpec.fit(X)
+    rankings = LiveRankings(model, "2025-26", "2024-25", 4, 1, spec=spec)
+    rankings.start(api_snapshot)
+    state = LiveFeatureState.build(api_snapshot, "2025-26", "2024-25", 4)
+
+    assert state.score(model, spec=spec) == len(api_snapshot)
+    expected = model.predict(spec.to_frame(state.features))
+    by_code = dict(zip(state.features["code"], expected))
+    assert [rankings.predictions[code] for code in by_code] == pytest.approx(list(by_code.values()), rel=1e-6)
+    assert state.predictions.to_numpy() == pytest.approx(expected)
+
+
+def test_live_feature_state_score_fails_fast_on_other_columns(api_snapshot):
+    model, X = fit_small_model(FEATURE_COLUMNS + ["form_total_points_3"])
+    state = LiveFeatureState.build(api_snapshot, "2025-26", "2024-25", 4)
+    with pytest.raises(ValueError):
+        state.score(model)
+    with pytest.raises(ValueError):
+        state.score(model, spec=FeatureSpec.fit(X))
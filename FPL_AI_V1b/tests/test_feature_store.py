@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import PREV_COLUMNS, TARGET_COLUMN, FeatureStore, compute_features
+from src.data.pull_current_fpl_api import build_model_ready_data
+from src.data.repository import read_season_data
+
+from conftest import make_api_players
+
+
+def live_features(gw, year="2025-26", **kwargs):
+    snapshot = make_api_players(gw=gw, **kwargs).assign(gw=gw, matches=1)
+    return compute_features(snapshot, read_season_data("2024-25"), year)
+
+
+def test_live_partition_is_not_historical(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.append_features(live_features(4), "2025-26", 4)
+
+    assert TARGET_COLUMN not in store.read("2025-26")
+    assert store.historical_seasons() == []
+
+
+def test_model_ready_rows_from_live_gameweek(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.append_features(live_features(3), "2025-26", 3)
+    store.append_features(live_features(4), "2025-26", 4)
+
+    df, fill_values = build_model_ready_data(store, "2025-26")
+
+    assert len(df) == 10
+    assert (df["gw"] == 4).all()
+    # Without history or a feature spec, new players' gaps are left for the
+    # spec, never filled from the live batch.
+    assert fill_values is None
+    assert df.loc[~df["prev_season_played"], PREV_COLUMNS].isna().all().all()
+    assert df.loc[df["prev_season_played"], PREV_COLUMNS].notna().all().all()
+
+
+def test_model_ready_rows_use_spec_fill_values(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    store.append_features(live_features(38, year="2024-25").assign(**{TARGET_COLUMN: 100}), "2024-25", 38)
+    store.append_features(live_features(4), "2025-26", 4)
+    spec_fill = pd.Series(-1.0, index=PREV_COLUMNS)
+
+    df, fill_values = build_model_ready_data(store, "2025-26", fill_values=spec_fill)
+
+    new = df[~df["prev_season_played"]]
+    assert len(new) == 2
+    assert (new[PREV_COLUMNS] == -1).all().all()
+    assert fill_values is spec_fill
+
+
+def test_model_ready_rows_with_history(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    history = live_features(38, year="2024-25").assign(**{TARGET_COLUMN: 100})
+    store.append_features(history, "2024-25", 38)
+    store.append_features(live_features(4), "2025-26", 4)
+
+    df, fill_values = build_model_ready_data(store, "2025-26")
+
+    assert store.historical_seasons() == ["2024-25"]
+    assert np.allclose(fill_values, store.imputation_values())
+    assert len(df) == 10
@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+import src.data.incremental_update as incremental_update
+import src.data.pull_current_fpl_api as pull_current_fpl_api
+from src.data.feature_store import CUMULATIVE_STATS, FEATURE_COLUMNS, FeatureStore
+from src.data.incremental_update import LiveFeatureState, live_state_path, snapshot_deltas
+from src.data.player_panel import LAG_COLUMNS
+from src.data.rolling_form import FORM_COLUMNS
+from src.model.feature_spec import FeatureSpec, spec_path
+
+from conftest import fit_small_model
+
+API_DIR = "data/raw/official_fpl_api"
+# Recorded `bootstrap-static` tables after GW2, GW3 and GW4 of 2025-26.
+SNAPSHOTS = ["2025_08_26_07_42_02_fpl_api.csv", "2025_09_02_14_45_04_fpl_api.csv", "2025_09_15_11_17_23_fpl_api.csv"]
+YEAR, PREV_YEAR = "2025-26", "2024-25"
+
+
+@pytest.fixture(scope="module")
+def snapshots():
+    return [pd.read_csv(f"{API_DIR}/{name}").assign(matches=1) for name in SNAPSHOTS]
+
+
+def test_apply_gameweek_matches_full_rebuild(snapshots):
+    state = LiveFeatureState.build(snapshots[0], YEAR, PREV_YEAR, 2)
+    for gw, (previous, current) in enumerate(zip(snapshots, snapshots[1:]), start=3):
+        changed = state.apply_gameweek(snapshot_deltas(previous, current), gw, 1, new_players=current)
+        full = LiveFeatureState.build(current, YEAR, PREV_YEAR, gw)
+
+        assert 0 < len(changed) < len(current)
+        pd.testing.assert_frame_equal(state.features[FEATURE_COLUMNS], full.features[FEATURE_COLUMNS])
+        # Prices are not in the gameweek deltas, so only the totals are compared.
+        pd.testing.assert_frame_equal(state.snapshot[CUMULATIVE_STATS], full.snapshot[CUMULATIVE_STATS])
+
+
+def test_apply_gameweek_without_changes_only_moves_gameweek(snapshots):
+    state = LiveFeatureState.build(snapshots[1], YEAR, PREV_YEAR, 3)
+    before = state.features.copy()
+    deltas = snapshot_deltas(snapshots[1], snapshots[1])
+
+    changed = state.apply_gameweek(deltas, 4, 1)
+
+    assert len(changed) == 0
+    assert (state.features["gw"] == 4).all()
+    pd.testing.assert_frame_equal(state.features.drop(columns="gw"), before.drop(columns="gw"))
+
+
+def test_update_model_ready_api_data_matches_full_pull(snapshots, tmp_path, monkeypatch):
+    previous, current = snapshots[1], snapshots[2]
+    root = str(tmp_path)
+    LiveFeatureState.build(previous, YEAR, PREV_YEAR, 3).save(live_state_path(YEAR, root))
+    saved = {}
+    monkeypatch.setattr(incremental_update, "pull_gameweek_deltas", lambda gw: snapshot_deltas(previous, current))
+    monkeypatch.setattr(pull_current_fpl_api, "pull_api_data", lambda: current.drop(columns="matches"))
+    monkeypatch.setattr(pull_current_fpl_api, "pull_fixture_counts", lambda gw: pd.Series(1, index=range(1, 21)))
+    monkeypatch.setattr(pull_current_fpl_api, "save_model_ready_csv", lambda df, gw, year: saved.update({gw: df}))
+
+    incremental_update.update_model_ready_api_data(4, YEAR, root)
+
+    full_store = FeatureStore(str(tmp_path / "full"))
+    full_store.append_features(LiveFeatureState.build(current, YEAR, PREV_YEAR, 4).features, YEAR, 4)
+    expected, _ = pull_current_fpl_api.build_model_ready_data(full_store, YEAR)
+    cols = ["code"] + FEATURE_COLUMNS
+    pd.testing.assert_frame_equal(
+        saved[4][cols].sort_values("code").reset_index(drop=True),
+        expected[cols].sort_values("code").reset_index(drop=True),
+    )
+
+
+def test_update_scores_models_with_form_and_lag_features(snapshots, tmp_path, monkeypatch):
+    import joblib
+
+    previous, current = snapshots[1], snapshots[2]
+    root = str(tmp_path)
+    state = LiveFeatureState.build(previous, YEAR, PREV_YEAR, 3)
+    FeatureStore(root).append_features(state.features.reset_index(drop=True), YEAR, 3)
+    state.save(live_state_path(YEAR, root))
+    model, X = fit_small_model(FEATURE_COLUMNS + FORM_COLUMNS + LAG_COLUMNS)
+    spec = FeatureSpec.fit(X)
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(model, model_path)
+    spec.save(spec_path(model_path))
+    saved = {}
+    monkeypatch.setattr(incremental_update, "pull_gameweek_deltas", lambda gw: snapshot_deltas(previous, current))
+    monkeypatch.setattr(pull_current_fpl_api, "pull_api_data", lambda: current.drop(columns="matches"))
+    monkeypatch.setattr(pull_current_fpl_api, "pull_fixture_counts", lambda gw: pd.Series(1, index=range(1, 21)))
+    monkeypatch.setattr(pull_current_fpl_api, "save_model_ready_csv", lambda df, gw, year: saved.update({gw: df}))
+
+    incremental_update.update_model_ready_api_data(4, YEAR, root, model_path)
+
+    rows = saved[4]
+    assert set(FORM_COLUMNS + LAG_COLUMNS) <= set(rows.columns)
+    state = LiveFeatureState.load(live_state_path(YEAR, root))
+    predictions = pd.Series(state.predictions.to_numpy(), index=state.snapshot.loc[state.predictions.index, "code"])
+    expected = model.predict(spec.to_frame(rows))
+    assert predictions[rows["code"]].to_numpy() == pytest.approx(expected)
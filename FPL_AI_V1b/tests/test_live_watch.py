@@ -0,0 +1,136 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.data.pull_current_fpl_api as pull_current_fpl_api
+from src.analysis.live_watch import LiveRankings, ReplaySource, watch
+from src.data.feature_store import FEATURE_COLUMNS, PREV_COLUMNS, FeatureStore
+from src.data.fixture_calendar import FIXTURE_COLUMNS, FixtureCalendar
+from src.data.incremental_update import LiveFeatureState
+from src.data.player_panel import LAG_COLUMNS
+from src.data.rolling_form import FORM_COLUMNS
+from src.model.feature_spec import FeatureSpec, spec_path
+
+from conftest import fit_small_model
+
+API_DIR = "data/raw/official_fpl_api"
+SNAPSHOTS = [f"{API_DIR}/2025_09_02_14_45_04_fpl_api.csv", f"{API_DIR}/2025_09_15_11_17_23_fpl_api.csv"]
+# Team 1 plays twice, team 2 blanks and everyone else plays once.
+FIXTURE_COUNTS = pd.Series(2, index=[1]).combine_first(pd.Series(1, index=range(3, 21)))
+
+
+def matches_of(rankings):
+    column = rankings.X[:, rankings.columns.index("matches")]
+    return pd.Series({code: column[row] for code, row in rankings.row_of.items()})
+
+
+def test_fixture_counts_per_team(small_model):
+    model, _ = small_model
+    first, second = (pd.read_csv(path) for path in SNAPSHOTS)
+    rankings = LiveRankings(model, "2025-26", "2024-25", 4, FIXTURE_COUNTS)
+    rankings.start(first)
+    rankings.tick(second)
+
+    teams = second.set_index("code")["team"]
+    matches = matches_of(rankings)
+    assert (matches[teams[teams == 1].index] == 2).all()
+    assert (matches[teams[teams == 2].index] == 0).all()
+    assert (matches[teams[teams > 2].index] == 1).all()
+    # Players listed only in the second snapshot get their team's count too.
+    new = second.loc[~second["code"].isin(first["code"]), ["code", "team"]]
+    assert len(new)
+    assert (matches[new["code"]].to_numpy() == new["team"].map(FIXTURE_COUNTS).fillna(0).to_numpy()).all()
+
+
+def test_prev_gaps_are_not_filled_from_the_snapshot(small_model):
+    model, X = small_model
+    snapshot = pd.read_csv(SNAPSHOTS[0])
+    prev_cols = [FEATURE_COLUMNS.index(col) for col in PREV_COLUMNS]
+
+    rankings = LiveRankings(model, "2025-26", "2024-25", 4, 1)
+    rankings.start(snapshot)
+    new = ~rankings.X[:, FEATURE_COLUMNS.index("prev_season_played")].astype(bool)
+    assert np.isnan(rankings.X[np.ix_(new, prev_cols)]).all()
+
+    spec = FeatureSpec.fit(X)
+    rankings = LiveRankings(model, "2025-26", "2024-25", 4, 1, spec=spec)
+    rankings.start(snapshot)
+    expected = np.float32([spec.fill_values[col] for col in PREV_COLUMNS])
+    assert (rankings.X[np.ix_(new, prev_cols)] == expected).all()
+
+
+def test_watch_uses_fixture_counts_and_spec(small_model, tmp_path, monkeypatch):
+    model, X = small_model
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(model, model_path)
+    FeatureSpec.fit(X).save(spec_path(model_path))
+    monkeypatch.setattr(pull_current_fpl_api, "pull_fixture_counts", lambda gw: FIXTURE_COUNTS)
+
+    rankings = watch(4, model_path=model_path, source=ReplaySource(SNAPSHOTS), on_change=lambda feed, ms: None)
+
+    assert rankings.spec is not None
+    teams = pd.read_csv(SNAPSHOTS[1]).set_index("code")["team"]
+    assert (matches_of(rankings)[teams[teams == 1].index] == 2).all()
+
+
+def test_fixture_form_and_lag_features_match_read_latest(tmp_path):
+    model, X = fit_small_model(FEATURE_COLUMNS + FIXTURE_COLUMNS + FORM_COLUMNS + LAG_COLUMNS)
+    spec = FeatureSpec.fit(X)
+    # The 2024-25 calendar stands in for the live season's.
+    calendar = FixtureCalendar.from_gameweek_files("2024-25")
+    store = FeatureStore(str(tmp_path))
+    gw2, gw3, gw4 = (pd.read_csv(path).assign(matches=1)
+                     for path in [f"{API_DIR}/2025_08_26_07_42_02_fpl_api.csv"] + SNAPSHOTS)
+    for gw, snapshot in ((2, gw2), (3, gw3)):
+        features = LiveFeatureState.build(snapshot, "2025-26", "2024-25", gw).features
+        store.append_features(features.reset_index(drop=True), "2025-26", gw)
+
+    rankings = LiveRankings(model, "2025-26", "2024-25", 4, 1, spec=spec, calendar=calendar, store=store)
+    rankings.start(gw3)
+    rankings.tick(gw4)
+
+    features = LiveFeatureState.build(gw4, "2025-26", "2024-25", 4).features
+    store.append_features(features.reset_index(drop=True), "2025-26", 4)
+    latest = store.read_latest("2025-26", spec.prev_fill_values(), calendar, form=True, lags=True)
+    expected = spec.to_array(latest)
+    actual = rankings.X[[rankings.row_of[code] for code in latest["code"]]]
+    np.testing.assert_allclose(actual, expected, rtol=1e-6)
+    assert not np.isnan(expected[:, spec.columns.index("form_5_total_points")]).any()
+    assert np.isnan(expected[:, spec.columns.index("form_3_total_points")]).all()
+
+
+def test_fixture_features_need_a_calendar():
+    model, X = fit_small_model(FEATURE_COLUMNS + FIXTURE_COLUMNS)
+
+    with pytest.raises(ValueError, match="FixtureCalendar"):
+        LiveRankings(model, "2025-26", "2024-25", 4, 1, spec=FeatureSpec.fit(X))
+
+
+def rankings_by_brute_force(rankings):
+    order = sorted(rankings.predictions, key=lambda code: (-rankings.predictions[code], code))
+    return {position: [code for code in order if rankings.positions[code] == position]
+            for position in set(rankings.positions.values())}
+
+
+def test_position_change_overwrites_row_and_reports_old_position(small_model):
+    model, _ = small_model
+    first = pd.read_csv(SNAPSHOTS[0])
+    rankings = LiveRankings(model, "2025-26", "2024-25", 4, 1)
+    rankings.start(first)
+    # Re-list the third best midfielder as a forward, with no new stats.
+    code = rankings.top_n(2, 3)["code"].iloc[-1]
+    second = first.copy()
+    second.loc[second["code"] == code, "element_type"] = 4
+    n_rows = len(rankings.X)
+
+    feed = rankings.tick(second)
+
+    assert len(rankings.X) == n_rows
+    assert rankings.X[rankings.row_of[code], FEATURE_COLUMNS.index("element_type")] == 3
+    assert rankings._codes == rankings_by_brute_force(rankings)
+    climbed = feed[feed["element_type"] == 2].set_index("code")
+    below = rankings._codes[2][2:]
+    assert sorted(climbed.index) == sorted(below)
+    assert (climbed["movement"] == 1).all()
+    assert (climbed.loc[below, "new_rank"].to_numpy() == np.arange(3, len(below) + 3)).all()
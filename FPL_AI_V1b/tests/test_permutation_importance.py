@@ -0,0 +1,19 @@
+import pandas as pd
+
+from src.data.feature_store import FEATURE_COLUMNS
+from src.model.permutation_importance import permutation_importance
+
+from conftest import fit_small_model
+
+
+def test_workers_score_with_single_threaded_copy():
+    model, X = fit_small_model(FEATURE_COLUMNS)
+    model.set_params(n_jobs=-1)
+    y = X["current_total_points"]
+
+    threaded = permutation_importance(model, X, y, n_repeats=2, n_jobs=4)
+    serial = permutation_importance(model, X, y, n_repeats=2, n_jobs=1)
+
+    assert model.n_jobs == -1
+    pd.testing.assert_frame_equal(threaded.sort_values("feature").reset_index(drop=True),
+                                  serial.sort_values("feature").reset_index(drop=True))
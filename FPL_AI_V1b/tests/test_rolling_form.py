@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src.data.feature_store import FeatureStore, compute_features
+from src.data.repository import read_season_data
+from src.data.rolling_form import rolling_form
+
+from conftest import make_api_players
+
+
+def season_rows(gws):
+    # One player scoring 2 points a gameweek, stored only for `gws`.
+    return pd.DataFrame({"code": 1, "gw": gws, "current_total_points": [2 * gw for gw in gws]})
+
+
+def test_complete_season_form():
+    form = rolling_form(season_rows(list(range(1, 7))))
+
+    assert list(form["form_3_total_points"]) == [2, 4, 6, 6, 6, 6]
+    assert list(form["form_5_total_points"]) == [2, 4, 6, 8, 10, 10]
+
+
+def test_live_gap_leaves_window_nan():
+    # GW2-5 were never fetched, so the 3-gameweek window at GW6 (GW3 to 6)
+    # has no starting total; the 5-gameweek window starts at GW1.
+    form = rolling_form(season_rows([1, 6]), gameweeks=[1, 6])
+
+    assert form["form_3_total_points"].tolist()[0] == 2
+    assert np.isnan(form["form_3_total_points"].iloc[1])
+    assert form["form_5_total_points"].tolist() == [2, 10]
+
+
+def test_first_fetch_mid_season_has_no_form(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    snapshot = make_api_players(gw=10).assign(gw=10, matches=1)
+    store.append_features(compute_features(snapshot, read_season_data("2024-25"), "2025-26"), "2025-26", 10)
+
+    latest = store.read_latest("2025-26", form=True)
+
+    assert latest.filter(like="form_").isna().all().all()
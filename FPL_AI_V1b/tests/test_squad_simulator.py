@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from src.analysis.squad_simulator import gameweek_tree_predictions
+from src.analysis.transfer_planner import TOTAL_GAMEWEEKS
+from src.model.make_predictions import per_tree_predictions
+
+
+def test_gameweek_samples_come_from_per_tree_season_totals(small_model):
+    model, X = small_model
+    gw = 4
+
+    per_tree = per_tree_predictions(model, X)
+    per_gw = gameweek_tree_predictions(X, per_tree, gw)
+
+    assert per_tree.shape == (len(X), len(model.estimators_))
+    assert per_tree.mean(axis=1) == pytest.approx(model.predict(X))
+    remaining = np.clip(per_tree - X[["current_total_points"]].to_numpy(), 0, None)
+    assert per_gw == pytest.approx(remaining / (TOTAL_GAMEWEEKS - gw), rel=1e-5, abs=1e-5)
@@ -0,0 +1,66 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from src.model.sweep_queue import JobQueue, sweep_specs
+
+from conftest import ROOT
+
+LEASE_SECONDS = 1.0
+TIMEOUT = 120
+
+
+def write_seasons(input_dir, n_rows: int = 2000, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    for season in ("2023-24", "2024-25"):
+        df = pd.DataFrame(rng.random((n_rows, 4)), columns=["prev_a", "prev_b", "current_a", "current_b"])
+        df["total_points"] = df.sum(axis=1) + rng.random(n_rows)
+        df.to_csv(os.path.join(input_dir, f"{season}_model_ready.csv"), index=False)
+
+
+def start_worker(queue_path: str, input_dir: str, name: str) -> subprocess.Popen:
+    code = (f"from src.model.sweep_queue import run_worker; run_worker({queue_path!r}, {name!r}, "
+            f"lease_seconds={LEASE_SECONDS}, poll_seconds=0.1, wait=True, input_dir={input_dir!r})")
+    return subprocess.Popen([sys.executable, "-c", code], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for(condition, queue: JobQueue):
+    deadline = time.time() + TIMEOUT
+    while time.time() < deadline:
+        rows = queue.connection.execute("SELECT job_id, status, worker, attempts FROM jobs").fetchall()
+        match = condition(rows)
+        if match:
+            return match
+        time.sleep(0.05)
+    raise TimeoutError(f"Queue never reached the expected state: {rows}")
+
+
+def test_killed_worker_job_is_requeued_and_every_job_finishes(tmp_path):
+    write_seasons(str(tmp_path))
+    queue_path = str(tmp_path / "queue.sqlite")
+    queue = JobQueue(queue_path)
+    grid = {"n_estimators": [200], "min_samples_leaf": [1, 2, 3]}
+    n_jobs = queue.submit("test", sweep_specs(grid, ["2024-25"], ("all", "prev_only")))
+    workers = {f"w{i}": start_worker(queue_path, str(tmp_path), f"w{i}") for i in range(3)}
+    try:
+        job_id, _, victim, _ = wait_for(lambda rows: next((r for r in rows if r[1] == "running"), None), queue)
+        workers[victim].send_signal(signal.SIGKILL)
+        workers[victim].wait()
+
+        wait_for(lambda rows: all(r[1] == "done" for r in rows), queue)
+    finally:
+        for process in workers.values():
+            process.kill()
+            process.wait()
+
+    results = queue.results("test")
+    queue.close()
+    assert n_jobs == 6 and len(results) == n_jobs
+    killed = results.set_index("job_id").loc[job_id]
+    assert killed["attempts"] == 2 and killed["worker"] != victim
+    assert results["mse"].notna().all()
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from src.data.warehouse import PredictionWarehouse
+
+
+def test_team_ids_round_trip_as_integers(tmp_path):
+    warehouse = PredictionWarehouse(str(tmp_path / "predictions.sqlite"))
+    df = pd.DataFrame({
+        "code": [1, 2, 3], "first_name": ["A", "B", "C"], "second_name": ["X", "Y", "Z"],
+        "element_type": [0, 2, 3], "team": [7, 12, np.nan], "now_cost": [45, 80, 60],
+        "total_points_predictions": [90.0, 150.0, 120.0],
+    })
+    warehouse.insert(df, "2025-26", 4, "v1")
+
+    types = warehouse.connection.execute("SELECT typeof(team) FROM predictions ORDER BY code").fetchall()
+    board = warehouse.leaderboard("2025-26", 4, element_type=2)
+    warehouse.close()
+
+    assert [row[0] for row in types] == ["integer", "integer", "null"]
+    assert board["team"].tolist() == [12]